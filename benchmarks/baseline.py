@@ -0,0 +1,78 @@
+"""
+Compare a benchmark run with a stored baseline.
+
+Query counts are deterministic and may not grow at all. Transition
+invariants that held in the baseline must keep holding; race outcomes are
+not reproducible, so a count that was already non-zero is only reported.
+Latencies and throughput are noisy, so they only regress once they are
+worse than the baseline by more than `tolerance` (a fraction) plus
+`slack_ms`. Baselines are per database vendor, and latency figures
+only mean something on the machine that recorded them: refresh them
+with `python -m benchmarks.suite --update-baseline` when that changes.
+"""
+
+import json
+from pathlib import Path
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+def baseline_path(vendor):
+    return BASELINE_DIR / f"{vendor}.json"
+
+
+def load(path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save(path, results):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def _slower(current, previous, tolerance, slack_ms):
+    return current > previous * (1 + tolerance) + slack_ms
+
+
+def compare(results, baseline, tolerance=0.5, slack_ms=5.0):
+    """
+    Return a list of human-readable regressions (empty when none).
+    Entries missing from the baseline are new and never regress.
+    """
+    regressions = []
+
+    for key, current in results.get("urls", {}).items():
+        previous = baseline.get("urls", {}).get(key)
+        if previous is None:
+            continue
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{key}: {current['queries']} queries (baseline {previous['queries']})")
+        for metric in ("p50_ms", "p95_ms"):
+            if _slower(current[metric], previous[metric], tolerance, slack_ms):
+                regressions.append(
+                    f"{key}: {metric} {current[metric]:.1f} (baseline {previous[metric]:.1f})"
+                )
+
+    current = results.get("transitions")
+    previous = baseline.get("transitions")
+    if current and previous:
+        for name, count in current["violations"].items():
+            if count and not previous["violations"].get(name):
+                regressions.append(f"transitions: {count} {name} (baseline 0)")
+        if current["throughput_per_s"] * (1 + tolerance) < previous["throughput_per_s"]:
+            regressions.append(
+                f"transitions: {current['throughput_per_s']} attempts/s "
+                f"(baseline {previous['throughput_per_s']})"
+            )
+        for action, latency in current["latency"].items():
+            before = previous["latency"].get(action)
+            if before and _slower(latency["p50_ms"], before["p50_ms"], tolerance, slack_ms):
+                regressions.append(
+                    f"transitions: {action} p50_ms {latency['p50_ms']:.1f} (baseline {before['p50_ms']:.1f})"
+                )
+
+    return regressions
@@ -0,0 +1,303 @@
+"""
+Requests per second of the read-heavy pages: sync views under WSGI
+against async views (settings.ASYNC_VIEWS) under ASGI.
+
+    python -m benchmarks.bench_async_views [--requests 2000] [--concurrency 32]
+        [--threads 8] [--db-latency-ms 0 2]
+
+`--concurrency` clients replay the document list, detail, audit and
+dashboard pages as an admin. WSGI requests go through Django's
+WSGIHandler, at most `--threads` at a time, as a threaded WSGI worker
+would serve them. ASGI requests all go through one ASGIHandler event
+loop. Both run in this process, without a network in between.
+
+`--db-latency-ms` adds a sleep before every query to stand in for the
+round trip to a database on another host; one run per value.
+"""
+
+import argparse
+import asyncio
+import importlib
+import io
+import itertools
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from benchmarks.harness import Timer, percentile, report, setup_django, test_database
+
+PAGES = (
+    ("workflow:document-list", False),
+    ("workflow:dashboard", False),
+    ("workflow:document-detail", True),
+    ("workflow:document-audit-log", True),
+)
+
+
+def _paths(document_ids, count):
+    from django.urls import reverse
+
+    ids = itertools.cycle(document_ids)
+    pages = itertools.cycle(PAGES)
+    return [
+        reverse(name, args=[next(ids)]) if per_document else reverse(name)
+        for name, per_document in itertools.islice(pages, count)
+    ]
+
+
+@contextmanager
+def _routing(async_views):
+    from django.test.utils import override_settings
+    from django.urls import clear_url_caches
+
+    import rbaw_project.urls
+    import workflow.urls
+
+    def reload():
+        importlib.reload(workflow.urls)
+        importlib.reload(rbaw_project.urls)
+        clear_url_caches()
+
+    try:
+        with override_settings(ASYNC_VIEWS=async_views):
+            reload()
+            yield
+    finally:
+        reload()
+
+
+@contextmanager
+def _db_latency(seconds):
+    """Sleep before each query on every connection opened in the block."""
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def attach(sender, connection, **kwargs):
+        # First, so execute_wrapper() blocks that were entered before the
+        # connection opened still pop their own wrapper
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, delay)
+
+    if not seconds:
+        yield
+        return
+    connection_created.connect(attach)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(attach)
+
+
+def _environ(path, cookie):
+    return {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "testserver",
+        "HTTP_COOKIE": cookie,
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+
+
+def _scope(path, cookie):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+def run_wsgi(paths, cookie, concurrency, threads):
+    """Return `(wall seconds, latencies, statuses)` for WSGI and sync views."""
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+
+    handler = WSGIHandler()
+    slots = threading.Semaphore(threads)
+    pending = iter(paths)
+    lock = threading.Lock()
+    latencies, statuses = [], []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(int(status.split()[0]))
+
+    def client():
+        while True:
+            with lock:
+                path = next(pending, None)
+            if path is None:
+                break
+            start = time.perf_counter()
+            with slots:
+                response = handler(_environ(path, cookie), start_response)
+                b"".join(response)
+                response.close()
+            latencies.append(time.perf_counter() - start)
+        connections.close_all()
+
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    with Timer() as wall:
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join()
+    return wall.elapsed, latencies, statuses
+
+
+def run_asgi(paths, cookie, concurrency):
+    """Return `(wall seconds, latencies, statuses)` for ASGI and async views."""
+    from django.core.handlers.asgi import ASGIHandler
+    from django.db import connections
+
+    handler = ASGIHandler()
+    latencies, statuses = [], []
+
+    async def request(path):
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()  # cancelled once the response is sent
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await handler(_scope(path, cookie), receive, send)
+
+    async def client(pending):
+        for path in pending:
+            start = time.perf_counter()
+            await request(path)
+            latencies.append(time.perf_counter() - start)
+
+    async def main():
+        pending = iter(paths)
+        await asyncio.gather(*(client(pending) for _ in range(concurrency)))
+
+    # Each request gets its own executor thread and connection; Django
+    # expects CONN_MAX_AGE=0 under ASGI so they are closed when it ends
+    db_settings = connections.settings["default"]
+    max_age = db_settings["CONN_MAX_AGE"]
+    db_settings["CONN_MAX_AGE"] = 0
+    try:
+        with Timer() as wall:
+            asyncio.run(main())
+    finally:
+        db_settings["CONN_MAX_AGE"] = max_age
+    return wall.elapsed, latencies, statuses
+
+
+def _summary(mode, latency_ms, wall, latencies, statuses):
+    return {
+        "mode": mode,
+        "db_latency_ms": latency_ms,
+        "requests": len(latencies),
+        "rps": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "errors": sum(1 for s in statuses if s != 200),
+    }
+
+
+def run(requests=2000, concurrency=32, threads=8, db_latencies=(0.0, 2.0), seed_value=0):
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from benchmarks.seed import seed
+
+    seed(users=50, documents=2000, audit_rows=10000, seed_value=seed_value)
+    admin = User.objects.filter(groups__name="Admin").order_by("pk").first()
+    client = Client()
+    client.force_login(admin)
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    from workflow.models import Document
+
+    document_ids = list(Document.objects.order_by("pk").values_list("pk", flat=True)[:200])
+    paths = _paths(document_ids, requests)
+    warmup = paths[: len(PAGES) * 2]
+
+    results = []
+    for latency_ms in db_latencies:
+        # Slow-request warnings would flood the report under load
+        with _db_latency(latency_ms / 1000), override_settings(REQUEST_SLOW_MS=0):
+            with _routing(async_views=False):
+                run_wsgi(warmup, cookie, 1, 1)
+                results.append(_summary(
+                    f"WSGI, sync views, {threads} threads", latency_ms,
+                    *run_wsgi(paths, cookie, concurrency, threads),
+                ))
+            with _routing(async_views=True):
+                run_asgi(warmup, cookie, 1)
+                results.append(_summary(
+                    "ASGI, async views", latency_ms,
+                    *run_asgi(paths, cookie, concurrency),
+                ))
+    return results
+
+
+def print_results(results, concurrency):
+    print(f"{concurrency} concurrent clients")
+    report(
+        [
+            (
+                r["mode"],
+                r["db_latency_ms"],
+                r["requests"],
+                f"{r['rps']:.0f}",
+                f"{r['p50_ms']:.1f}",
+                f"{r['p95_ms']:.1f}",
+                r["errors"],
+            )
+            for r in results
+        ],
+        headers=("deployment", "db latency ms", "requests", "req/s", "p50 ms", "p95 ms", "errors"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=8, help="WSGI worker threads.")
+    parser.add_argument("--db-latency-ms", type=float, nargs="+", default=[0.0, 2.0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database(file_backed=True):
+        results = run(args.requests, args.concurrency, args.threads, args.db_latency_ms, args.seed)
+    print_results(results, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Audit report search: the old substring filters versus AuditLogFilterForm.
+
+    python -m benchmarks.bench_audit_search [--audit-rows 3000000]
+
+Runs each search the way AuditLogListView does (COUNT for the paginator
+plus the first page) and reports the median latency. On PostgreSQL the
+new actor/title filters are served by the pg_trgm indexes from workflow
+migration 0007, and `action` becomes an equality match on the
+(action, created_at) index.
+"""
+
+import argparse
+import statistics
+from datetime import datetime, timezone
+
+from benchmarks.harness import Timer, report, setup_django, test_database
+
+
+def _time(queryset, repeat):
+    samples = []
+    for _ in range(repeat):
+        with Timer() as t:
+            queryset.count()
+            list(queryset[:25])
+        samples.append(t.elapsed * 1000)
+    return statistics.median(samples)
+
+
+def run(audit_rows, repeat):
+    from django.db import connection
+
+    from benchmarks.seed import seed
+    from reports.forms import AuditLogFilterForm
+    from workflow.models import AuditAction, AuditLog
+
+    seed(users=500, documents=max(1000, audit_rows // 20), audit_rows=audit_rows)
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    base = AuditLog.objects.select_related("actor", "document").order_by("-created_at")
+    cases = [
+        (
+            "action",
+            base.filter(action__icontains="APPROVED"),
+            {"action": AuditAction.DOCUMENT_APPROVED},
+        ),
+        (
+            "actor",
+            base.filter(actor__username__icontains="user00042"),
+            {"actor": "user00042"},
+        ),
+        (
+            "document title",
+            None,
+            {"document": "Budget Vendor"},
+        ),
+        (
+            "action + date range",
+            base.filter(action__icontains="SUBMITTED", created_at__gte=datetime(2000, 1, 1, tzinfo=timezone.utc)),
+            {"action": AuditAction.DOCUMENT_SUBMITTED, "date_from": "2000-01-01", "date_to": "2100-01-01"},
+        ),
+    ]
+
+    rows = []
+    for name, old_qs, params in cases:
+        new_qs = AuditLogFilterForm(params).filter(base)
+        old_ms = f"{_time(old_qs, repeat):.1f}" if old_qs is not None else "n/a"
+        rows.append((name, old_ms, f"{_time(new_qs, repeat):.1f}"))
+
+    print(f"{connection.vendor}, {audit_rows:,} audit rows, median of {repeat}")
+    report(rows, headers=("search", "before ms", "after ms"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--audit-rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.audit_rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
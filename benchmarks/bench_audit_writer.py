@@ -0,0 +1,77 @@
+"""
+Compare the inline AuditLog insert path with the async audit writer.
+
+    python -m benchmarks.bench_audit_writer [--entries 5000] [--batch-size 500]
+
+Each entry is logged inside its own transaction, as the transition methods
+do. "hot path" is time spent on the request thread; "total" includes the
+writer's flush to the database.
+"""
+
+import argparse
+import tempfile
+
+from benchmarks.harness import Timer, report, setup_django, test_database
+
+
+def run(entries, batch_size):
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from django.test.utils import override_settings
+
+    from workflow.models import AuditAction, AuditLog, Document
+    from workflow.services import audit_writer
+    from workflow.services.audit_writer import AuditWriter
+
+    actor = User.objects.create_user(username="bench")
+    document = Document.objects.create(title="bench", content="", created_by=actor)
+
+    def log_many():
+        for _ in range(entries):
+            with transaction.atomic():
+                AuditLog.log(
+                    action=AuditAction.DOCUMENT_SUBMITTED,
+                    actor=actor,
+                    document=document,
+                )
+
+    with Timer() as sync:
+        log_many()
+
+    with tempfile.TemporaryDirectory() as spool, override_settings(AUDIT_ASYNC=True):
+        writer = AuditWriter(spool_dir=spool, batch_size=batch_size)
+        audit_writer._writer = writer
+        try:
+            with Timer() as hot:
+                log_many()
+            with Timer() as drain:
+                writer.flush()
+        finally:
+            audit_writer._writer = None
+
+    assert AuditLog.objects.count() == 2 * entries
+
+    total = hot.elapsed + drain.elapsed
+    report(
+        [
+            ("inline insert", f"{sync.elapsed * 1e6 / entries:.1f}", f"{entries / sync.elapsed:,.0f}"),
+            ("async (hot path)", f"{hot.elapsed * 1e6 / entries:.1f}", f"{entries / hot.elapsed:,.0f}"),
+            ("async (total)", f"{total * 1e6 / entries:.1f}", f"{entries / total:,.0f}"),
+        ],
+        headers=("path", "us/entry", "entries/s"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.entries, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
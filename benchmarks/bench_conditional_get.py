@@ -0,0 +1,115 @@
+"""
+Cost of a repeated visit to the document list, detail and audit pages,
+rendered in full and answered 304 Not Modified from their ETag.
+
+    python -m benchmarks.bench_conditional_get [--documents 2000] [--repeat 50]
+
+Requests go through the Django test client as an admin, who sees every
+document, the way a manager polling the pages would send them. The
+detail and audit pages show the seeded document with the most audit
+entries.
+"""
+
+import argparse
+import statistics
+
+from benchmarks.harness import Timer, percentile, report, setup_django, test_database
+
+PAGES = (
+    ("workflow:document-list", False),
+    ("workflow:document-detail", True),
+    ("workflow:document-audit-log", True),
+)
+
+
+def _busiest_document():
+    from django.db.models import Count
+
+    from workflow.models import AuditLog
+
+    return (
+        AuditLog.objects.exclude(document=None)
+        .values("document").annotate(n=Count("id")).order_by("-n")
+        .values_list("document", flat=True)[0]
+    )
+
+
+def measure(client, url, repeat, etag=None):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+    samples, queries, size = [], 0, 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx, Timer() as t:
+            response = client.get(url, **headers)
+        samples.append(t.elapsed * 1000)
+        queries = max(queries, len(ctx.captured_queries))
+        size = len(response.content)
+    return {
+        "status": response.status_code,
+        "p50_ms": statistics.median(samples),
+        "p95_ms": percentile(samples, 95),
+        "queries": queries,
+        "bytes": size,
+    }
+
+
+def run(repeat=50):
+    from django.contrib.auth.models import Group, User
+    from django.test import Client
+    from django.urls import reverse
+
+    admin = User.objects.create_user(username="bench_conditional", password="!")
+    admin.groups.add(Group.objects.get(name="Admin"))
+    client = Client()
+    client.force_login(admin)
+    document = _busiest_document()
+
+    results = []
+    for route, with_pk in PAGES:
+        url = reverse(route, args=[document] if with_pk else [])
+        # The first visit sets the CSRF cookie the ETag covers
+        client.get(url)
+        etag = client.get(url)["ETag"]
+        for mode, validator in (("full render", None), ("If-None-Match", etag)):
+            results.append({"page": route, "mode": mode, **measure(client, url, repeat, validator)})
+    return results
+
+
+def print_results(results):
+    report(
+        [
+            (
+                r["page"],
+                r["mode"],
+                r["status"],
+                r["queries"],
+                r["bytes"],
+                f"{r['p50_ms']:.1f}",
+                f"{r['p95_ms']:.1f}",
+            )
+            for r in results
+        ],
+        headers=("page", "request", "status", "queries", "bytes", "p50 ms", "p95 ms"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--audit-rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        from benchmarks.seed import seed
+
+        seed(args.users, args.documents, args.audit_rows)
+        print_results(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
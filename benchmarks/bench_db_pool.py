@@ -0,0 +1,168 @@
+"""
+Server connections and throughput of one threaded WSGI worker with
+persistent connections, per-request connections and a connection pool
+(settings.DB_POOL). PostgreSQL only.
+
+    python -m benchmarks.bench_db_pool [--requests 2000] [--threads 64]
+        [--pool-size 8] [--db-latency-ms 1]
+
+`--threads` clients replay the pages of benchmarks.bench_async_views
+through Django's WSGIHandler, each in its own thread as a worker thread
+would. A monitor samples pg_stat_activity every few milliseconds and
+reports the peak number of connections the run held on the server.
+
+`--db-latency-ms` adds a sleep before every query to stand in for the
+round trip to a database on another host.
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+from contextlib import contextmanager
+
+from benchmarks.bench_async_views import PAGES, _db_latency, _paths, run_wsgi
+from benchmarks.harness import percentile, report, setup_django, test_database
+
+SAMPLE_SECONDS = 0.005
+
+
+@contextmanager
+def _connection_mode(max_age=0, pool=None):
+    """Reconfigure `default` for the connections opened in the block."""
+    from django.db import connections
+
+    db_settings = connections.settings["default"]
+    saved = db_settings["CONN_MAX_AGE"], db_settings["CONN_HEALTH_CHECKS"], db_settings["OPTIONS"].get("pool")
+    connections.close_all()
+    db_settings["CONN_MAX_AGE"] = max_age
+    db_settings["CONN_HEALTH_CHECKS"] = bool(pool)
+    db_settings["OPTIONS"]["pool"] = pool
+    try:
+        yield
+    finally:
+        connections.close_all()
+        if pool:
+            connections["default"].close_pool()
+        db_settings["CONN_MAX_AGE"], db_settings["CONN_HEALTH_CHECKS"], db_settings["OPTIONS"]["pool"] = saved
+
+
+@contextmanager
+def _peak_connections(params):
+    """Yield a dict whose "peak" is the most server connections seen."""
+    import psycopg
+
+    result = {"peak": 0}
+    done = threading.Event()
+    monitor = psycopg.connect(**params, autocommit=True)
+
+    def sample():
+        # Every backend on the test database except the monitor itself
+        return monitor.execute(
+            "SELECT count(*) - 1 FROM pg_stat_activity WHERE datname = current_database()"
+        ).fetchone()[0]
+
+    def watch():
+        while not done.wait(SAMPLE_SECONDS):
+            result["peak"] = max(result["peak"], sample())
+
+    thread = threading.Thread(target=watch, name="connection-monitor")
+    thread.start()
+    try:
+        yield result
+    finally:
+        done.set()
+        thread.join()
+        monitor.close()
+
+
+def run(requests=2000, threads=64, pool_size=8, db_latency_ms=1.0, seed_value=0):
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    from benchmarks.seed import seed
+    from workflow.models import Document
+
+    seed(users=50, documents=2000, audit_rows=10000, seed_value=seed_value)
+    admin = User.objects.filter(groups__name="Admin").order_by("pk").first()
+    client = Client()
+    client.force_login(admin)
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    document_ids = list(Document.objects.order_by("pk").values_list("pk", flat=True)[:200])
+    paths = _paths(document_ids, requests)
+    warmup = paths[: len(PAGES) * 2]
+    params = {
+        key: value
+        for key, value in connections["default"].get_connection_params().items()
+        if key not in ("cursor_factory", "context")
+    }
+
+    modes = (
+        ("persistent (CONN_MAX_AGE=60)", {"max_age": 60}),
+        ("per request (CONN_MAX_AGE=0)", {"max_age": 0}),
+        (f"pool (max_size={pool_size})", {
+            "pool": {"min_size": min(2, pool_size), "max_size": pool_size, "timeout": 30.0},
+        }),
+    )
+    results = []
+    # Slow-request warnings would flood the report under load
+    with _db_latency(db_latency_ms / 1000), override_settings(REQUEST_SLOW_MS=0):
+        for mode, options in modes:
+            with _connection_mode(**options):
+                run_wsgi(warmup, cookie, 1, 1)
+                with _peak_connections(params) as connections_seen:
+                    wall, latencies, statuses = run_wsgi(paths, cookie, threads, threads)
+            results.append({
+                "mode": mode,
+                "peak_connections": connections_seen["peak"],
+                "rps": len(latencies) / wall,
+                "p50_ms": statistics.median(latencies) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "errors": sum(1 for s in statuses if s != 200),
+            })
+    return results
+
+
+def print_results(results, threads, db_latency_ms):
+    print(f"{threads} worker threads, {db_latency_ms} ms simulated query latency")
+    report(
+        [
+            (
+                r["mode"],
+                r["peak_connections"],
+                f"{r['rps']:.0f}",
+                f"{r['p50_ms']:.1f}",
+                f"{r['p95_ms']:.1f}",
+                r["errors"],
+            )
+            for r in results
+        ],
+        headers=("connections", "peak server connections", "req/s", "p50 ms", "p95 ms", "errors"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--db-latency-ms", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    if connection.vendor != "postgresql":
+        sys.exit("bench_db_pool needs PostgreSQL (DB_ENGINE=django.db.backends.postgresql).")
+    with test_database():
+        results = run(args.requests, args.threads, args.pool_size, args.db_latency_ms, args.seed)
+    print_results(results, args.threads, args.db_latency_ms)
+
+
+if __name__ == "__main__":
+    main()
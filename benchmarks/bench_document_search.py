@@ -0,0 +1,64 @@
+"""
+Full-text document search latency (PostgreSQL).
+
+    python -m benchmarks.bench_document_search [--documents 1000000]
+
+Seeds documents, builds their search vectors and times the first result
+page of DocumentSearchView's query (COUNT plus 20 ranked, highlighted
+rows) for an admin, who searches the whole table.
+"""
+
+import argparse
+import statistics
+
+from benchmarks.harness import Timer, report, setup_django, test_database
+
+QUERIES = ["budget", "vendor contract", "quarterly -payroll", '"security audit"']
+
+
+def run(documents, repeat):
+    from django.contrib.auth.models import User
+    from django.db import connection
+
+    from benchmarks.seed import seed
+    from workflow.services.document_search import rebuild_search_vectors, search_documents
+
+    if connection.vendor != "postgresql":
+        raise SystemExit("Full-text search benchmarks require PostgreSQL.")
+
+    seed(users=200, documents=documents, audit_rows=0)
+    with Timer() as indexing:
+        rebuild_search_vectors(chunk_size=2000)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE workflow_document")
+
+    admin = User.objects.filter(groups__name="Admin").first()
+
+    rows = []
+    for query in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            qs = search_documents(admin, query)
+            with Timer() as t:
+                total = qs.count()
+                list(qs[:20])
+            samples.append(t.elapsed * 1000)
+        rows.append((query, f"{total:,}", f"{statistics.median(samples):.1f}"))
+
+    print(f"{documents:,} documents, indexed in {indexing.elapsed:.1f}s, median of {repeat}")
+    report(rows, headers=("query", "matches", "ms"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.documents, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
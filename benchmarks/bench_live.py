@@ -0,0 +1,151 @@
+"""
+Idle cost and fan-out latency of the live event stream (workflow.live).
+
+    python -m benchmarks.bench_live [--connections 5000] [--rounds 20]
+
+Opens `--connections` event streams against `sse_application` in one
+event loop, as one ASGI worker would hold them. It then reports the
+memory per idle connection, the threads and DB connections left open,
+and how long a broadcast takes to reach every stream.
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import tracemalloc
+
+from benchmarks.harness import Timer, percentile, report, setup_django, test_database
+
+
+class _Stream:
+    """A client that stays connected until told to leave."""
+
+    def __init__(self, cookie, path, fanout):
+        self.scope = {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "headers": [(b"cookie", cookie.encode())],
+        }
+        self.leave = asyncio.Event()
+        self.status = None
+        self.fanout = fanout
+
+    async def receive(self):
+        await self.leave.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message.get("body", b"").startswith(b"event:"):
+            self.fanout.arrived()
+
+
+class _Fanout:
+    """Completes once every stream has received the current broadcast."""
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.count = 0
+        self.done = asyncio.Event()
+
+    def reset(self):
+        self.count = 0
+        self.done.clear()
+
+    def arrived(self):
+        self.count += 1
+        if self.count == self.expected:
+            self.done.set()
+
+
+async def _run(connections, rounds, cookie):
+    from django.conf import settings
+    from django.db import connections as db_connections
+
+    from workflow.live import broker, sse_application
+
+    fanout_done = _Fanout(connections)
+    streams = [_Stream(cookie, settings.LIVE_EVENTS_PATH, fanout_done) for _ in range(connections)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    with Timer() as connect:
+        tasks = [asyncio.ensure_future(sse_application(s.scope, s.receive, s.send)) for s in streams]
+        while len(broker) < connections:
+            await asyncio.sleep(0.01)
+            if any(s.status not in (None, 200) for s in streams):
+                raise RuntimeError(f"Stream rejected: {[s.status for s in streams if s.status != 200][:1]}")
+    idle_bytes = (tracemalloc.get_traced_memory()[0] - before) / connections
+    tracemalloc.stop()
+
+    open_db = sum(1 for c in db_connections.all(initialized_only=True) if c.connection is not None)
+
+    fanout = []
+    for _ in range(rounds):
+        fanout_done.reset()
+        with Timer() as t:
+            broker.publish_all(("counts", {"DRAFT": 1}))
+            await fanout_done.done.wait()
+        fanout.append(t.elapsed * 1000)
+
+    for s in streams:
+        s.leave.set()
+    await asyncio.gather(*tasks)
+
+    return {
+        "connections": connections,
+        "connect_s": connect.elapsed,
+        "idle_kib": idle_bytes / 1024,
+        "threads": threading.active_count(),
+        "open_db_connections": open_db,
+        "fanout_p50_ms": statistics.median(fanout),
+        "fanout_p95_ms": percentile(fanout, 95),
+    }
+
+
+def run(connections=5000, rounds=20):
+    from django.conf import settings
+    from django.contrib.auth.models import Group, User
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    manager = User.objects.create_user(username="bench_live", password="!")
+    manager.groups.add(Group.objects.get(name="Manager"))
+    client = Client()
+    client.force_login(manager)
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    with override_settings(LIVE_MAX_CONNECTIONS=connections, LIVE_HEARTBEAT_SECONDS=3600):
+        return asyncio.run(_run(connections, rounds, cookie))
+
+
+def print_results(r):
+    report(
+        [
+            ("connections", r["connections"]),
+            ("connect all (s)", f"{r['connect_s']:.2f}"),
+            ("memory per idle connection (KiB)", f"{r['idle_kib']:.1f}"),
+            ("threads", r["threads"]),
+            ("open DB connections", r["open_db_connections"]),
+            ("broadcast p50 (ms)", f"{r['fanout_p50_ms']:.1f}"),
+            ("broadcast p95 (ms)", f"{r['fanout_p95_ms']:.1f}"),
+        ],
+        headers=("measure", "value"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database(file_backed=True):
+        print_results(run(args.connections, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
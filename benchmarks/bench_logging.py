@@ -0,0 +1,160 @@
+"""
+Per-call overhead of a structured `workflow` log call, as the request
+thread sees it, with the synchronous StreamHandler and with
+BackgroundLogHandler.
+
+    python -m benchmarks.bench_logging [--calls 20000] [--sink-latency-ms 0 1]
+
+Each call logs the line RequestProfilingMiddleware writes per request.
+"before" is the previous JsonFormatter, which probed every known extra
+with hasattr(). The sink is /dev/null; `--sink-latency-ms` also makes
+every write to it sleep, standing in for a slow stdout or log collector.
+One run per value.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+from datetime import datetime
+
+from benchmarks.harness import percentile, report, setup_django
+
+EXTRA = {
+    "method": "GET",
+    "path": "/documents/",
+    "status": 200,
+    "latency_ms": 12.5,
+    "db_queries": 6,
+    "db_time_ms": 3.1,
+    "slowest_sql_ms": 1.2,
+    "slowest_sql": 'SELECT "workflow_document"."id" FROM "workflow_document" LIMIT 21',
+    "template_ms": 4.0,
+}
+
+PROBED_KEYS = (
+    "actor", "document", "action", "allowed", "failure", "latency_ms", "method", "path", "status",
+    "db_queries", "db_time_ms", "slowest_sql_ms", "slowest_sql", "template_ms",
+)
+
+
+class ProbingJsonFormatter(logging.Formatter):
+    """JsonFormatter as it was: one hasattr() per known extra."""
+
+    def format(self, record):
+        from workflow.middleware import get_correlation_id
+
+        log_record = {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": get_correlation_id(),
+        }
+        for key in PROBED_KEYS:
+            if hasattr(record, key):
+                log_record[key] = getattr(record, key)
+        return json.dumps(log_record)
+
+
+class SlowSink:
+    """/dev/null whose writes take `latency` seconds."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.file = open(os.devnull, "w")
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+
+def _handlers(sink):
+    from workflow.logging import BackgroundLogHandler, JsonFormatter
+
+    probing = logging.StreamHandler(sink)
+    probing.setFormatter(ProbingJsonFormatter())
+    sync = logging.StreamHandler(sink)
+    sync.setFormatter(JsonFormatter())
+    background = BackgroundLogHandler(stream=sink)
+    background.setFormatter(JsonFormatter())
+    return (
+        ("before: StreamHandler, hasattr probing", probing),
+        ("StreamHandler, key set", sync),
+        ("BackgroundLogHandler, key set", background),
+    )
+
+
+def measure(handler, calls):
+    """Return per-call seconds of `calls` logger.info() calls through `handler`."""
+    logger = logging.getLogger("workflow.bench")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    timings = []
+    try:
+        for number in range(calls):
+            start = time.perf_counter()
+            logger.info("Request finished %s", number, extra=EXTRA)
+            timings.append(time.perf_counter() - start)
+        handler.flush()
+    finally:
+        logger.handlers = []
+    return timings
+
+
+def run(calls=20000, sink_latencies=(0.0, 1.0)):
+    results = []
+    for latency_ms in sink_latencies:
+        sink = SlowSink(latency_ms / 1000)
+        # At 1 ms per write a synchronous handler would take minutes
+        count = calls if not latency_ms else min(calls, int(2000 / latency_ms))
+        for mode, handler in _handlers(sink):
+            timings = measure(handler, count)
+            results.append({
+                "mode": mode,
+                "sink_latency_ms": latency_ms,
+                "calls": count,
+                "mean_us": statistics.fmean(timings) * 1e6,
+                "p99_us": percentile(timings, 99) * 1e6,
+                "dropped": getattr(handler, "dropped", 0),
+            })
+            handler.close()
+    return results
+
+
+def print_results(results):
+    report(
+        [
+            (
+                r["mode"],
+                r["sink_latency_ms"],
+                r["calls"],
+                f"{r['mean_us']:.1f}",
+                f"{r['p99_us']:.1f}",
+                r["dropped"],
+            )
+            for r in results
+        ],
+        headers=("handler", "sink latency ms", "calls", "mean us/call", "p99 us/call", "dropped"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--sink-latency-ms", type=float, nargs="+", default=[0.0, 1.0])
+    args = parser.parse_args()
+
+    setup_django()
+    print_results(run(args.calls, args.sink_latency_ms))
+
+
+if __name__ == "__main__":
+    main()
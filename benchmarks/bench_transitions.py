@@ -0,0 +1,200 @@
+"""
+Concurrent submit/approve/reject traffic against the Document methods.
+
+    python -m benchmarks.bench_transitions [--threads 16] [--documents 200] [--contenders 3]
+
+Half the documents start as drafts and are submitted by their owner; the
+other half start submitted and are approved or rejected by managers.
+Every transition is attempted by `--contenders` threads at once, so all
+but one attempt per document should lose. Afterwards the run checks that
+each document moved exactly once and that the status counters still
+match the table.
+"""
+
+import argparse
+import queue
+import random
+import statistics
+import threading
+from collections import Counter, defaultdict
+
+from benchmarks.harness import Timer, percentile, report, setup_django, test_database
+
+
+def _create_users(owners, approvers):
+    from django.contrib.auth.models import Group, User
+
+    employee = Group.objects.get(name="Employee")
+    manager = Group.objects.get(name="Manager")
+    owner_users = []
+    for i in range(owners):
+        user = User.objects.create_user(username=f"race_owner{i}", password="!")
+        user.groups.add(employee)
+        owner_users.append(user)
+    approver_users = []
+    for i in range(approvers):
+        user = User.objects.create_user(username=f"race_manager{i}", password="!")
+        user.groups.add(manager)
+        approver_users.append(user)
+    return owner_users, approver_users
+
+
+def _plan(documents, contenders, owners, approvers, rng):
+    """Create the target rows and return the shuffled task list."""
+    from workflow.models import Document
+
+    tasks = []
+    drafts, submitted = [], []
+    for i in range(documents):
+        owner = owners[i % len(owners)]
+        status = Document.Status.DRAFT if i % 2 == 0 else Document.Status.SUBMITTED
+        document = Document.objects.create(
+            title=f"Race {i}", content="<p>race</p>", created_by=owner, status=status
+        )
+        if status == Document.Status.DRAFT:
+            drafts.append(document.pk)
+            tasks.extend(("submit", document.pk, owner.pk) for _ in range(contenders))
+        else:
+            submitted.append(document.pk)
+            decision = rng.choice(("approve", "reject"))
+            tasks.extend(
+                (decision, document.pk, rng.choice(approvers).pk) for _ in range(contenders)
+            )
+    rng.shuffle(tasks)
+    return tasks, drafts, submitted
+
+
+def _worker(tasks, samples, outcomes, lock):
+    from django.contrib.auth.models import User
+    from django.db import connections
+
+    from workflow.models import Document
+
+    users = {}
+    try:
+        while True:
+            try:
+                action, document_id, user_id = tasks.get_nowait()
+            except queue.Empty:
+                return
+            if user_id not in users:
+                users[user_id] = User.objects.get(pk=user_id)
+            with Timer() as t:
+                try:
+                    document = Document.objects.get(pk=document_id)
+                    getattr(document, action)(users[user_id])
+                    outcome = "ok"
+                except Exception as e:
+                    outcome = type(e).__name__
+            with lock:
+                samples[action].append(t.elapsed * 1000)
+                outcomes[outcome] += 1
+    finally:
+        connections.close_all()
+
+
+def verify(drafts, submitted):
+    """Invariant violations after the run, as `{name: count}`."""
+    from django.db.models import Count
+
+    from workflow.models import ApprovalStep, AuditAction, AuditLog, Document
+    from workflow.services.status_summary import check_status_counter_drift
+
+    violations = {}
+
+    not_submitted = Document.objects.filter(pk__in=drafts).exclude(status=Document.Status.SUBMITTED).count()
+    undecided = Document.objects.filter(pk__in=submitted).exclude(
+        status__in=(Document.Status.APPROVED, Document.Status.REJECTED)
+    ).count()
+    violations["unfinished_transitions"] = not_submitted + undecided
+
+    steps = Counter(
+        ApprovalStep.objects.filter(document_id__in=submitted).values_list("document_id", flat=True)
+    )
+    violations["duplicate_decisions"] = sum(n - 1 for n in steps.values() if n > 1)
+
+    audit = (
+        AuditLog.objects.filter(
+            document_id__in=drafts + submitted,
+            action__in=(
+                AuditAction.DOCUMENT_SUBMITTED,
+                AuditAction.DOCUMENT_APPROVED,
+                AuditAction.DOCUMENT_REJECTED,
+            ),
+        )
+        .values("document_id")
+        .annotate(n=Count("id"))
+    )
+    violations["duplicate_audit_entries"] = sum(row["n"] - 1 for row in audit if row["n"] > 1)
+
+    violations["status_counter_drift"] = len(check_status_counter_drift())
+    return violations
+
+
+def run(threads=16, documents=200, contenders=3, seed_value=0):
+    """
+    Race the transitions and return throughput, latency per action,
+    attempt outcomes and invariant violations.
+    """
+    rng = random.Random(seed_value)
+    owners, approvers = _create_users(owners=max(1, threads // 4), approvers=max(2, threads // 2))
+    task_list, drafts, submitted = _plan(documents, contenders, owners, approvers, rng)
+
+    tasks = queue.Queue()
+    for task in task_list:
+        tasks.put(task)
+    samples = defaultdict(list)
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    workers = [
+        threading.Thread(target=_worker, args=(tasks, samples, outcomes, lock))
+        for _ in range(threads)
+    ]
+    with Timer() as wall:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    return {
+        "attempts": len(task_list),
+        "throughput_per_s": round(len(task_list) / wall.elapsed, 1),
+        "latency": {
+            action: {
+                "p50_ms": round(statistics.median(values), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+            }
+            for action, values in sorted(samples.items())
+        },
+        "outcomes": dict(sorted(outcomes.items())),
+        "violations": verify(drafts, submitted),
+    }
+
+
+def print_results(results):
+    print(f"{results['attempts']} attempts, {results['throughput_per_s']} attempts/s")
+    report(
+        [(a, f"{r['p50_ms']:.1f}", f"{r['p95_ms']:.1f}") for a, r in results["latency"].items()],
+        headers=("action", "p50 ms", "p95 ms"),
+    )
+    print()
+    report(list(results["outcomes"].items()), headers=("outcome", "attempts"))
+    print()
+    report(list(results["violations"].items()), headers=("invariant", "violations"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--contenders", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database(file_backed=True):
+        print_results(run(args.threads, args.documents, args.contenders))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Latency and query counts for every route in workflow/urls.py and reports/urls.py.
+
+    python -m benchmarks.bench_urls [--documents 2000] [--repeat 20]
+
+Each route is requested through the Django test client as a user with the
+role it needs. Mutating routes get a fresh target document per request,
+created outside the timed section. `check_coverage()` fails when a named
+route has no scenario, so new URLs cannot slip past the suite.
+"""
+
+import argparse
+import statistics
+
+from benchmarks.harness import Timer, percentile, report, setup_django, test_database
+
+NAMESPACES = ("workflow", "reports")
+
+
+class Scenario:
+    """
+    One request shape for a named route.
+
+    `target` picks the document passed as `pk`: "draft" or "submitted"
+    reuse one shared document, "new-draft"/"new-submitted" create one per
+    request (for routes that change its status). `settings` are overridden
+    and `headers` sent for each request.
+    """
+
+    def __init__(
+        self, route, role, method="GET", target=None, params=None, expect=200, settings=None, headers=None
+    ):
+        self.route = route
+        self.role = role
+        self.method = method
+        self.target = target
+        self.params = params or {}
+        self.expect = expect
+        self.settings = settings or {}
+        self.headers = headers or {}
+
+    @property
+    def key(self):
+        return f"{self.method} {self.route}"
+
+
+SCENARIOS = [
+    Scenario("workflow:home", "employee", expect=302),
+    Scenario(
+        "workflow:metrics",
+        "admin",
+        settings={"METRICS_TOKEN": "bench"},
+        headers={"Authorization": "Bearer bench"},
+    ),
+    Scenario("workflow:dashboard", "manager"),
+    Scenario("workflow:document-list", "employee"),
+    Scenario("workflow:document-search", "employee", params={"q": "budget"}),
+    Scenario("workflow:document-create", "employee"),
+    Scenario(
+        "workflow:document-create",
+        "employee",
+        method="POST",
+        params={"title": "Bench document", "content": "<p>Bench body</p>"},
+        expect=302,
+    ),
+    Scenario("workflow:document-detail", "manager", target="submitted"),
+    Scenario("workflow:document-edit", "employee", target="draft"),
+    Scenario("workflow:document-submit", "employee", method="POST", target="new-draft", expect=302),
+    Scenario("workflow:manager-document-list", "manager"),
+    Scenario(
+        "workflow:document-bulk-decision",
+        "manager",
+        method="POST",
+        target="new-submitted",
+        params={"decision": "approve"},
+        expect=302,
+    ),
+    Scenario("workflow:document-approve", "manager", method="POST", target="new-submitted", expect=302),
+    Scenario("workflow:document-reject", "manager", method="POST", target="new-submitted", expect=302),
+    Scenario("workflow:document-audit-log", "manager", target="submitted"),
+    Scenario("reports:audit-log-list", "admin"),
+    Scenario("reports:audit-log-export", "admin", params={"format": "csv"}),
+    Scenario("reports:document-export", "admin", params={"format": "jsonl", "gzip": "1"}),
+]
+
+
+def named_routes():
+    """Every `namespace:name` defined by the benchmarked URLconfs."""
+    from django.urls import get_resolver
+
+    names = set()
+    for pattern in get_resolver().url_patterns:
+        namespace = getattr(pattern, "namespace", None)
+        if namespace in NAMESPACES:
+            names.update(
+                f"{namespace}:{p.name}" for p in pattern.url_patterns if p.name
+            )
+    return names
+
+
+def check_coverage(scenarios=SCENARIOS):
+    """Return the routes with no scenario (empty when fully covered)."""
+    return sorted(named_routes() - {s.route for s in scenarios})
+
+
+def create_users():
+    """One user per role, outside the seeded `userNNNNNN` population."""
+    from django.contrib.auth.models import Group, User
+
+    users = {}
+    for role, group in (("employee", "Employee"), ("manager", "Manager"), ("admin", "Admin")):
+        user = User.objects.create_user(username=f"bench_{role}", password="!")
+        user.groups.add(Group.objects.get(name=group))
+        users[role] = user
+    return users
+
+
+class _Targets:
+    def __init__(self, owner):
+        from workflow.models import Document
+
+        self.owner = owner
+        self.shared = {
+            "draft": self._create(Document.Status.DRAFT),
+            "submitted": self._create(Document.Status.SUBMITTED),
+        }
+
+    def _create(self, status):
+        from workflow.models import Document
+
+        return Document.objects.create(
+            title="Bench target",
+            content="<p>Bench target body</p>",
+            created_by=self.owner,
+            status=status,
+        )
+
+    def get(self, target):
+        from workflow.models import Document
+
+        if target in self.shared:
+            return self.shared[target]
+        status = Document.Status.DRAFT if target == "new-draft" else Document.Status.SUBMITTED
+        return self._create(status)
+
+
+def _request(client, scenario, document):
+    from django.test import override_settings
+    from django.urls import reverse
+
+    kwargs = {}
+    params = dict(scenario.params)
+    if document is not None:
+        if scenario.route == "workflow:document-bulk-decision":
+            params["document_ids"] = [document.pk]
+        else:
+            kwargs["pk"] = document.pk
+    url = reverse(scenario.route, kwargs=kwargs)
+
+    with override_settings(**scenario.settings):
+        if scenario.method == "POST":
+            response = client.post(url, params, headers=scenario.headers)
+        else:
+            response = client.get(url, params, headers=scenario.headers)
+        if response.streaming:
+            b"".join(response.streaming_content)
+    return response
+
+
+def run(repeat=20, warmup=2, scenarios=SCENARIOS):
+    """
+    Benchmark every scenario against the current database.
+    Returns `{scenario key: {"p50_ms", "p95_ms", "queries", "status"}}`.
+    """
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    missing = check_coverage(scenarios)
+    if missing:
+        raise RuntimeError(f"Routes without a benchmark scenario: {', '.join(missing)}")
+
+    users = create_users()
+    targets = _Targets(owner=users["employee"])
+    clients = {}
+    for role, user in users.items():
+        clients[role] = Client()
+        clients[role].force_login(user)
+
+    results = {}
+    for scenario in scenarios:
+        client = clients[scenario.role]
+        samples = []
+        queries = 0
+        for i in range(warmup + repeat):
+            document = targets.get(scenario.target) if scenario.target else None
+            with CaptureQueriesContext(connection) as ctx, Timer() as t:
+                response = _request(client, scenario, document)
+            if response.status_code != scenario.expect:
+                raise RuntimeError(
+                    f"{scenario.key} returned {response.status_code}, expected {scenario.expect}"
+                )
+            if i >= warmup:
+                samples.append(t.elapsed * 1000)
+                queries = max(queries, len(ctx.captured_queries))
+
+        results[scenario.key] = {
+            "p50_ms": round(statistics.median(samples), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "queries": queries,
+            "status": scenario.expect,
+        }
+    return results
+
+
+def print_results(results):
+    report(
+        [(key, r["status"], r["queries"], f"{r['p50_ms']:.1f}", f"{r['p95_ms']:.1f}") for key, r in results.items()],
+        headers=("route", "status", "queries", "p50 ms", "p95 ms"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--audit-rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        from benchmarks.seed import seed
+
+        seed(args.users, args.documents, args.audit_rows)
+        print_results(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
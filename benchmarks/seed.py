@@ -0,0 +1,131 @@
+"""
+Synthetic data generator for benchmarks.
+
+    python -m benchmarks.seed --users 200 --documents 100000 --audit-rows 1000000
+
+Seeds into whatever database the settings point at (the benchmark scripts
+call `seed()` inside a throw-away test database). Rows are inserted with
+`bulk_create` in batches, with deterministic pseudo-random content.
+"""
+
+import argparse
+import random
+from datetime import timedelta
+
+BATCH_SIZE = 5000
+WORDS = (
+    "budget policy travel invoice contract quarterly annual review vendor "
+    "payroll hiring security audit compliance marketing roadmap proposal"
+).split()
+
+
+def _title(rng):
+    return " ".join(rng.choice(WORDS).title() for _ in range(3))
+
+
+def seed(users=50, documents=5000, audit_rows=20000, days=730, seed_value=0, verbose=False):
+    """
+    Create users in the default groups, documents in every status and
+    audit rows spread over the last `days` days.
+    Returns `(users, document_ids)`.
+    """
+    from django.contrib.auth.models import Group, User
+    from django.db import connection
+    from django.utils import timezone
+
+    from workflow import partitioning
+    from workflow.models import AuditAction, AuditLog, Document, DocumentBody
+    from workflow.services.approval_inbox import rebuild_inbox
+    from workflow.services.document_render import render_documents
+    from workflow.services.status_summary import rebuild_status_counters
+
+    rng = random.Random(seed_value)
+    now = timezone.now()
+
+    groups = {g.name: g for g in Group.objects.all()}
+    User.objects.bulk_create(
+        User(username=f"user{i:06d}", password="!") for i in range(users)
+    )
+    created_users = list(User.objects.filter(username__startswith="user").order_by("pk"))
+    Membership = User.groups.through
+    roles = ["Employee"] * 8 + ["Manager"] * 2 + ["Admin"]
+    Membership.objects.bulk_create(
+        Membership(user_id=u.pk, group_id=groups[rng.choice(roles)].pk)
+        for u in created_users
+    )
+
+    if partitioning.is_supported(connection) and partitioning.is_partitioned(connection):
+        for start in partitioning.month_range(now - timedelta(days=days), now):
+            partitioning.create_partition(connection, start)
+
+    statuses = Document.Status.values
+    document_ids = []
+    for offset in range(0, documents, BATCH_SIZE):
+        batch = [
+            Document(
+                title=_title(rng),
+                content=f"<p>{_title(rng)}</p>",
+                status=rng.choice(statuses),
+                created_by=rng.choice(created_users),
+            )
+            for _ in range(min(BATCH_SIZE, documents - offset))
+        ]
+        created = Document.objects.bulk_create(batch)
+        DocumentBody.objects.bulk_create(d.body for d in created)
+        document_ids.extend(d.pk for d in created)
+        if verbose:
+            print(f"documents: {len(document_ids)}/{documents}")
+
+    # bulk_create bypasses the post_save counter hook and Document.save()
+    rebuild_status_counters()
+    render_documents(only_missing=True)
+
+    # auto_now_add stamps every row with "now"; spread them over the window
+    if document_ids:
+        step = max(1, len(document_ids) // days)
+        for day in range(days):
+            chunk = document_ids[day * step:(day + 1) * step]
+            if not chunk:
+                break
+            Document.objects.filter(pk__in=chunk).update(created_at=now - timedelta(days=days - day))
+
+    # Like the counters, the approval inbox is filled by per-row hooks
+    rebuild_inbox()
+
+    actions = AuditAction.values
+    written = 0
+    while written < audit_rows:
+        size = min(BATCH_SIZE, audit_rows - written)
+        AuditLog.objects.bulk_create(
+            AuditLog(
+                action=rng.choice(actions),
+                actor=rng.choice(created_users),
+                document_id=rng.choice(document_ids) if document_ids else None,
+                created_at=now - timedelta(seconds=rng.randrange(days * 86400)),
+            )
+            for _ in range(size)
+        )
+        written += size
+        if verbose:
+            print(f"audit rows: {written}/{audit_rows}")
+
+    return created_users, document_ids
+
+
+def main():
+    from benchmarks.harness import setup_django
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--audit-rows", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    seed(args.users, args.documents, args.audit_rows, args.days, args.seed, verbose=True)
+
+
+if __name__ == "__main__":
+    main()
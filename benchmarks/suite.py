@@ -0,0 +1,114 @@
+"""
+Run the whole benchmark suite and check it against the stored baseline.
+
+    python -m benchmarks.suite                   # run, compare, exit 1 on regressions
+    python -m benchmarks.suite --update-baseline # run and record a new baseline
+
+Seeds a throw-away database (see `benchmarks.seed`), times every route
+(`benchmarks.bench_urls`), races the transitions with worker threads
+(`benchmarks.bench_transitions`) and compares the results with
+`benchmarks/baselines/<vendor>.json`. Works on SQLite and PostgreSQL;
+nothing else needs to be running.
+"""
+
+import argparse
+import sys
+
+from benchmarks import baseline
+from benchmarks.harness import setup_django, test_database
+
+
+def run(args):
+    from django.db import connection
+
+    from benchmarks import bench_transitions, bench_urls
+    from benchmarks.seed import seed
+    from workflow.services.document_search import rebuild_search_vectors
+
+    seed(args.users, args.documents, args.audit_rows, seed_value=args.seed)
+    rebuild_search_vectors()
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    urls = bench_urls.run(repeat=args.repeat)
+    bench_urls.print_results(urls)
+    print()
+
+    transitions = bench_transitions.run(
+        threads=args.threads,
+        documents=args.race_documents,
+        contenders=args.contenders,
+        seed_value=args.seed,
+    )
+    bench_transitions.print_results(transitions)
+    print()
+
+    return {
+        "vendor": connection.vendor,
+        "parameters": {
+            "users": args.users,
+            "documents": args.documents,
+            "audit_rows": args.audit_rows,
+            "repeat": args.repeat,
+            "threads": args.threads,
+            "race_documents": args.race_documents,
+            "contenders": args.contenders,
+        },
+        "urls": urls,
+        "transitions": transitions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--audit-rows", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--race-documents", type=int, default=200)
+    parser.add_argument("--contenders", type=int, default=3)
+    parser.add_argument("--baseline", help="Baseline JSON; defaults to benchmarks/baselines/<vendor>.json.")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed fractional slowdown.")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="Allowed absolute slowdown.")
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database(file_backed=True):
+        results = run(args)
+
+    path = args.baseline or baseline.baseline_path(results["vendor"])
+    if args.output:
+        baseline.save(args.output, results)
+    if args.update_baseline:
+        baseline.save(path, results)
+        print(f"Baseline written to {path}.")
+        return 0
+
+    stored = baseline.load(path)
+    if stored is None:
+        print(f"No baseline at {path}; run with --update-baseline to record one.")
+        return 0
+    if stored["parameters"] != results["parameters"]:
+        print("Warning: baseline was recorded with different parameters.")
+
+    violations = {k: v for k, v in results["transitions"]["violations"].items() if v}
+    if violations:
+        print(f"Warning: transition invariants violated: {violations}")
+
+    regressions = baseline.compare(results, stored, args.tolerance, args.slack_ms)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {path}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"No regressions against {path}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +44,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "workflow.middleware.CorrelationIdMiddleware",
+    "workflow.middleware.RequestProfilingMiddleware",
+    "workflow.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -91,6 +93,55 @@ DATABASES = {
     }
 }
 
+# Connection pooling (PostgreSQL only; workflow.db_pool). Instead of one
+# persistent connection per thread, each process keeps a pool of
+# DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections per alias that requests
+# check out and give back, waiting up to DB_POOL_TIMEOUT seconds for a free
+# one. PostgreSQL then sees at most processes x DB_POOL_MAX_SIZE
+# connections however many threads each runs. Connections are checked on
+# checkout (DB_POOL_CHECK), closed once idle for DB_POOL_MAX_IDLE seconds
+# above the minimum, and replaced after DB_POOL_MAX_LIFETIME seconds, with
+# jitter so they do not all reconnect at once.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+if DB_POOL and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"].update({
+        # Pooled connections go back to the pool at the end of each request
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": config('DB_POOL_CHECK', default=True, cast=bool),
+        "OPTIONS": {
+            "pool": {
+                "min_size": config('DB_POOL_MIN_SIZE', default=2, cast=int),
+                "max_size": config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                "timeout": config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+                "max_idle": config('DB_POOL_MAX_IDLE', default=600.0, cast=float),
+                "max_lifetime": config('DB_POOL_MAX_LIFETIME', default=3600.0, cast=float),
+            },
+        },
+    })
+# Seconds between pool statistics lines in the `workflow.db` log; 0 disables
+DB_POOL_STATS_INTERVAL = config('DB_POOL_STATS_INTERVAL', default=60.0, cast=float)
+
+# Read replicas (workflow.db_router): comma-separated `host[:port]` of
+# copies of the primary, reached with the same name and credentials. Pages
+# that only read use them; after a write, that browser reads from the
+# primary for REPLICA_PIN_SECONDS. With SQLite, any host names a second
+# connection to the same file, which is enough to try the routing locally.
+# Replicas share the primary's pool settings, each with a pool of its own.
+DATABASE_REPLICAS = []
+for number, address in enumerate(config('DB_REPLICAS', default="", cast=Csv()), 1):
+    host, _, port = address.partition(":")
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        # Tests read from the primary's test database
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{number}")
+
+DATABASE_ROUTERS = ["workflow.db_router.ReplicaRouter"]
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -138,6 +189,44 @@ LOGOUT_REDIRECT_URL = "/accounts/login/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Cache (workflow.cache). Each process keeps up to CACHE_LOCAL_MAX_ENTRIES
+# entries for at most CACHE_LOCAL_TIMEOUT seconds in front of the shared
+# "shared" cache, a directory on the host by default. Point
+# CACHE_SHARED_BACKEND/CACHE_SHARED_LOCATION at e.g. Redis to share it
+# between hosts.
+CACHES = {
+    "default": {
+        "BACKEND": "workflow.cache.TieredCache",
+        "LOCATION": "shared",
+        "TIMEOUT": config('CACHE_TIMEOUT', default=300, cast=int),
+        "OPTIONS": {
+            "LOCAL_MAX_ENTRIES": config('CACHE_LOCAL_MAX_ENTRIES', default=1000, cast=int),
+            "LOCAL_TIMEOUT": config('CACHE_LOCAL_TIMEOUT', default=5.0, cast=float),
+        },
+    },
+    "shared": {
+        "BACKEND": config('CACHE_SHARED_BACKEND', default="django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": config('CACHE_SHARED_LOCATION', default=str(BASE_DIR / "var" / "cache")),
+        "TIMEOUT": config('CACHE_TIMEOUT', default=300, cast=int),
+    },
+}
+
+# Seconds to cache a user's group names across requests (0 = per-request only).
+# Membership and group changes invalidate the shared entry; other workers
+# may serve the old names for up to CACHE_LOCAL_TIMEOUT seconds.
+ROLE_CACHE_TIMEOUT = config('ROLE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Asynchronous audit pipeline (workflow.services.audit_writer).
+# Off by default: AuditLog rows are inserted inside the transition transaction.
+AUDIT_ASYNC = config('AUDIT_ASYNC', default=False, cast=bool)
+AUDIT_BATCH_SIZE = config('AUDIT_BATCH_SIZE', default=500, cast=int)
+AUDIT_FLUSH_INTERVAL = config('AUDIT_FLUSH_INTERVAL', default=1.0, cast=float)
+AUDIT_SPOOL_DIR = config('AUDIT_SPOOL_DIR', default=str(BASE_DIR / "var" / "audit-spool"))
+AUDIT_SPOOL_FSYNC = config('AUDIT_SPOOL_FSYNC', default=False, cast=bool)
+
+# Cold storage for retired AuditLog partitions (manage.py audit_partitions --archive).
+AUDIT_ARCHIVE_DIR = config('AUDIT_ARCHIVE_DIR', default=str(BASE_DIR / "var" / "audit-archive"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -151,13 +240,58 @@ LOGGING = {
             "class": "logging.StreamHandler",
             "formatter": "json",
         },
+        # Formats and writes on a background thread (workflow.logging)
+        "background_json": {
+            "()": "workflow.logging.BackgroundLogHandler",
+            "formatter": "json",
+            "queue_size": config('LOG_QUEUE_SIZE', default=10000, cast=int),
+            "batch_size": config('LOG_BATCH_SIZE', default=256, cast=int),
+            "flush_interval": config('LOG_FLUSH_INTERVAL', default=0.5, cast=float),
+            "console": config('LOG_CONSOLE', default=True, cast=bool),
+            "file_path": config('LOG_FILE', default=""),
+            "file_max_bytes": config('LOG_FILE_MAX_BYTES', default=100 * 1024 * 1024, cast=int),
+            "file_rotate_seconds": config('LOG_FILE_ROTATE_SECONDS', default=86400, cast=int),
+            "file_backup_count": config('LOG_FILE_BACKUP_COUNT', default=7, cast=int),
+        },
     },
     "loggers": {
         # (Optional) future-proof entire workflow package
         "workflow": {
-            "handlers": ["console_json"],
+            # LOG_ASYNC=False writes on the logging thread, as before
+            "handlers": ["background_json" if config('LOG_ASYNC', default=True, cast=bool) else "console_json"],
             "level": "INFO",
             "propagate": False,
         },
     },
 }
+
+# Request profiling (workflow.middleware.RequestProfilingMiddleware).
+# Fraction of requests logged to `workflow.request`; slower ones always are.
+REQUEST_PROFILING_SAMPLE_RATE = config('REQUEST_PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+REQUEST_SLOW_MS = config('REQUEST_SLOW_MS', default=1000, cast=int)
+
+# Metrics exposed on /metrics (workflow.metrics). Point METRICS_DIR at a
+# directory shared by all worker processes to aggregate across them.
+# Scrapes must send "Authorization: Bearer <METRICS_TOKEN>"; without a
+# token the endpoint answers 403 unless DEBUG is on.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default="")
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5.0, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default="")
+
+# Server-sent events for the approval queue and dashboard (workflow.live),
+# served by rbaw_project/asgi.py only.
+LIVE_EVENTS_PATH = config('LIVE_EVENTS_PATH', default="/live/events/")
+LIVE_MAX_CONNECTIONS = config('LIVE_MAX_CONNECTIONS', default=10000, cast=int)
+LIVE_QUEUE_SIZE = config('LIVE_QUEUE_SIZE', default=256, cast=int)
+LIVE_HEARTBEAT_SECONDS = config('LIVE_HEARTBEAT_SECONDS', default=20.0, cast=float)
+
+# Answer repeated GETs of the document list, detail and audit pages with
+# 304 Not Modified while nothing they show has changed
+# (workflow.mixins.ConditionalGetMixin).
+CONDITIONAL_GET = config('CONDITIONAL_GET', default=True, cast=bool)
+
+# Serve the document list, detail, audit and dashboard pages from their
+# async views. Only worth it under ASGI with a slow database link (see
+# benchmarks.bench_async_views); otherwise the sync views are faster.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
@@ -0,0 +1,81 @@
+from datetime import datetime, time, timedelta
+
+from django import forms
+from django.utils.timezone import make_aware
+
+from workflow.models import AuditAction, Document
+
+
+def _filter_dates(queryset, data):
+    """Inclusive calendar-day bounds on `created_at`."""
+    if data.get("date_from"):
+        start = make_aware(datetime.combine(data["date_from"], time.min))
+        queryset = queryset.filter(created_at__gte=start)
+
+    if data.get("date_to"):
+        end = make_aware(datetime.combine(data["date_to"] + timedelta(days=1), time.min))
+        queryset = queryset.filter(created_at__lt=end)
+
+    return queryset
+
+
+class AuditLogFilterForm(forms.Form):
+    """
+    Filters for the audit report (and anything that reuses them).
+
+    `action` is an exact match on `AuditAction`; `actor` and `document`
+    are substring matches backed by trigram indexes on PostgreSQL
+    (see workflow migration 0007). Dates are inclusive calendar days.
+    """
+
+    action = forms.ChoiceField(
+        choices=[("", "Any action"), *AuditAction.choices],
+        required=False,
+    )
+    actor = forms.CharField(required=False, max_length=150)
+    document = forms.CharField(required=False, max_length=255)
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+    def filter(self, queryset):
+        """
+        Apply the valid filters to an AuditLog queryset.
+        Invalid values are ignored rather than raising, as before.
+        """
+        self.is_valid()
+        data = self.cleaned_data
+
+        if data.get("action"):
+            queryset = queryset.filter(action=data["action"])
+
+        if data.get("actor"):
+            queryset = queryset.filter(actor__username__icontains=data["actor"])
+
+        if data.get("document"):
+            queryset = queryset.filter(document__title__icontains=data["document"])
+
+        return _filter_dates(queryset, data)
+
+
+class DocumentFilterForm(forms.Form):
+    """Filters for document exports, mirroring the audit report's."""
+
+    status = forms.ChoiceField(
+        choices=[("", "Any status"), *Document.Status.choices],
+        required=False,
+    )
+    owner = forms.CharField(required=False, max_length=150)
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+    def filter(self, queryset):
+        self.is_valid()
+        data = self.cleaned_data
+
+        if data.get("status"):
+            queryset = queryset.filter(status=data["status"])
+
+        if data.get("owner"):
+            queryset = queryset.filter(created_by__username__icontains=data["owner"])
+
+        return _filter_dates(queryset, data)
@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports import exports
+from reports.forms import AuditLogFilterForm, DocumentFilterForm
+from workflow.models import AuditLog, Document
+
+TARGETS = {
+    "audit": (AuditLog, AuditLogFilterForm, exports.audit_log_rows),
+    "documents": (Document, DocumentFilterForm, exports.document_rows),
+}
+
+
+class Command(BaseCommand):
+    help = "Stream audit logs or documents to a CSV/JSONL file (or stdout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", choices=sorted(TARGETS))
+        parser.add_argument("--format", choices=exports.FORMATS, default="csv")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--output", "-o", help="File path; defaults to stdout.")
+        parser.add_argument("--date-from", help="YYYY-MM-DD, inclusive.")
+        parser.add_argument("--date-to", help="YYYY-MM-DD, inclusive.")
+        parser.add_argument("--action", help="Audit exports only.")
+        parser.add_argument("--actor", help="Audit exports only.")
+        parser.add_argument("--status", help="Document exports only.")
+        parser.add_argument("--owner", help="Document exports only.")
+
+    def handle(self, *args, **options):
+        model, form_class, rows_for = TARGETS[options["target"]]
+
+        form = form_class({
+            name: options.get(name)
+            for name in form_class.base_fields
+            if options.get(name)
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+
+        header, rows = rows_for(form.filter(model.objects.all()))
+        body = exports.iter_bytes(
+            exports.encode(header, rows, options["format"]), options["gzip"]
+        )
+
+        if options["output"]:
+            with open(options["output"], "wb") as fh:
+                for chunk in body:
+                    fh.write(chunk)
+            self.stderr.write(f"Wrote {options['output']}.")
+        else:
+            for chunk in body:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
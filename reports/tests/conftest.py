@@ -0,0 +1,2 @@
+# Reuse the workflow user/document fixtures.
+from workflow.tests.conftest import *  # noqa: F401,F403
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from workflow.models import AuditAction, AuditLog, Document
+
+
+@pytest.fixture
+def audit_rows(db, employee, manager):
+    doc = Document.objects.create(title="Quarterly Budget", content="c", created_by=employee)
+    other = Document.objects.create(title="Travel Policy", content="c", created_by=employee)
+    now = timezone.now()
+    rows = [
+        AuditLog(action=AuditAction.DOCUMENT_CREATED, actor=employee, document=doc, created_at=now - timedelta(days=10)),
+        AuditLog(action=AuditAction.DOCUMENT_SUBMITTED, actor=employee, document=doc, created_at=now - timedelta(days=5)),
+        AuditLog(action=AuditAction.DOCUMENT_APPROVED, actor=manager, document=doc, created_at=now),
+        AuditLog(action=AuditAction.DOCUMENT_CREATED, actor=employee, document=other, created_at=now),
+    ]
+    return AuditLog.objects.bulk_create(rows)
+
+
+def _search(client, **params):
+    resp = client.get(reverse("reports:audit-log-list"), params)
+    assert resp.status_code == 200
+    return list(resp.context["logs"])
+
+
+@pytest.mark.django_db
+def test_action_filter_is_exact(client_logged_in, admin, audit_rows):
+    client = client_logged_in(admin)
+    logs = _search(client, action=AuditAction.DOCUMENT_CREATED)
+    assert {log.action for log in logs} == {AuditAction.DOCUMENT_CREATED}
+    assert len(logs) == 2
+
+    # Free-text fragments no longer match partially; invalid values are ignored
+    assert len(_search(client, action="CREATED")) == 4
+
+
+@pytest.mark.django_db
+def test_actor_and_document_title_search(client_logged_in, admin, audit_rows):
+    client = client_logged_in(admin)
+    assert {log.action for log in _search(client, actor="MANAG")} == {AuditAction.DOCUMENT_APPROVED}
+    assert {log.document.title for log in _search(client, document="budget")} == {"Quarterly Budget"}
+
+
+@pytest.mark.django_db
+def test_date_range_is_inclusive(client_logged_in, admin, audit_rows):
+    client = client_logged_in(admin)
+    today = timezone.localdate()
+    week_ago = today - timedelta(days=7)
+
+    logs = _search(client, date_from=week_ago.isoformat(), date_to=today.isoformat())
+    assert len(logs) == 3
+
+    logs = _search(client, date_to=week_ago.isoformat())
+    assert [log.action for log in logs] == [AuditAction.DOCUMENT_CREATED]
+
+
+@pytest.mark.django_db
+def test_pagination_links_keep_filters(client_logged_in, admin, employee):
+    for _ in range(30):
+        AuditLog.log(action=AuditAction.DOCUMENT_CREATED, actor=employee)
+    client = client_logged_in(admin)
+    resp = client.get(reverse("reports:audit-log-list"), {"actor": "employee"})
+    assert b"?actor=employee&amp;page=2" in resp.content
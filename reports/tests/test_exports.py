@@ -0,0 +1,127 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.urls import reverse
+
+from reports.forms import DocumentFilterForm
+from reports.views.export import ExportView
+from workflow.models import AuditAction, AuditLog, Document
+
+
+@pytest.fixture
+def export_data(db, employee, manager):
+    budget = Document.objects.create(title="Quarterly Budget", content="c", created_by=employee)
+    Document.objects.create(
+        title="Travel, Policy", content="c", created_by=manager, status=Document.Status.SUBMITTED
+    )
+    AuditLog.objects.bulk_create([
+        AuditLog(action=AuditAction.DOCUMENT_CREATED, actor=employee, document=budget),
+        AuditLog(
+            action=AuditAction.DOCUMENT_APPROVED,
+            actor=manager,
+            document=budget,
+            metadata={"comment": "ok"},
+        ),
+    ])
+
+
+def _get(client, name, **params):
+    resp = client.get(reverse(f"reports:{name}"), params)
+    assert resp.status_code == 200
+    assert resp.streaming
+    return resp, b"".join(resp.streaming_content)
+
+
+@pytest.mark.django_db
+def test_audit_export_csv(client_logged_in, admin, export_data):
+    resp, body = _get(client_logged_in(admin), "audit-log-export")
+    assert resp["Content-Type"] == "text/csv"
+    assert 'filename="audit-logs.csv"' in resp["Content-Disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(body.decode())))
+    assert [r["action"] for r in rows] == [AuditAction.DOCUMENT_CREATED, AuditAction.DOCUMENT_APPROVED]
+    assert rows[1]["actor"] == "manager"
+    assert rows[1]["document_title"] == "Quarterly Budget"
+    assert json.loads(rows[1]["metadata"]) == {"comment": "ok"}
+
+
+@pytest.mark.django_db
+def test_audit_export_jsonl_reuses_report_filters(client_logged_in, admin, export_data):
+    resp, body = _get(
+        client_logged_in(admin), "audit-log-export", format="jsonl", action=AuditAction.DOCUMENT_APPROVED
+    )
+    assert resp["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["metadata"] == {"comment": "ok"}
+    assert lines[0]["created_at"]
+
+
+@pytest.mark.django_db
+def test_document_export_gzip(client_logged_in, admin, export_data):
+    resp, body = _get(client_logged_in(admin), "document-export", gzip="1")
+    assert resp["Content-Type"] == "application/gzip"
+    assert 'filename="documents.csv.gz"' in resp["Content-Disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(body).decode())))
+    assert [r["title"] for r in rows] == ["Quarterly Budget", "Travel, Policy"]
+
+
+@pytest.mark.django_db
+def test_document_export_filters(client_logged_in, admin, export_data):
+    _, body = _get(client_logged_in(admin), "document-export", format="jsonl", status="SUBMITTED")
+    assert [json.loads(line)["created_by"] for line in body.decode().splitlines()] == ["manager"]
+
+
+@pytest.mark.django_db
+def test_export_rejects_unknown_format(client_logged_in, admin):
+    resp = client_logged_in(admin).get(reverse("reports:audit-log-export"), {"format": "xml"})
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", ["audit-log-export", "document-export"])
+def test_export_requires_admin(client_logged_in, manager, name):
+    resp = client_logged_in(manager).get(reverse(f"reports:{name}"))
+    assert resp.status_code == 403
+
+
+@pytest.mark.django_db
+def test_export_data_command(tmp_path, export_data):
+    out = tmp_path / "audit.jsonl.gz"
+    call_command("export_data", "audit", format="jsonl", gzip=True, output=str(out), actor="employee")
+
+    lines = gzip.decompress(out.read_bytes()).decode().splitlines()
+    assert [json.loads(line)["action"] for line in lines] == [AuditAction.DOCUMENT_CREATED]
+
+
+@pytest.mark.django_db
+def test_export_streams_asynchronously_under_asgi(admin, export_data):
+    client = AsyncClient()
+    client.force_login(admin)
+
+    async def fetch():
+        resp = await client.get(reverse("reports:document-export"), {"format": "jsonl"})
+        return resp, [chunk async for chunk in resp.streaming_content]
+
+    resp, chunks = async_to_sync(fetch)()
+    assert resp.is_async
+    assert [json.loads(line)["title"] for line in b"".join(chunks).decode().splitlines()] == [
+        "Quarterly Budget",
+        "Travel, Policy",
+    ]
+
+
+def test_export_view_subclass_must_be_configured():
+    with pytest.raises(ImproperlyConfigured, match="rows, export_name"):
+
+        class IncompleteExportView(ExportView):
+            queryset = Document.objects.all()
+            filter_form_class = DocumentFilterForm
@@ -1,5 +1,6 @@
 from django.urls import path
 from .views.audit_log_list import AuditLogListView
+from .views.export import AuditLogExportView, DocumentExportView
 
 app_name = "reports"
 
@@ -9,4 +10,14 @@ urlpatterns = [
         AuditLogListView.as_view(),
         name="audit-log-list",
     ),
+    path(
+        "audit-logs/export/",
+        AuditLogExportView.as_view(),
+        name="audit-log-export",
+    ),
+    path(
+        "documents/export/",
+        DocumentExportView.as_view(),
+        name="document-export",
+    ),
 ]
@@ -0,0 +1,74 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.views import View
+
+from reports import exports
+from reports.forms import AuditLogFilterForm, DocumentFilterForm
+from workflow.mixins import AdminRequiredMixin
+from workflow.models import AuditLog, Document
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+class ExportView(AdminRequiredMixin, View):
+    """
+    Stream every row matching the report filters.
+    Query params: the filters, `format` (csv/jsonl) and `gzip=1`.
+
+    Subclasses set `queryset`, `rows` (a `reports.exports` row function,
+    wrapped in staticmethod), `filter_form_class` and `export_name`.
+    """
+
+    queryset = None
+    rows = None
+    filter_form_class = None
+    export_name = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        missing = [
+            name
+            for name in ("queryset", "rows", "filter_form_class", "export_name")
+            if getattr(cls, name) is None
+        ]
+        if missing:
+            raise ImproperlyConfigured(f"{cls.__name__} must set {', '.join(missing)}.")
+
+    def get(self, request):
+        fmt = request.GET.get("format", "csv")
+        if fmt not in exports.FORMATS:
+            return HttpResponseBadRequest(f"Unsupported export format: {fmt}")
+        compress = request.GET.get("gzip") in ("1", "true")
+
+        queryset = self.filter_form_class(request.GET).filter(self.queryset.all())
+        header, rows = self.rows(queryset)
+        body = exports.iter_bytes(exports.encode(header, rows, fmt), compress)
+        if isinstance(request, ASGIRequest):
+            # Django would drain a sync iterator into a list under ASGI
+            body = exports.aiter_chunks(body)
+
+        response = StreamingHttpResponse(
+            body,
+            content_type="application/gzip" if compress else CONTENT_TYPES[fmt],
+        )
+        filename = exports.export_filename(self.export_name, fmt, compress)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class AuditLogExportView(ExportView):
+    queryset = AuditLog.objects.all()
+    rows = staticmethod(exports.audit_log_rows)
+    filter_form_class = AuditLogFilterForm
+    export_name = "audit-logs"
+
+
+class DocumentExportView(ExportView):
+    queryset = Document.objects.all()
+    rows = staticmethod(exports.document_rows)
+    filter_form_class = DocumentFilterForm
+    export_name = "documents"
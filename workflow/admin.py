@@ -1,6 +1,17 @@
 from django.contrib import admin
-from .models import Document
+from django.db.models import F
+
+from .models import Document, DocumentBody
 from .models import AuditLog
+from .models import ApprovalWorkflow, WorkflowStage
+
+
+class DocumentBodyInline(admin.StackedInline):
+    model = DocumentBody
+    # Edited on the site, where saves keep the rendering and index current
+    fields = ("content",)
+    readonly_fields = ("content",)
+    can_delete = False
 
 
 @admin.register(Document)
@@ -9,6 +20,23 @@ class DocumentAdmin(admin.ModelAdmin):
     list_filter = ("status", "created_at")
     search_fields = ("title", "created_by__username")
     ordering = ("-created_at",)
+    inlines = [DocumentBodyInline]
+
+    def get_readonly_fields(self, request, obj=None):
+        readonly = super().get_readonly_fields(request, obj)
+        if obj is not None:
+            # Status moves only through workflow.transitions, which keep the
+            # status counters and approval inboxes in step
+            readonly = (*readonly, "status")
+        return readonly
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Open edit forms and page validators compare the version
+            obj.version = F("version") + 1
+        super().save_model(request, obj, form, change)
+        if change:
+            obj.refresh_from_db(fields=["version"])
 
 
 @admin.register(AuditLog)
@@ -16,3 +44,15 @@ class AuditLogAdmin(admin.ModelAdmin):
     list_display = ("id", "document", "action", "actor", "created_at")
     list_filter = ("action", "created_at")
     ordering = ("-created_at",)
+
+
+class WorkflowStageInline(admin.TabularInline):
+    model = WorkflowStage
+    extra = 1
+    filter_horizontal = ("approvers",)
+
+
+@admin.register(ApprovalWorkflow)
+class ApprovalWorkflowAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "is_default")
+    inlines = [WorkflowStageInline]
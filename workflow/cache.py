@@ -0,0 +1,350 @@
+"""
+Two-tier application cache with tag invalidation.
+
+`TieredCache` is the `default` cache backend (settings.CACHES). Reads go
+to a bounded LRU in the worker process first, then to the shared cache
+that every worker on the host sees (`CACHE_SHARED_BACKEND`, a file cache
+by default); shared hits are copied into the LRU. Writes go to both. An
+LRU entry lives at most `LOCAL_TIMEOUT` seconds, which bounds how long a
+worker can serve a value that another worker has replaced or deleted.
+
+`cached()` / `acached()` store values computed from the database under
+one or more tags. Each tag has a version token in the cache, and an
+entry is only served while the tokens it was computed under are
+current. `invalidate()` replaces the tokens once the writing transaction
+commits; until then only that transaction sees its writes, and it
+bypasses the cache. Values are computed on the primary database even
+on pages that read from a replica (workflow.db_router), which may not
+have the latest writes yet. Writers call `invalidate()` through
+`workflow.signals`, `AuditLog.log` / `bulk_log` and the audit writer:
+
+- DOCUMENTS: document rows and their statuses
+- INBOX: who is waited on for which document
+- AUDIT: audit entries
+
+Lookups, hits and misses per tier, and LRU evictions, are counted in
+`rbaw_cache_requests_total` and `rbaw_cache_evictions_total`.
+"""
+
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import transaction
+
+from workflow.db_router import reading_from_primary
+from workflow.metrics import CACHE_EVICTIONS, CACHE_REQUESTS
+
+DOCUMENTS = "documents"
+INBOX = "inbox"
+AUDIT = "audit"
+
+_TAG_KEY = "rbaw:tag:{}"
+_MISSING = object()
+
+
+class LocalTier:
+    """
+    Per-process LRU of pickled values with expiry times, shared by the
+    threads of one process.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        return _MISSING
+
+    def set(self, key, pickled, expires_at):
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (expires_at, pickled)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        return evicted
+
+    def delete(self, key):
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# One LRU per TieredCache name; Django builds cache instances per thread
+_local_tiers = {}
+_local_tiers_lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    """
+    Django cache backend: a `LocalTier` in front of the cache alias named
+    by LOCATION.
+
+    OPTIONS: LOCAL_MAX_ENTRIES (default 1000) bounds the LRU and
+    LOCAL_TIMEOUT (default 5) caps how long an entry stays in it.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        options = params.get("OPTIONS", {})
+        self.local_max_entries = int(options.get("LOCAL_MAX_ENTRIES", 1000))
+        self.local_timeout = float(options.get("LOCAL_TIMEOUT", 5))
+        super().__init__({**params, "OPTIONS": {}})
+        self.shared_alias = location
+        with _local_tiers_lock:
+            self._local = _local_tiers.setdefault(location, LocalTier(self.local_max_entries))
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _local_expiry(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        now = time.time()
+        limit = now + self.local_timeout
+        return limit if timeout is None else min(timeout, limit)
+
+    def _local_get(self, key):
+        pickled = self._local.get(key, time.time())
+        if pickled is _MISSING:
+            CACHE_REQUESTS.inc(tier="local", result="miss")
+            return _MISSING
+        CACHE_REQUESTS.inc(tier="local", result="hit")
+        return pickle.loads(pickled)
+
+    def _local_set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None and timeout <= 0:
+            self._local.delete(key)
+            return
+        evicted = self._local.set(key, pickle.dumps(value, self.pickle_protocol), self._local_expiry(timeout))
+        if evicted:
+            CACHE_EVICTIONS.inc(evicted, tier="local")
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self._local_get(local_key)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            CACHE_REQUESTS.inc(tier="shared", result="miss")
+            return default
+        CACHE_REQUESTS.inc(tier="shared", result="hit")
+        self._local_set(local_key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote = []
+        for key in keys:
+            value = self._local_get(self.make_and_validate_key(key, version=version))
+            if value is _MISSING:
+                remote.append(key)
+            else:
+                found[key] = value
+        if remote:
+            fetched = self.shared.get_many(remote, version=version)
+            if len(fetched) < len(remote):
+                CACHE_REQUESTS.inc(len(remote) - len(fetched), tier="shared", result="miss")
+            if fetched:
+                CACHE_REQUESTS.inc(len(fetched), tier="shared", result="hit")
+            for key, value in fetched.items():
+                self._local_set(self.make_key(key, version=version), value)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self.shared.set(key, value, self._shared_timeout(timeout), version=version)
+        self._local_set(local_key, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, self._shared_timeout(timeout), version=version)
+        for key, value in data.items():
+            local_key = self.make_and_validate_key(key, version=version)
+            if key in failed:
+                self._local.delete(local_key)
+            else:
+                self._local_set(local_key, value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        added = self.shared.add(key, value, self._shared_timeout(timeout), version=version)
+        if added:
+            self._local_set(local_key, value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local.delete(self.make_and_validate_key(key, version=version))
+        return self.shared.touch(key, self._shared_timeout(timeout), version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local.delete(self.make_and_validate_key(key, version=version))
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self._local.delete(self.make_and_validate_key(key, version=version))
+        return self.shared.decr(key, delta, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def delete(self, key, version=None):
+        local = self._local.delete(self.make_and_validate_key(key, version=version))
+        return self.shared.delete(key, version=version) or local
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._local.delete(self.make_and_validate_key(key, version=version))
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        self._local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def _shared_timeout(self, timeout):
+        # The shared tier has its own TIMEOUT; ours is the default here
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def stats(self):
+        """This process's LRU counters; the shared tier is in the metrics."""
+        return {
+            "entries": len(self._local),
+            "max_entries": self._local.max_entries,
+            "hits": self._local.hits,
+            "misses": self._local.misses,
+            "evictions": self._local.evictions,
+        }
+
+
+def _new_version():
+    return os.urandom(8).hex()
+
+
+def _tag_keys(tags):
+    return [_TAG_KEY.format(tag) for tag in tags]
+
+
+def _versions(tag_keys, found):
+    """
+    The current token of each tag, and fresh tokens for tags never
+    invalidated; storing a fresh token can only invalidate more.
+    """
+    missing = {key: _new_version() for key in tag_keys if key not in found}
+    return tuple(found.get(key) or missing[key] for key in tag_keys), missing
+
+
+def _in_transaction():
+    # Its reads may include uncommitted writes, whose invalidations are
+    # still pending
+    return transaction.get_connection().in_atomic_block
+
+
+def cached(key, compute, timeout=DEFAULT_TIMEOUT, tags=()):
+    """
+    Return the value cached under `key` if none of `tags` was invalidated
+    since it was stored, else `compute()` it on the primary and cache the
+    result. Inside a transaction, always compute.
+
+    The tag versions are read before computing, so an invalidation that
+    lands while `compute` runs makes the stored value stale at once.
+    """
+    if _in_transaction():
+        return compute()
+    tag_keys = _tag_keys(tags)
+    found = cache.get_many([key, *tag_keys])
+    versions, missing = _versions(tag_keys, found)
+    entry = found.get(key)
+    if entry is not None and entry[0] == versions:
+        return entry[1]
+    with reading_from_primary():
+        value = compute()
+    if missing:
+        cache.set_many(missing, None)
+    cache.set(key, (versions, value), timeout)
+    return value
+
+
+async def acached(key, compute, timeout=DEFAULT_TIMEOUT, tags=()):
+    """`cached` for async callers; `compute` is a coroutine function."""
+    if _in_transaction():
+        return await compute()
+    tag_keys = _tag_keys(tags)
+    found = await cache.aget_many([key, *tag_keys])
+    versions, missing = _versions(tag_keys, found)
+    entry = found.get(key)
+    if entry is not None and entry[0] == versions:
+        return entry[1]
+    with reading_from_primary():
+        value = await compute()
+    if missing:
+        await cache.aset_many(missing, None)
+    await cache.aset(key, (versions, value), timeout)
+    return value
+
+
+def tag_versions(*tags):
+    """
+    Current tokens of `tags`, e.g. to key a `{% cache %}` fragment on.
+    Inside a transaction, fresh tokens that match nothing cached.
+    """
+    tag_keys = _tag_keys(tags)
+    if _in_transaction():
+        return _versions(tag_keys, {})[0]
+    versions, missing = _versions(tag_keys, cache.get_many(tag_keys))
+    if missing:
+        cache.set_many(missing, None)
+    return versions
+
+
+async def atag_versions(*tags):
+    tag_keys = _tag_keys(tags)
+    if _in_transaction():
+        return _versions(tag_keys, {})[0]
+    versions, missing = _versions(tag_keys, await cache.aget_many(tag_keys))
+    if missing:
+        await cache.aset_many(missing, None)
+    return versions
+
+
+def invalidate(*tags):
+    """
+    Drop every entry cached under any of `tags`, once the surrounding
+    transaction commits (at once outside one). Invalidating any earlier
+    would let other requests cache the rows as they were before the
+    commit, and bumping tokens while a write holds row locks would
+    lengthen it.
+    """
+    tag_keys = _tag_keys(tags)
+    transaction.on_commit(
+        lambda: cache.set_many({key: _new_version() for key in tag_keys}, None)
+    )
@@ -1,3 +1,6 @@
+from workflow.services.roles import get_role_names
+
+
 def role_flags(request):
     user = request.user
 
@@ -8,7 +11,7 @@ def role_flags(request):
             "is_admin": False,
         }
 
-    groups = set(user.groups.values_list("name", flat=True))
+    groups = get_role_names(user)
 
     return {
         "is_employee": "Employee" in groups or "Manager" in groups or "Admin" in groups,
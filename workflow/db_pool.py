@@ -0,0 +1,84 @@
+"""
+Connection-pool statistics.
+
+With DB_POOL on, Django keeps a psycopg pool per PostgreSQL alias in each
+process (settings.DATABASES[...]["OPTIONS"]["pool"]). Requests check a
+connection out when they first touch the database and give it back when
+they finish, so the number of server connections is bounded by the pool
+size rather than by the number of threads.
+
+Once a process has opened a pool, a daemon thread logs each pool's
+statistics to the `workflow.db` logger every DB_POOL_STATS_INTERVAL
+seconds, and adds the counters to the /metrics registry so they are
+summed across workers. A log line holds the pool's current size, idle
+connections and waiting requests, plus the checkouts, waits and errors
+since the previous line.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from workflow.metrics import DB_POOL_ERRORS, DB_POOL_QUEUED, DB_POOL_REQUESTS, DB_POOL_WAIT_SECONDS
+
+logger = logging.getLogger("workflow.db")
+
+# psycopg_pool counter -> `kind` label of rbaw_db_pool_errors_total
+ERROR_KINDS = {
+    "requests_errors": "checkout",
+    "connections_errors": "connect",
+    "connections_lost": "lost",
+    "returns_bad": "returned_bad",
+}
+
+_lock = threading.Lock()
+_started_pid = None
+
+
+def open_pools():
+    """`(alias, pool)` for every pool this process has opened."""
+    for alias in connections:
+        if not connections.settings[alias]["OPTIONS"].get("pool"):
+            continue
+        pool = connections[alias].pool
+        if not pool.closed:
+            yield alias, pool
+
+
+def log_pool_stats():
+    """Log and count each open pool's statistics since the previous call."""
+    for alias, pool in open_pools():
+        stats = pool.pop_stats()
+        logger.info("Connection pool statistics", extra={"db_alias": alias, "pool_stats": stats})
+
+        DB_POOL_REQUESTS.inc(stats.get("requests_num", 0), alias=alias)
+        DB_POOL_QUEUED.inc(stats.get("requests_queued", 0), alias=alias)
+        DB_POOL_WAIT_SECONDS.inc(stats.get("requests_wait_ms", 0) / 1000, alias=alias)
+        for key, kind in ERROR_KINDS.items():
+            DB_POOL_ERRORS.inc(stats.get(key, 0), alias=alias, kind=kind)
+
+
+def start_stats_logging():
+    """Start this process's statistics thread unless it is running."""
+    global _started_pid
+    # Cheap enough for every checkout; a forked worker starts its own
+    if _started_pid == os.getpid() or settings.DB_POOL_STATS_INTERVAL <= 0:
+        return
+    with _lock:
+        if _started_pid == os.getpid():
+            return
+        _started_pid = os.getpid()
+        threading.Thread(target=_stats_loop, name="db-pool-stats", daemon=True).start()
+
+
+def _stats_loop():
+    while settings.DB_POOL_STATS_INTERVAL > 0:
+        time.sleep(settings.DB_POOL_STATS_INTERVAL)
+        try:
+            log_pool_stats()
+        except Exception:
+            logger.exception("Could not read connection pool statistics")
@@ -0,0 +1,127 @@
+"""
+Read-replica routing.
+
+Aliases listed in settings.DATABASE_REPLICAS are copies of `default`.
+Pages that only read (views with `ReadReplicaMixin`) send their reads of
+workflow data to one of them, picked per request. Everything else uses
+the primary:
+
+- every write, including `Document.submit/approve/reject` and
+  `AuditLog.log`;
+- reads inside a transaction, such as the checks a transition makes;
+- sessions, users and groups, so a login is seen by the next request.
+
+Read-your-writes: `ReplicaRoutingMiddleware` notes whether a request
+wrote, and if so sets a cookie for REPLICA_PIN_SECONDS. While it is
+present, that browser's pages read from the primary, so users see their
+own changes even if the replicas lag behind.
+
+Values that go into the shared cache are computed inside
+`reading_from_primary()`: cached under the current tag versions, a value
+read from a lagging replica would be served to everyone, the writer
+included, until the next write.
+"""
+
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = "rbaw_read_primary"
+
+# Apps whose tables the replicas serve reads of
+REPLICATED_APPS = frozenset({"workflow"})
+
+
+class _RequestState:
+    __slots__ = ("pinned", "read_alias", "wrote", "primary_blocks")
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.read_alias = None
+        self.wrote = False
+        # Open `reading_from_primary` blocks; a count, as async tasks of
+        # one request may nest or overlap them
+        self.primary_blocks = 0
+
+
+# Mutated rather than re-set, so executor threads of async views share it
+_request_state = contextvars.ContextVar("replica_request_state", default=None)
+
+
+def begin_request(pinned):
+    """Start routing a request; returns the token for `end_request`."""
+    return _request_state.set(_RequestState(pinned))
+
+
+def end_request(token):
+    """Finish the request; returns True if it wrote to the primary."""
+    state = _request_state.get()
+    _request_state.reset(token)
+    return state.wrote
+
+
+def read_from_replica():
+    """
+    Route the rest of the current request's workflow reads to a replica,
+    unless the browser is pinned to the primary. No-op outside a request
+    or without replicas.
+    """
+    state = _request_state.get()
+    if state is None or state.pinned or not settings.DATABASE_REPLICAS:
+        return
+    if state.read_alias is None:
+        state.read_alias = random.choice(settings.DATABASE_REPLICAS)
+
+
+def current_read_alias():
+    state = _request_state.get()
+    if state is None or state.primary_blocks:
+        return None
+    return state.read_alias
+
+
+@contextlib.contextmanager
+def reading_from_primary():
+    """Route the current request's reads to the primary inside the block."""
+    state = _request_state.get()
+    if state is None:
+        yield
+        return
+    state.primary_blocks += 1
+    try:
+        yield
+    finally:
+        state.primary_blocks -= 1
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = current_read_alias()
+        if alias is None or model._meta.app_label not in REPLICATED_APPS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        # Explicit, or Django would write instances back where they were read
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        known = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in known and obj2._state.db in known:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the primary's schema through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
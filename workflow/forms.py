@@ -4,25 +4,50 @@ from .models import Document
 
 
 class DocumentForm(forms.ModelForm):
+    # Not a Document column: the body is stored in DocumentBody and
+    # read and written through `Document.content`
+    content = forms.CharField(
+        widget=SummernoteWidget(
+            attrs={
+                "summernote": {
+                    "width": "100%",
+                    "height": 400,
+                    "toolbar": [
+                        ["style", ["style"]],
+                        ["font", ["bold", "italic", "underline", "clear"]],
+                        ["fontsize", ["fontsize"]],
+                        ["color", ["color"]],
+                        ["para", ["ul", "ol", "paragraph"]],
+                        ["insert", ["link", "picture", "table"]],
+                        ["view", ["fullscreen", "codeview"]],
+                    ],
+                }
+            }
+        ),
+    )
+
     class Meta:
         model = Document
         fields = ['title', 'content']
-        widgets = {
-            'content': SummernoteWidget(
-                attrs={
-                    "summernote": {
-                        "width": "100%",
-                        "height": 400,
-                        "toolbar": [
-                            ["style", ["style"]],
-                            ["font", ["bold", "italic", "underline", "clear"]],
-                            ["fontsize", ["fontsize"]],
-                            ["color", ["color"]],
-                            ["para", ["ul", "ol", "paragraph"]],
-                            ["insert", ["link", "picture", "table"]],
-                            ["view", ["fullscreen", "codeview"]],
-                        ],
-                    }
-                }
-            ),
-        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault("content", self.instance.content)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if "content" in cleaned_data:
+            self.instance.content = cleaned_data["content"]
+        return cleaned_data
+
+
+class DocumentEditForm(DocumentForm):
+    """DocumentForm plus the row version the editor started from."""
+
+    version = forms.IntegerField(widget=forms.HiddenInput)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields["version"].initial = self.instance.version
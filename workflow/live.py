@@ -0,0 +1,335 @@
+"""
+Live updates for the approval queue and dashboard over server-sent events.
+
+Writers publish small diffs to an in-process broker once their
+transaction commits:
+
+- `queue` events go to the approvers a document entered or left the
+  inbox of (workflow.services.approval_inbox).
+- `counts` events carry status counter deltas and go to every
+  subscriber (`AuditLog.log` / `bulk_log`).
+
+`sse_application` is a bare ASGI app that `rbaw_project/asgi.py` mounts
+at LIVE_EVENTS_PATH, in front of Django's handler. Each connection
+costs one asyncio queue and two tasks; keepalives come from one timer
+per event loop. The session is checked once, in
+asgiref's shared sync thread, and the DB connections opened for that
+check are closed again before streaming starts. Idle connections
+therefore hold neither a thread nor a database connection.
+
+The broker is per process, so subscribers only see writes committed in
+the same process. Live updates are complete only when the site runs as a
+single ASGI worker process that also serves every write. Sticky sessions
+do not help: they pin a browser, not the writes it should hear about.
+With several workers, or writes from WSGI processes or management
+commands, streams miss events, and clients only catch up on their next
+reload.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from http.cookies import SimpleCookie
+from types import SimpleNamespace
+
+from django.conf import settings
+
+logger = logging.getLogger("workflow.live")
+
+# Audit action → status counter deltas, as applied by the transitions
+STATUS_DELTAS = {
+    "DOCUMENT_CREATED": {"DRAFT": 1},
+    "DOCUMENT_SUBMITTED": {"DRAFT": -1, "SUBMITTED": 1},
+    "DOCUMENT_APPROVED": {"SUBMITTED": -1, "APPROVED": 1},
+    "DOCUMENT_REJECTED": {"SUBMITTED": -1, "REJECTED": 1},
+}
+
+# Tells the client its view is stale (it fell behind, or its queue was
+# recomputed wholesale); it should reload. Ends the stream.
+RESYNC = ("resync", {})
+# Written as an SSE comment so proxies keep idle connections open
+KEEPALIVE = ("keepalive", None)
+
+
+class Subscription:
+    """One connected client. `deliver` runs on the subscriber's event loop."""
+
+    def __init__(self, user_id, loop, maxsize):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        if self.queue.full():
+            if event is KEEPALIVE:
+                return
+            # Too slow to keep up: drop the backlog and ask for a reload
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESYNC
+        self.queue.put_nowait(event)
+
+
+def _deliver_all(subscriptions, event):
+    for subscription in subscriptions:
+        subscription.deliver(event)
+
+
+class Broker:
+    """Fan-out of events to subscriptions, callable from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._by_user = {}
+        self._heartbeats = {}
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def subscribe(self, user_id, loop=None, maxsize=None):
+        subscription = Subscription(
+            user_id,
+            loop or asyncio.get_running_loop(),
+            maxsize or settings.LIVE_QUEUE_SIZE,
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+            self._by_user.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            mine = self._by_user.get(subscription.user_id)
+            if mine is not None:
+                mine.discard(subscription)
+                if not mine:
+                    del self._by_user[subscription.user_id]
+
+    def _send(self, subscriptions, event):
+        # One wake-up per event loop, not per subscriber
+        by_loop = {}
+        for subscription in subscriptions:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, batch in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, batch, event)
+            except RuntimeError:
+                # Loop already closed; its connections are going away
+                for subscription in batch:
+                    self.unsubscribe(subscription)
+
+    def start_heartbeat(self):
+        """
+        One keepalive timer per event loop instead of a timeout per
+        connection: an idle stream then waits on its queue alone.
+        """
+        loop = asyncio.get_running_loop()
+        if loop not in self._heartbeats:
+            self._heartbeats[loop] = loop.create_task(self._heartbeat(loop))
+
+    def stop_heartbeat_if_idle(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            idle = not any(s.loop is loop for s in self._subscriptions)
+        if idle and loop in self._heartbeats:
+            self._heartbeats.pop(loop).cancel()
+
+    async def _heartbeat(self, loop):
+        while True:
+            await asyncio.sleep(settings.LIVE_HEARTBEAT_SECONDS)
+            with self._lock:
+                subscriptions = [s for s in self._subscriptions if s.loop is loop]
+            _deliver_all(subscriptions, KEEPALIVE)
+
+    def _of_users(self, user_ids):
+        with self._lock:
+            return [s for uid in user_ids for s in self._by_user.get(uid, ())]
+
+    def publish_all(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        self._send(subscriptions, event)
+
+    def publish_users(self, user_ids, event):
+        self._send(self._of_users(user_ids), event)
+
+
+broker = Broker()
+
+
+def _on_commit(callback):
+    from django.db import transaction
+
+    transaction.on_commit(callback)
+
+
+def publish_status_change(action, count=1):
+    """Broadcast the counter deltas of `count` audit entries of `action`."""
+    deltas = STATUS_DELTAS.get(action)
+    if not deltas or not broker.has_subscribers():
+        return
+    event = ("counts", {status: delta * count for status, delta in deltas.items()})
+    _on_commit(lambda: broker.publish_all(event))
+
+
+def publish_queue_change(document, added, removed):
+    """Tell approvers that `document` entered (`added`) or left (`removed`) their queue."""
+    if not (added or removed):
+        return
+    insert = ("queue", {
+        "op": "insert",
+        "document": {
+            "id": document.pk,
+            "title": document.title,
+            "owner": document.created_by.username,
+            "created_at": document.created_at.isoformat(),
+        },
+    }) if added else None
+    remove = ("queue", {"op": "remove", "document": {"id": document.pk}})
+
+    def send():
+        if added:
+            broker.publish_users(added, insert)
+        if removed:
+            broker.publish_users(removed, remove)
+
+    _on_commit(send)
+
+
+def publish_queue_removals(removed_by_document):
+    """`{document_id: approver ids}` for decided documents."""
+    if not removed_by_document:
+        return
+
+    def send():
+        for document_id, approvers in removed_by_document.items():
+            broker.publish_users(approvers, ("queue", {"op": "remove", "document": {"id": document_id}}))
+
+    _on_commit(send)
+
+
+def publish_resync(user_ids):
+    if broker.has_subscribers():
+        _on_commit(lambda: broker.publish_users(user_ids, RESYNC))
+
+
+def encode(event):
+    name, data = event
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def _authorize(cookie_header):
+    """
+    Return the approver's user id for the session cookie, or None.
+    Runs in asgiref's sync thread and closes the connections it opened.
+    """
+    from importlib import import_module
+
+    from django.contrib.auth import get_user
+    from django.db import connections
+
+    from workflow.services.roles import is_approver
+
+    try:
+        cookies = SimpleCookie()
+        cookies.load(cookie_header)
+        morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+        if morsel is None:
+            return None
+        session = import_module(settings.SESSION_ENGINE).SessionStore(morsel.value)
+        user = get_user(SimpleNamespace(session=session))
+        if not user.is_authenticated or not is_approver(user):
+            return None
+        return user.pk
+    finally:
+        for connection in connections.all(initialized_only=True):
+            if not connection.in_atomic_block:
+                connection.close()
+
+
+async def _respond(send, status, body=b""):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _pump(subscription, send):
+    while True:
+        event = await subscription.queue.get()
+        if event is KEEPALIVE:
+            await send({"type": "http.response.body", "body": b": keepalive\n\n", "more_body": True})
+            continue
+        if event is RESYNC:
+            await send({"type": "http.response.body", "body": encode(event)})
+            return
+        await send({"type": "http.response.body", "body": encode(event), "more_body": True})
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def sse_application(scope, receive, send):
+    """ASGI app streaming `queue` and `counts` events to one approver."""
+    from asgiref.sync import sync_to_async
+
+    if scope["method"] != "GET":
+        await _respond(send, 405)
+        return
+    if len(broker) >= settings.LIVE_MAX_CONNECTIONS:
+        await _respond(send, 503, b"Too many live connections.")
+        return
+
+    headers = dict(scope["headers"])
+    user_id = await sync_to_async(_authorize)(headers.get(b"cookie", b"").decode("latin-1"))
+    if user_id is None:
+        await _respond(send, 403)
+        return
+
+    subscription = broker.subscribe(user_id)
+    broker.start_heartbeat()
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b"retry: 5000\n\n", "more_body": True})
+
+        pump = asyncio.ensure_future(_pump(subscription, send))
+        disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+        done, pending = await asyncio.wait({pump, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        if pump in done and pump.exception() is not None:
+            logger.warning("Live stream ended with an error", exc_info=pump.exception())
+    finally:
+        broker.unsubscribe(subscription)
+        broker.stop_heartbeat_if_idle()
+
+
+def route(django_application):
+    """Serve LIVE_EVENTS_PATH with `sse_application`, everything else with Django."""
+    path = settings.LIVE_EVENTS_PATH
+
+    async def application(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == path:
+            await sse_application(scope, receive, send)
+        else:
+            await django_application(scope, receive, send)
+
+    return application
@@ -1,34 +1,304 @@
+"""
+Structured JSON logging.
+
+`JsonFormatter` turns records into one JSON object per line. In
+production it runs behind `BackgroundLogHandler`: the logging call only
+stamps the record with the caller's correlation ID and puts it on a
+bounded buffer. A writer thread formats records in batches and writes
+each batch to its sinks with one call: the console stream and,
+optionally, a `RotatingFileSink`. A slow stdout or log collector then
+delays the writer rather than requests. When the buffer is full, records
+are dropped and counted (`rbaw_log_records_dropped_total`), and the
+writer reports how many in its next batch.
+"""
+
+import collections
 import json
 import logging
-from datetime import datetime
+import os
+import sys
+import threading
+import time
+from pathlib import Path
 
+from workflow.metrics import LOG_RECORDS_DROPPED
 from workflow.middleware import get_correlation_id
 
+# Structured extras copied into the JSON object when a record carries them
+EXTRA_KEYS = frozenset({
+    "actor",
+    "document",
+    "action",
+    "allowed",
+    "failure",
+    "latency_ms",
+    "method",
+    "path",
+    "status",
+    "db_queries",
+    "db_time_ms",
+    "slowest_sql_ms",
+    "slowest_sql",
+    "template_ms",
+    "db_alias",
+    "pool_stats",
+    "dropped",
+})
+
 
 class JsonFormatter(logging.Formatter):
     """
     Production JSON log formatter.
     """
 
+    # (whole second, its ISO 8601 text); records arrive in time order
+    _second = (None, "")
+
+    def _timestamp(self, created):
+        second = int(created)
+        cached, text = self._second
+        if cached != second:
+            text = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = (second, text)
+        return "%s.%06dZ" % (text, (created - second) * 1e6)
+
     def format(self, record):
+        fields = record.__dict__
         log_record = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
-            "correlation_id": get_correlation_id(),
+            # Stamped by BackgroundLogHandler, which formats off the request
+            "correlation_id": fields["correlation_id"] if "correlation_id" in fields else get_correlation_id(),
         }
 
         # Include structured extras if present
-        for key in (
-            "actor",
-            "document",
-            "action",
-            "allowed",
-            "failure",
-            "latency_ms",
-        ):
-            if hasattr(record, key):
-                log_record[key] = getattr(record, key)
+        for key in EXTRA_KEYS.intersection(fields):
+            log_record[key] = fields[key]
 
         return json.dumps(log_record)
+
+
+class StreamSink:
+    """Writes batches to `stream`, or to whatever sys.stderr is at the time."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, lines):
+        stream = self.stream if self.stream is not None else sys.stderr
+        stream.write("".join(line + "\n" for line in lines))
+        stream.flush()
+
+    def close(self):
+        pass
+
+
+class RotatingFileSink:
+    """
+    Appends batches to `path`, rotating it to `path.1`, `path.2`, ... once
+    it reaches `max_bytes` or has been open for `rotate_seconds` (0
+    disables either). `backup_count` rotated files are kept.
+
+    Rotation renames the file under the writing process, so give each
+    process its own file: `{pid}` in `path` is replaced by the process ID.
+    """
+
+    def __init__(self, path, max_bytes=100 * 1024 * 1024, rotate_seconds=86400, backup_count=7):
+        self.path = Path(str(path).format(pid=os.getpid()))
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self._file = None
+        self._rotate_at = None
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._rotate_at = time.time() + self.rotate_seconds if self.rotate_seconds else None
+
+    def _should_rotate(self):
+        if self._rotate_at is not None and time.time() >= self._rotate_at:
+            return True
+        return bool(self.max_bytes) and self._file.tell() >= self.max_bytes
+
+    def rotate(self):
+        self.close()
+        for number in range(self.backup_count - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{number}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{number + 1}"))
+        if self.backup_count:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._open()
+
+    def write(self, lines):
+        if self._file is None:
+            self._open()
+        elif self._should_rotate():
+            self.rotate()
+        self._file.write("".join(line + "\n" for line in lines))
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BackgroundLogHandler(logging.Handler):
+    """
+    Queue records for a writer thread instead of writing them inline.
+
+    Configured from settings.LOGGING; `file_path` adds a RotatingFileSink
+    next to the console, `console=False` leaves only the file. The writer
+    starts with the first record in each process, so forked workers get
+    their own.
+    """
+
+    def __init__(
+        self,
+        queue_size=10000,
+        batch_size=256,
+        flush_interval=0.5,
+        console=True,
+        stream=None,
+        file_path="",
+        file_max_bytes=100 * 1024 * 1024,
+        file_rotate_seconds=86400,
+        file_backup_count=7,
+    ):
+        super().__init__()
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._sink_factories = []
+        if console:
+            self._sink_factories.append(lambda: StreamSink(stream))
+        if file_path:
+            self._sink_factories.append(
+                lambda: RotatingFileSink(file_path, file_max_bytes, file_rotate_seconds, file_backup_count)
+            )
+        self.dropped = 0
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._pending = None
+        self._wake = None
+        self._thread = None
+
+    def _ensure_writer(self):
+        # A forked worker inherits the buffer but not the thread
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pending = collections.deque()
+            self._wake = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(self._pending, self._wake, [factory() for factory in self._sink_factories]),
+                name="log-writer",
+                daemon=True,
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        """Capture what only the calling thread knows; the rest waits."""
+        # A copy, so other handlers still see the record as logged
+        copy = logging.LogRecord.__new__(logging.LogRecord)
+        copy.__dict__.update(record.__dict__)
+        if "correlation_id" not in copy.__dict__:
+            copy.correlation_id = get_correlation_id()
+        # Resolve arguments now; they may change once the call returns
+        copy.msg = record.getMessage()
+        copy.args = None
+        copy.exc_info = None
+        return copy
+
+    def emit(self, record):
+        try:
+            self._ensure_writer()
+            pending = self._pending
+            if len(pending) >= self.queue_size:
+                self.dropped += 1
+                LOG_RECORDS_DROPPED.inc(level=record.levelname)
+                return
+            pending.append(self.prepare(record))
+            if len(pending) >= self.batch_size:
+                self._wake.set()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self, timeout=5.0):
+        """Wait up to `timeout` for records queued so far to be written."""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        written = threading.Event()
+        self._pending.append(written)
+        self._wake.set()
+        written.wait(timeout)
+
+    def close(self):
+        if self._pid == os.getpid():
+            self._pending.append(None)
+            self._wake.set()
+            self._thread.join(timeout=5.0)
+            self._pid = None
+        super().close()
+
+    def _run(self, pending, wake, sinks):
+        # Wakes every flush_interval, or early once a batch is waiting, so
+        # a busy logger does not wake the writer for every record
+        reported = self.dropped
+        stopping = False
+        while not stopping:
+            wake.wait(self.flush_interval)
+            wake.clear()
+            while True:
+                records, waiters = [], []
+                while pending and len(records) < self.batch_size:
+                    item = pending.popleft()
+                    if item is None:
+                        stopping = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        records.append(item)
+                if self.dropped != reported:
+                    records.append(self._dropped_record(self.dropped - reported))
+                    reported = self.dropped
+                if records:
+                    self._write(sinks, records)
+                for waiter in waiters:
+                    waiter.set()
+                if not pending:
+                    break
+        for sink in sinks:
+            sink.close()
+
+    def _write(self, sinks, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        for sink in sinks:
+            try:
+                sink.write(lines)
+            except Exception:
+                self.handleError(records[0])
+
+    def _dropped_record(self, count):
+        record = logging.LogRecord(
+            "workflow.logging", logging.WARNING, __file__, 0,
+            "Log buffer full; records dropped", None, None,
+        )
+        record.correlation_id = None
+        record.dropped = count
+        return record
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from workflow.services.approval_inbox import check_inbox_drift, rebuild_inbox
+
+
+class Command(BaseCommand):
+    help = "Check the denormalized approval inbox for drift, or rebuild it."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute every inbox entry from documents, stages and votes.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            created = rebuild_inbox()
+            self.stdout.write(self.style.SUCCESS(f"Approval inbox rebuilt: {created} entries."))
+            return
+
+        missing, extra = check_inbox_drift()
+        if not missing and not extra:
+            self.stdout.write(self.style.SUCCESS("Approval inbox is consistent."))
+            return
+
+        self.stderr.write(f"missing={len(missing)} extra={len(extra)}")
+        for approver_id, document_id in sorted(missing)[:20]:
+            self.stderr.write(f"missing: approver={approver_id} document={document_id}")
+        for approver_id, document_id in sorted(extra)[:20]:
+            self.stderr.write(f"extra: approver={approver_id} document={document_id}")
+        raise CommandError("Approval inbox has drifted; run with --rebuild.")
@@ -0,0 +1,75 @@
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from workflow import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Manage monthly AuditLog partitions (PostgreSQL only): create upcoming "
+        "months, and retire old ones, optionally archiving them as gzipped CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Create partitions through this many months after the current one.",
+        )
+        parser.add_argument(
+            "--retire-before",
+            metavar="YYYY-MM",
+            help="Drop partitions for months that end on or before this month starts.",
+        )
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            help="Write retired partitions to AUDIT_ARCHIVE_DIR before dropping them.",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="Only list the attached monthly partitions.",
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning.is_supported(connection):
+            raise CommandError("AuditLog partitioning requires PostgreSQL.")
+        if not partitioning.is_partitioned(connection):
+            raise CommandError("workflow_auditlog is not partitioned; run migrations first.")
+
+        if options["list"]:
+            for name in partitioning.list_partitions(connection):
+                self.stdout.write(name)
+            return
+
+        with transaction.atomic():
+            for name in partitioning.ensure_partitions(connection, options["months_ahead"]):
+                self.stdout.write(f"Ensured {name}")
+
+        if options["retire_before"]:
+            before = self._parse_month(options["retire_before"])
+            archive_dir = Path(settings.AUDIT_ARCHIVE_DIR) if options["archive"] else None
+            with transaction.atomic():
+                retired = partitioning.retire_partitions(connection, before, archive_dir)
+            for name, path in retired:
+                suffix = f" -> {path}" if path else ""
+                self.stdout.write(f"Retired {name}{suffix}")
+
+        stray = partitioning.default_partition_rows(connection)
+        if stray:
+            self.stderr.write(
+                self.style.WARNING(f"{stray} audit entries remain in the DEFAULT partition.")
+            )
+        self.stdout.write(self.style.SUCCESS("AuditLog partitions up to date."))
+
+    def _parse_month(self, value):
+        try:
+            return partitioning.month_start(datetime.strptime(value, "%Y-%m"))
+        except ValueError:
+            raise CommandError(f"Invalid month {value!r}; expected YYYY-MM.")
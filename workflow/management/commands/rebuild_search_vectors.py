@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from workflow.services.document_search import is_supported, rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recompute Document.search_vector for full-text search (PostgreSQL only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Only index documents that have no search vector yet.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError("Full-text search vectors require PostgreSQL.")
+
+        updated = rebuild_search_vectors(
+            only_missing=options["only_missing"],
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Indexed {updated} documents."))
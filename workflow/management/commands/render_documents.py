@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from workflow.services.document_render import render_documents
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill the sanitized rendering of document bodies shown on detail "
+        "pages, moving pasted images out of the bodies into media files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Only render documents that have never been rendered.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        checked, rendered = render_documents(
+            only_missing=options["only_missing"],
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} documents, rendered {rendered}."))
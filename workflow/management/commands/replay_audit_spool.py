@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from workflow.services.audit_writer import AuditWriter
+
+
+class Command(BaseCommand):
+    help = "Insert audit entries left in the async audit spool by stopped processes."
+
+    def handle(self, *args, **options):
+        writer = AuditWriter(
+            spool_dir=settings.AUDIT_SPOOL_DIR,
+            batch_size=settings.AUDIT_BATCH_SIZE,
+        )
+        if not writer.spool_dir.exists():
+            self.stdout.write("No audit spool directory; nothing to replay.")
+            return
+
+        replayed = writer.recover()
+        self.stdout.write(self.style.SUCCESS(f"Replayed {replayed} audit entries."))
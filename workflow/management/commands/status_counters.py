@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from workflow.services.status_summary import (
+    check_status_counter_drift,
+    rebuild_status_counters,
+)
+
+
+class Command(BaseCommand):
+    help = "Check the denormalized document status counters for drift, or rebuild them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute all counters from workflow_document.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            counts = rebuild_status_counters()
+            for status, n in sorted(counts.items()):
+                self.stdout.write(f"{status}: {n}")
+            self.stdout.write(self.style.SUCCESS("Status counters rebuilt."))
+            return
+
+        drift = check_status_counter_drift()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Status counters are consistent."))
+            return
+
+        for status, (stored, actual) in sorted(drift.items()):
+            self.stderr.write(f"{status}: stored={stored} actual={actual}")
+        raise CommandError("Status counters have drifted; run with --rebuild.")
@@ -0,0 +1,377 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and histograms live in memory per process. When METRICS_DIR is
+set (one directory shared by all gunicorn workers), each process also
+writes its samples to its own JSON file every METRICS_FLUSH_INTERVAL
+seconds and at exit. `/metrics` then sums every file plus the live values
+of the process serving the scrape. Every stored sample is a running
+total, so summing files is correct, and totals from restarted workers
+are kept. Clear the directory on deploy, as with prometheus_client's
+multiprocess mode.
+
+Gauges (status counts, queue age) are read from the database at scrape
+time, so they never need merging.
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger("workflow.metrics")
+
+# Seconds; covers single-row transitions up to slow, contended ones
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds a document waited for a decision: one minute to one month
+QUEUE_BUCKETS = (60, 300, 900, 3600, 4 * 3600, 8 * 3600, 86400, 3 * 86400, 7 * 86400, 30 * 86400)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\""))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class Registry:
+    """Summable samples keyed by `(sample name, sorted label pairs)`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._values = {}
+        self._path = None
+        self._thread = None
+
+    def _ensure_process(self):
+        # A forked worker must not report the parent's samples as its own
+        if self._pid != os.getpid():
+            self._reset()
+        directory = settings.METRICS_DIR
+        if directory and self._thread is None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            self._path = Path(directory) / f"{self._pid}-{uuid.uuid4().hex[:8]}.json"
+            self._thread = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def add(self, samples):
+        """Add `(sample name, labels, amount)` triples atomically."""
+        if not settings.METRICS_ENABLED:
+            return
+        with self._lock:
+            self._ensure_process()
+            for sample, labels, amount in samples:
+                key = (sample, labels)
+                self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                return {}
+            return dict(self._values)
+
+    def flush(self):
+        """Write this process's totals to its file (atomic replace)."""
+        path = self._path
+        if path is None:
+            return
+        data = [[name, list(map(list, labels)), value] for (name, labels), value in self.snapshot().items()]
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, path)
+        except OSError:
+            logger.exception("Could not write metrics file", extra={"failure": str(path)})
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def collect(self):
+        """Totals across all processes that share METRICS_DIR."""
+        merged = {}
+        own = self._path
+        directory = settings.METRICS_DIR
+        if directory and Path(directory).is_dir():
+            for path in Path(directory).glob("*.json"):
+                if path == own:
+                    continue
+                try:
+                    rows = json.loads(path.read_text())
+                except (OSError, ValueError):
+                    continue  # being replaced or truncated; next scrape catches up
+                for name, labels, value in rows:
+                    key = (name, tuple(tuple(pair) for pair in labels))
+                    merged[key] = merged.get(key, 0.0) + value
+        for key, value in self.snapshot().items():
+            merged[key] = merged.get(key, 0.0) + value
+        return merged
+
+    def render(self, gauges=()):
+        """
+        Prometheus text format (0.0.4) for registered metrics plus
+        `gauges`, an iterable of `(name, documentation, [(labels, value)])`.
+        """
+        merged = self.collect()
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for (sample, labels), value in sorted(merged.items(), key=metric.sort_key):
+                if metric.owns(sample):
+                    lines.append(f"{sample}{_format_labels(labels)} {_format_value(value)}")
+        for name, documentation, samples in gauges:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(tuple(labels))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class _Metric:
+    kind = None
+    suffixes = ("",)
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def owns(self, sample):
+        return sample in {self.name + suffix for suffix in self.suffixes}
+
+    def sort_key(self, item):
+        (sample, labels), _ = item
+        le = dict(labels).get("le")
+        bound = float("inf") if le == "+Inf" else float(le) if le else 0.0
+        base_labels = tuple(pair for pair in labels if pair[0] != "le")
+        return base_labels, sample, bound
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        self.registry.add([(self.name, self._labels(labels), amount)])
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+    suffixes = ("_bucket", "_sum", "_count")
+
+    def __init__(self, registry, name, documentation, labelnames, buckets):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        self.observe_many([value], **labels)
+
+    def observe_many(self, values, **labels):
+        """Record several observations with one lock acquisition."""
+        base = self._labels(labels)
+        counts = [0] * len(self.buckets)
+        for value in values:
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+        # Cumulative buckets: each `le` counts every observation at or below it
+        samples, running = [], 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            le = "+Inf" if bound == float("inf") else _format_value(bound)
+            samples.append((f"{self.name}_bucket", base + (("le", le),), running))
+        samples.append((f"{self.name}_sum", base, float(sum(values))))
+        samples.append((f"{self.name}_count", base, len(values)))
+        self.registry.add(samples)
+
+
+registry = Registry()
+
+AUDIT_EVENTS = registry.counter(
+    "rbaw_audit_events_total",
+    "Audit log entries committed, by action.",
+    ["action"],
+)
+TRANSITION_SECONDS = registry.histogram(
+    "rbaw_transition_duration_seconds",
+    "Time spent in Document.submit/approve/reject.",
+    ["transition", "outcome"],
+)
+QUEUE_SECONDS = registry.histogram(
+    "rbaw_document_queue_seconds",
+    "Time from submission to approval or rejection.",
+    ["decision"],
+    buckets=QUEUE_BUCKETS,
+)
+REQUEST_SECONDS = registry.histogram(
+    "rbaw_view_duration_seconds",
+    "Request latency per view.",
+    ["view"],
+)
+REQUEST_DB_SECONDS = registry.histogram(
+    "rbaw_view_db_seconds",
+    "Database time per request, per view.",
+    ["view"],
+)
+LOG_RECORDS_DROPPED = registry.counter(
+    "rbaw_log_records_dropped_total",
+    "Log records dropped because the background writer's queue was full.",
+    ["level"],
+)
+# Fed from pool statistics by workflow.db_pool
+DB_POOL_REQUESTS = registry.counter(
+    "rbaw_db_pool_requests_total",
+    "Connections checked out of the pool, per alias.",
+    ["alias"],
+)
+DB_POOL_QUEUED = registry.counter(
+    "rbaw_db_pool_requests_queued_total",
+    "Checkouts that had to wait for a free connection.",
+    ["alias"],
+)
+DB_POOL_WAIT_SECONDS = registry.counter(
+    "rbaw_db_pool_wait_seconds_total",
+    "Time spent waiting for a pooled connection.",
+    ["alias"],
+)
+DB_POOL_ERRORS = registry.counter(
+    "rbaw_db_pool_errors_total",
+    "Checkout timeouts, failed connection attempts and connections found broken.",
+    ["alias", "kind"],
+)
+# Fed by workflow.cache.TieredCache
+CACHE_REQUESTS = registry.counter(
+    "rbaw_cache_requests_total",
+    "Cache lookups per tier (local LRU, shared) and result (hit, miss).",
+    ["tier", "result"],
+)
+CACHE_EVICTIONS = registry.counter(
+    "rbaw_cache_evictions_total",
+    "Entries evicted to keep the local LRU within LOCAL_MAX_ENTRIES.",
+    ["tier"],
+)
+
+
+def observe_transition(name):
+    """Decorator timing a Document transition method into TRANSITION_SECONDS."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = method(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                TRANSITION_SECONDS.observe(
+                    time.perf_counter() - start, transition=name, outcome=outcome
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def record_queue_time(decision, submitted_at):
+    """
+    Observe how long documents waited for `decision`, once the surrounding
+    transaction commits. `submitted_at` is a list of submission times.
+    """
+    from django.db import transaction
+    from django.utils import timezone
+
+    def observe():
+        now = timezone.now()
+        QUEUE_SECONDS.observe_many(
+            [(now - at).total_seconds() for at in submitted_at], decision=decision
+        )
+
+    transaction.on_commit(observe)
+
+
+def count_audit_events(action, count=1):
+    """Count audit entries once the surrounding transaction commits."""
+    from django.db import transaction
+
+    transaction.on_commit(lambda: AUDIT_EVENTS.inc(count, action=action))
+
+
+def database_gauges():
+    """Status counts, queue age and stray audit rows, read at scrape time."""
+    from django.db import connection
+    from django.db.models import Min
+    from django.utils import timezone
+
+    from workflow import partitioning
+    from workflow.models import Document, DocumentStatusCounter
+
+    counts = dict(DocumentStatusCounter.objects.values_list("status", "count"))
+    oldest = Document.objects.filter(status=Document.Status.SUBMITTED).aggregate(
+        oldest=Min("updated_at")
+    )["oldest"]
+    age = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+
+    return [
+        (
+            "rbaw_documents",
+            "Documents per status (SUBMITTED is the approval queue depth).",
+            [((("status", status),), counts.get(status, 0)) for status in Document.Status.values],
+        ),
+        (
+            "rbaw_queue_oldest_age_seconds",
+            "Age of the longest-waiting submitted document.",
+            [((), age)],
+        ),
+    ] + _partition_gauges(connection, partitioning)
+
+
+def _partition_gauges(connection, partitioning):
+    if not partitioning.is_supported(connection) or not partitioning.is_partitioned(connection):
+        return []
+    return [
+        (
+            "rbaw_audit_default_partition_rows",
+            "Audit entries outside every monthly partition; run audit_partitions when above 0.",
+            [((), partitioning.default_partition_rows(connection))],
+        ),
+    ]
@@ -1,5 +1,22 @@
 import uuid
 import contextvars
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from workflow import db_router
+from workflow.metrics import REQUEST_DB_SECONDS, REQUEST_SECONDS
+
+logger = logging.getLogger("workflow.request")
+
+# Longest SQL text kept in a profile record
+SQL_PREVIEW_CHARS = 1000
 
 # Request-scoped correlation ID
 correlation_id_var = contextvars.ContextVar("correlation_id", default=None)
@@ -14,15 +31,218 @@ class CorrelationIdMiddleware:
     Assigns a correlation ID per request.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        correlation_id = self._assign(request)
+        response = self.get_response(request)
+        response["X-Correlation-ID"] = correlation_id
+
+        return response
+
+    async def __acall__(self, request):
+        correlation_id = self._assign(request)
+        response = await self.get_response(request)
+        response["X-Correlation-ID"] = correlation_id
+
+        return response
+
+    @staticmethod
+    def _assign(request):
         correlation_id = request.headers.get(
             "X-Correlation-ID") or str(uuid.uuid4())
         correlation_id_var.set(correlation_id)  # type: ignore
+        return correlation_id
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Request scope for workflow.db_router.
+
+    Reads the read-your-writes cookie before the view, and sets it on the
+    response to any request that wrote, so the browser's next pages read
+    from the primary. Not loaded when DATABASE_REPLICAS is empty.
+
+    Must come before SessionMiddleware, so session writes pin too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        token = db_router.begin_request(db_router.PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = db_router.end_request(token)
+        return self._pin(response, wrote)
+
+    async def __acall__(self, request):
+        token = db_router.begin_request(db_router.PIN_COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrote = db_router.end_request(token)
+        return self._pin(response, wrote)
+
+    @staticmethod
+    def _pin(response, wrote):
+        if wrote:
+            response.set_cookie(
+                db_router.PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class _QueryTimer:
+    """`execute_wrapper` hook totalling query count and time."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.total += elapsed
+            if elapsed >= self.slowest:
+                self.slowest = elapsed
+                self.slowest_sql = sql
+
+
+def _time_queries(stack, timer):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(timer))
 
-        response = self.get_response(request)
-        response["X-Correlation-ID"] = correlation_id
 
+class RequestProfilingMiddleware:
+    """
+    Logs latency, query count, DB time, the slowest statement and template
+    render time to `workflow.request`.
+
+    A REQUEST_PROFILING_SAMPLE_RATE fraction of requests is logged at INFO;
+    requests slower than REQUEST_SLOW_MS are always logged as warnings.
+    SQL is logged without parameters. Template time covers TemplateResponse
+    rendering, including queries run lazily from templates; latency stops
+    when the response is returned, before any streamed body is sent.
+
+    With METRICS_ENABLED, latency and DB time of every request also feed
+    the per-view histograms in `workflow.metrics`.
+
+    Under ASGI, queries run in the request's thread-sensitive executor
+    thread, which has its own connections; the timer is attached there.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        self.slow_ms = settings.REQUEST_SLOW_MS
+        self.metrics = settings.METRICS_ENABLED
+        if self.sample_rate <= 0 and self.slow_ms <= 0 and not self.metrics:
+            raise MiddlewareNotUsed
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        timer = _QueryTimer()
+        request._profile_template_ms = None
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            _time_queries(stack, timer)
+            response = self.get_response(request)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        self._record(request, response, latency_ms, timer)
+        return response
+
+    async def __acall__(self, request):
+        timer = _QueryTimer()
+        request._profile_template_ms = None
+        start = time.perf_counter()
+        stack = ExitStack()
+        await sync_to_async(_time_queries)(stack, timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        self._record(request, response, latency_ms, timer)
         return response
+
+    def _record(self, request, response, latency_ms, timer):
+        if self.metrics:
+            match = request.resolver_match
+            view = match.view_name if match else "unresolved"
+            REQUEST_SECONDS.observe(latency_ms / 1000, view=view)
+            REQUEST_DB_SECONDS.observe(timer.total, view=view)
+
+        slow = 0 < self.slow_ms <= latency_ms
+        if slow or random.random() < self.sample_rate:
+            self._log(request, response, latency_ms, timer, slow)
+
+    def process_template_response(self, request, response):
+        # Runs last among template-response hooks, right before render()
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._profile_template_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def _log(self, request, response, latency_ms, timer, slow):
+        extra = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "latency_ms": round(latency_ms, 2),
+            "db_queries": timer.count,
+            "db_time_ms": round(timer.total * 1000, 2),
+            "slowest_sql_ms": round(timer.slowest * 1000, 2),
+            "slowest_sql": (timer.slowest_sql or "")[:SQL_PREVIEW_CHARS] or None,
+            "template_ms": request._profile_template_ms,
+        }
+        if slow:
+            logger.warning("Slow request", extra=extra)
+        else:
+            logger.info("Request profile", extra=extra)
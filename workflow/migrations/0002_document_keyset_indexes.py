@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-17 07:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['created_at', 'id'], name='workflow_do_created_8bdbaf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['created_by', 'created_at', 'id'], name='workflow_do_created_53cf16_idx'),
+        ),
+    ]
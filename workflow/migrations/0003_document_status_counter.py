@@ -0,0 +1,35 @@
+# Generated by Django 5.2.10 on 2026-10-17 07:35
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    Document = apps.get_model("workflow", "Document")
+    DocumentStatusCounter = apps.get_model("workflow", "DocumentStatusCounter")
+
+    actual = dict(
+        Document.objects.order_by().values_list("status").annotate(n=Count("id"))
+    )
+    DocumentStatusCounter.objects.bulk_create(
+        DocumentStatusCounter(status=status, count=actual.get(status, 0))
+        for status in ("DRAFT", "SUBMITTED", "APPROVED", "REJECTED")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0002_document_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentStatusCounter',
+            fields=[
+                ('status', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-17 07:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0004_auditlog_created_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['document', 'created_at'], name='workflow_au_documen_5146d5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['actor', 'created_at'], name='workflow_au_actor_i_3a2b76_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from workflow.partitioning import partition_auditlog, unpartition_auditlog
+
+
+class Migration(migrations.Migration):
+    """
+    Convert workflow_auditlog into a monthly range-partitioned table on
+    PostgreSQL. Existing rows are copied into their month's partition.
+    No-op on other backends.
+    """
+
+    dependencies = [
+        ('workflow', '0005_auditlog_time_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_auditlog, unpartition_auditlog),
+    ]
@@ -0,0 +1,67 @@
+import warnings
+
+from django.db import ProgrammingError, migrations, transaction
+
+INSUFFICIENT_PRIVILEGE = "42501"
+
+# Match the expression Django emits for `__icontains` on PostgreSQL,
+# UPPER(col::text) LIKE UPPER('%term%'), so the planner can use the index.
+TRIGRAM_INDEXES = [
+    ("workflow_user_username_trgm", "auth_user", "username"),
+    ("workflow_document_title_trgm", "workflow_document", "title"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        installed = cursor.fetchone() is not None
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        available = cursor.fetchone() is not None
+    if not installed:
+        if not available:
+            # Without postgresql-contrib the searches still work, unindexed.
+            warnings.warn("pg_trgm is not available; audit search trigram indexes skipped.")
+            return
+        try:
+            # A savepoint, so a refusal does not abort the migration
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except ProgrammingError as exc:
+            cause = exc.__cause__
+            if getattr(cause, "sqlstate", getattr(cause, "pgcode", None)) != INSUFFICIENT_PRIVILEGE:
+                raise
+            # Managed databases often reserve CREATE EXTENSION for an admin
+            # role. Have it install pg_trgm before migrating to get the
+            # indexes; the searches still work without them.
+            warnings.warn(
+                "Not allowed to create the pg_trgm extension; audit search trigram indexes skipped."
+            )
+            return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" '
+            f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0006_partition_auditlog'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
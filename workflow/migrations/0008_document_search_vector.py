@@ -0,0 +1,36 @@
+# Generated by Django 5.2.10 on 2026-10-17 07:49
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "workflow_document_search_gin" '
+        'ON "workflow_document" USING gin ("search_vector")'
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS "workflow_document_search_gin"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0007_audit_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Existing rows are indexed by `manage.py rebuild_search_vectors`.
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
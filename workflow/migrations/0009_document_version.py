@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0008_document_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.10 on 2026-10-17 08:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('workflow', '0009_document_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('DOCUMENT_CREATED', 'Document created'), ('DOCUMENT_SUBMITTED', 'Document submitted'), ('DOCUMENT_APPROVED', 'Document approved'), ('DOCUMENT_REJECTED', 'Document rejected'), ('STAGE_APPROVED', 'Approval stage vote')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='ApprovalWorkflow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('is_default', models.BooleanField(default=False)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('is_default',), name='single_default_workflow')],
+            },
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='workflow',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='documents', to='workflow.approvalworkflow'),
+        ),
+        migrations.CreateModel(
+            name='WorkflowStage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('name', models.CharField(max_length=100)),
+                ('required_approvals', models.PositiveSmallIntegerField(default=1)),
+                ('approver_group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='approval_stages', to='auth.group')),
+                ('approvers', models.ManyToManyField(blank=True, related_name='approval_stages', to=settings.AUTH_USER_MODEL)),
+                ('workflow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stages', to='workflow.approvalworkflow')),
+            ],
+            options={
+                'ordering': ['workflow', 'position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StageDecision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('APPROVED', 'Approved'), ('REJECTED', 'Rejected')], max_length=20)),
+                ('decided_at', models.DateTimeField(auto_now_add=True)),
+                ('decided_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stage_decisions', to=settings.AUTH_USER_MODEL)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stage_decisions', to='workflow.document')),
+                ('stage', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='decisions', to='workflow.workflowstage')),
+            ],
+            options={
+                'ordering': ['decided_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='current_stage',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='workflow.workflowstage'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['current_stage', 'created_at', 'id'], name='workflow_do_current_8f68ea_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='workflowstage',
+            constraint=models.UniqueConstraint(fields=('workflow', 'position'), name='unique_stage_position'),
+        ),
+        migrations.AddConstraint(
+            model_name='workflowstage',
+            constraint=models.CheckConstraint(condition=models.Q(('required_approvals__gte', 1)), name='stage_requires_approval'),
+        ),
+        migrations.AddConstraint(
+            model_name='stagedecision',
+            constraint=models.UniqueConstraint(fields=('document', 'stage', 'decided_by'), name='unique_vote_per_stage'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-17 08:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0010_approval_chains'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('approver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to=settings.AUTH_USER_MODEL)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='workflow.document')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['approver', 'created_at', 'document'], name='workflow_in_approve_af8801_idx')],
+                'constraints': [models.UniqueConstraint(fields=('approver', 'document'), name='unique_inbox_entry')],
+            },
+        ),
+    ]
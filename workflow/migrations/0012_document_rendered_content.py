@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-17 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0011_approval_inbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='content_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-17 09:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0012_document_rendered_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentBody',
+            fields=[
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='workflow.document')),
+                ('content', models.TextField(blank=True, default='')),
+                ('content_html', models.TextField(blank=True, default='', editable=False)),
+                ('content_hash', models.CharField(blank=True, default='', editable=False, max_length=64)),
+            ],
+        ),
+    ]
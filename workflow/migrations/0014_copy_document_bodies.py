@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-17 09:53
+
+from django.db import migrations
+
+# Set-based, so large tables copy in one statement. A migration of its own:
+# on PostgreSQL the columns cannot be dropped in the transaction that
+# inserted rows referencing the table (pending FK trigger events).
+COPY_BODIES = """
+INSERT INTO workflow_documentbody (document_id, content, content_html, content_hash)
+SELECT id, content, content_html, content_hash FROM workflow_document
+"""
+
+RESTORE_BODIES = """
+UPDATE workflow_document SET
+    content = COALESCE((SELECT b.content FROM workflow_documentbody b WHERE b.document_id = workflow_document.id), ''),
+    content_html = COALESCE((SELECT b.content_html FROM workflow_documentbody b WHERE b.document_id = workflow_document.id), ''),
+    content_hash = COALESCE((SELECT b.content_hash FROM workflow_documentbody b WHERE b.document_id = workflow_document.id), '')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0013_documentbody'),
+    ]
+
+    operations = [
+        migrations.RunSQL(COPY_BODIES, RESTORE_BODIES),
+    ]
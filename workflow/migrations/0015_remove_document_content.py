@@ -0,0 +1,31 @@
+# Generated by Django 5.2.10 on 2026-10-17 09:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0014_copy_document_bodies'),
+    ]
+
+    operations = [
+        # Lets the column be re-added to existing rows if this is reversed
+        migrations.AlterField(
+            model_name='document',
+            name='content',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='document',
+            name='content',
+        ),
+        migrations.RemoveField(
+            model_name='document',
+            name='content_hash',
+        ),
+        migrations.RemoveField(
+            model_name='document',
+            name='content_html',
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-17 12:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow', '0015_remove_document_content'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['status', 'updated_at'], name='workflow_do_status_1a8521_idx'),
+        ),
+    ]
@@ -1,5 +1,18 @@
-from django.contrib.auth.mixins import UserPassesTestMixin
+import hashlib
+
+from django.contrib.auth.mixins import AccessMixin, UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from workflow.services.roles import (
+    ADMIN_ROLES,
+    APPROVER_ROLES,
+    EMPLOYEE_ROLES,
+    aget_role_names,
+    ahas_any_role,
+    get_role_names,
+    has_any_role,
+)
 
 
 class GroupRequiredMixin(UserPassesTestMixin):
@@ -8,7 +21,7 @@ class GroupRequiredMixin(UserPassesTestMixin):
     Subclasses must define `required_groups`.
     """
 
-    required_groups: list[str] = []
+    required_groups: tuple[str, ...] = ()
 
     def test_func(self):
         user = self.request.user # type: ignore
@@ -20,19 +33,19 @@ class GroupRequiredMixin(UserPassesTestMixin):
         if user.is_superuser:
             return True
 
-        return user.groups.filter(name__in=self.required_groups).exists()
+        return has_any_role(user, self.required_groups)
 
 
 class EmployeeRequiredMixin(GroupRequiredMixin):
-    required_groups = ["Employee", "Manager", "Admin"]
+    required_groups = EMPLOYEE_ROLES
 
 
 class ManagerRequiredMixin(GroupRequiredMixin):
-    required_groups = ["Manager", "Admin"]
+    required_groups = APPROVER_ROLES
 
 
 class AdminRequiredMixin(GroupRequiredMixin):
-    required_groups = ["Admin"]
+    required_groups = ADMIN_ROLES
 
 
 class ApproverRequiredMixin(GroupRequiredMixin):
@@ -41,4 +54,169 @@ class ApproverRequiredMixin(GroupRequiredMixin):
     Self-approval must be enforced at the view level.
     """
 
-    required_groups = ["Manager", "Admin"]
+    required_groups = APPROVER_ROLES
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    """
+    LoginRequiredMixin for async views.
+
+    Loads the user with `request.auser()` so no query runs on the event
+    loop, and stores it on `request.user` for the view and templates.
+    Role names are memoised on it too: every page's `role_flags` needs
+    them, and Django renders error pages of async views outside the
+    request's thread.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        await aget_role_names(request.user)
+        if not await self.has_access(request.user):
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def has_access(self, user):
+        return user.is_authenticated
+
+
+class AsyncGroupRequiredMixin(AsyncLoginRequiredMixin):
+    """GroupRequiredMixin for async views."""
+
+    required_groups: tuple[str, ...] = ()
+
+    async def has_access(self, user):
+        if not user.is_authenticated:
+            return False
+        return user.is_superuser or await ahas_any_role(user, self.required_groups)
+
+
+class AsyncManagerRequiredMixin(AsyncGroupRequiredMixin):
+    required_groups = APPROVER_ROLES
+
+
+class ReadReplicaMixin:
+    """
+    For pages that only read: their queries of workflow data go to a read
+    replica (workflow.db_router), unless the user wrote moments ago.
+    Works for sync and async views.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        from workflow.db_router import read_from_replica
+
+        read_from_replica()
+        return super().dispatch(request, *args, **kwargs)  # type: ignore
+
+
+class AllowedActionsMixin:
+    """
+    For list views: sets `allowed_actions` on every listed document with
+    one batched state-machine call, so templates test membership
+    (`{% if "submit" in doc.allowed_actions %}`) instead of re-deriving rules.
+    """
+
+    def get_context_data(self, **kwargs):
+        from workflow.transitions import annotate_allowed_actions
+
+        context = super().get_context_data(**kwargs)  # type: ignore
+        annotate_allowed_actions(self.request.user, context["object_list"])  # type: ignore
+        return context
+
+
+class LiveEventsMixin:
+    """Exposes `live_events_path` for pages that follow workflow.live events."""
+
+    def get_context_data(self, **kwargs):
+        from django.conf import settings
+
+        context = super().get_context_data(**kwargs)  # type: ignore
+        context["live_events_path"] = settings.LIVE_EVENTS_PATH
+        return context
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET/HEAD with 304 Not Modified while the browser's copy of
+    the page is current, before the view runs its queries or renders.
+
+    Views implement `get_page_version(request, **kwargs)` (async views:
+    `aget_page_version`), returning a version string from a query much
+    cheaper than the page's own, or None to serve the page as usual. The
+    version must change whenever the page would. The ETag also covers the
+    user, their roles and their CSRF secret, since every page shows the
+    navigation and carries CSRF tokens; no Last-Modified is sent, as a
+    date could not follow those. Place the mixin after
+    the login mixin, so anonymous users are still redirected, and after
+    ReadReplicaMixin, so the version is read where the page would be.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        from django.conf import settings
+
+        if not (settings.CONDITIONAL_GET and request.method in ("GET", "HEAD")) or _must_render(request):
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+        if self.view_is_async:  # type: ignore
+            return self._adispatch(request, *args, **kwargs)
+
+        version = self.get_page_version(request, **kwargs)
+        if version is None:
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+        etag = _page_etag(request, version, get_role_names(request.user))
+        return (
+            _not_modified(request, etag)
+            or _with_validators(super().dispatch(request, *args, **kwargs), etag)  # type: ignore
+        )
+
+    async def _adispatch(self, request, *args, **kwargs):
+        version = await self.aget_page_version(request, **kwargs)
+        if version is None:
+            return await super().dispatch(request, *args, **kwargs)  # type: ignore
+        etag = _page_etag(request, version, await aget_role_names(request.user))
+        return (
+            _not_modified(request, etag)
+            or _with_validators(await super().dispatch(request, *args, **kwargs), etag)  # type: ignore
+        )
+
+    def get_page_version(self, request, **kwargs):
+        return None
+
+    async def aget_page_version(self, request, **kwargs):
+        return None
+
+
+def _must_render(request):
+    from django.contrib.messages import get_messages
+
+    # Without a CSRF cookie, rendering sets one and changes the ETag
+    if not request.META.get("CSRF_COOKIE"):
+        return True
+    # A 304 would keep messages from being shown; len() does not consume them
+    return bool(len(get_messages(request)))
+
+
+def _page_etag(request, version, role_names):
+    user = request.user
+    key = "|".join((
+        version,
+        str(user.pk),
+        str(user.is_superuser),
+        ",".join(sorted(role_names)),
+        request.META["CSRF_COOKIE"],
+    ))
+    # Weak: CSRF tokens are masked differently on every render
+    return 'W/"%s"' % hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _not_modified(request, etag):
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        _with_validators(response, etag)
+    return response
+
+
+def _with_validators(response, etag):
+    if response.status_code in (200, 304):
+        response.headers["ETag"] = etag
+        # Only the user's browser may keep it, and must revalidate
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
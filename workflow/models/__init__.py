@@ -1,5 +1,20 @@
-from .document import Document
+from .document import Document, DocumentBody, TransitionConflict
 from .approval import ApprovalStep
+from .chain import ApprovalWorkflow, StageDecision, WorkflowStage
 from .audit import AuditLog, AuditAction
+from .stats import DocumentStatusCounter
+from .inbox import InboxEntry
 
-__all__ = ["Document", "ApprovalStep", "AuditLog", "AuditAction"]
\ No newline at end of file
+__all__ = [
+    "Document",
+    "DocumentBody",
+    "TransitionConflict",
+    "ApprovalStep",
+    "ApprovalWorkflow",
+    "WorkflowStage",
+    "StageDecision",
+    "AuditLog",
+    "AuditAction",
+    "DocumentStatusCounter",
+    "InboxEntry",
+]
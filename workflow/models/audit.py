@@ -1,5 +1,11 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from workflow.cache import AUDIT, DOCUMENTS, INBOX, invalidate
+from workflow.live import publish_status_change
+from workflow.metrics import count_audit_events
 
 User = get_user_model()
 
@@ -9,6 +15,7 @@ class AuditAction(models.TextChoices):
     DOCUMENT_SUBMITTED = "DOCUMENT_SUBMITTED", "Document submitted"
     DOCUMENT_APPROVED = "DOCUMENT_APPROVED", "Document approved"
     DOCUMENT_REJECTED = "DOCUMENT_REJECTED", "Document rejected"
+    STAGE_APPROVED = "STAGE_APPROVED", "Approval stage vote"
 
 
 class AuditLog(models.Model):
@@ -39,12 +46,16 @@ class AuditLog(models.Model):
 
     metadata = models.JSONField(default=dict, blank=True)
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Explicit default (not auto_now_add) so entries written later by the
+    # async audit writer keep the time of the event itself.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["action", "created_at"]),
+            models.Index(fields=["document", "created_at"]),
+            models.Index(fields=["actor", "created_at"]),
         ]
 
     def __str__(self):
@@ -54,11 +65,56 @@ class AuditLog(models.Model):
     def log(*, action, actor, document=None, metadata=None):
         """
         Canonical audit logging entry point.
-        Intentionally thin: no branching, no defaults beyond metadata.
+        Intentionally thin: no defaults beyond metadata.
+
+        With AUDIT_ASYNC enabled the entry is handed to the audit writer
+        once the surrounding transaction commits and the returned instance
+        is unsaved.
         """
-        return AuditLog.objects.create(
+        entry = AuditLog(
             action=action,
             actor=actor,
             document=document,
             metadata=metadata or {},
         )
+        count_audit_events(action)
+        publish_status_change(action)
+        invalidate(AUDIT, DOCUMENTS, INBOX)
+        if settings.AUDIT_ASYNC:
+            AuditLog._defer([entry])
+        else:
+            entry.save(force_insert=True)
+        return entry
+
+    @staticmethod
+    def bulk_log(*, action, actor, documents, metadata=None):
+        """
+        Batch variant of `log`: one entry per document, one INSERT.
+        """
+        entries = [
+            AuditLog(
+                action=action,
+                actor=actor,
+                document=document,
+                metadata=metadata or {},
+            )
+            for document in documents
+        ]
+        count_audit_events(action, len(entries))
+        publish_status_change(action, len(entries))
+        invalidate(AUDIT, DOCUMENTS, INBOX)
+        if settings.AUDIT_ASYNC:
+            AuditLog._defer(entries)
+            return entries
+        return AuditLog.objects.bulk_create(entries)
+
+    @staticmethod
+    def _defer(entries):
+        from workflow.services.audit_writer import get_audit_writer
+
+        def submit():
+            writer = get_audit_writer()
+            for entry in entries:
+                writer.submit(entry)
+
+        transaction.on_commit(submit)
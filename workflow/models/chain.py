@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import models
+
+User = get_user_model()
+
+
+class ApprovalWorkflow(models.Model):
+    """
+    An ordered chain of approval stages, e.g. manager → finance → admin.
+    Documents without a workflow keep the single-decision behaviour.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    # Assigned to documents that are submitted without an explicit workflow
+    is_default = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["is_default"],
+                condition=models.Q(is_default=True),
+                name="single_default_workflow",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class WorkflowStage(models.Model):
+    """
+    One stage of a workflow: any `required_approvals` of its approvers
+    (listed users plus members of `approver_group`) must approve before
+    the document moves on. A single rejection rejects the document.
+    """
+
+    workflow = models.ForeignKey(
+        ApprovalWorkflow,
+        on_delete=models.CASCADE,
+        related_name="stages",
+    )
+    position = models.PositiveSmallIntegerField()
+    name = models.CharField(max_length=100)
+    approver_group = models.ForeignKey(
+        Group,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="approval_stages",
+    )
+    approvers = models.ManyToManyField(
+        User,
+        blank=True,
+        related_name="approval_stages",
+    )
+    required_approvals = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        ordering = ["workflow", "position"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["workflow", "position"],
+                name="unique_stage_position",
+            ),
+            models.CheckConstraint(
+                name="stage_requires_approval",
+                condition=models.Q(required_approvals__gte=1),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.workflow} #{self.position}: {self.name}"
+
+
+class StageDecision(models.Model):
+    """One approver's vote on one stage of a document's chain."""
+
+    document = models.ForeignKey(
+        "workflow.Document",
+        on_delete=models.CASCADE,
+        related_name="stage_decisions",
+    )
+    stage = models.ForeignKey(
+        WorkflowStage,
+        on_delete=models.PROTECT,
+        related_name="decisions",
+    )
+    decided_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="stage_decisions",
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ("APPROVED", "Approved"),
+            ("REJECTED", "Rejected"),
+        ],
+    )
+    decided_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["decided_at"]
+        constraints = [
+            # One vote per approver per stage; also serves the quorum count
+            # and the "already voted" check in the pending inbox
+            models.UniqueConstraint(
+                fields=["document", "stage", "decided_by"],
+                name="unique_vote_per_stage",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.document_id}/{self.stage_id} → {self.status} by {self.decided_by}"  # type: ignore
@@ -1,11 +1,38 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
-from .audit import AuditLog, AuditAction
+from workflow.cache import DOCUMENTS, invalidate
+from workflow.metrics import observe_transition
+from workflow.services.roles import is_admin
 
 User = get_user_model()
 
 
+class TransitionConflict(ValueError):
+    """A concurrent request already moved the document out of the expected state."""
+
+
+class DocumentQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Admins see every document, everyone else only their own."""
+        if is_admin(user):
+            return self
+        return self.filter(created_by=user)
+
+    def awaiting_decision_by(self, user):
+        """Submitted documents `user` can still decide or vote on."""
+        from workflow.services.approval_chain import pending_stage_filter
+
+        return (
+            self.filter(status=Document.Status.SUBMITTED)
+            .exclude(created_by=user)
+            .filter(pending_stage_filter(user))
+        )
+
+
 class Document(models.Model):
     class Status(models.TextChoices):
         DRAFT = "DRAFT", "Draft"
@@ -14,7 +41,7 @@ class Document(models.Model):
         REJECTED = "REJECTED", "Rejected"
 
     title = models.CharField(max_length=255)
-    content = models.TextField()
+    # The body lives in DocumentBody; see the `content` property
     status = models.CharField(
         max_length=20,
         choices=Status.choices,
@@ -27,10 +54,40 @@ class Document(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped by every conditional write; guards draft edits against lost updates
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Multi-stage approval chain (null: one decision by any approver).
+    # `current_stage` is the open stage while SUBMITTED, null otherwise.
+    workflow = models.ForeignKey(
+        "workflow.ApprovalWorkflow",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="documents",
+    )
+    current_stage = models.ForeignKey(
+        "workflow.WorkflowStage",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
+    # Maintained by workflow.services.document_search (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = DocumentQuerySet.as_manager()
 
     class Meta:
         indexes = [
             models.Index(fields=["status", "created_at"]),
+            # Queue age gauge: oldest updated_at among SUBMITTED
+            models.Index(fields=["status", "updated_at"]),
+            # Keyset pagination on (created_at, id)
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["created_by", "created_at", "id"]),
+            # Pending-stage inbox: documents waiting on the stages a user approves
+            models.Index(fields=["current_stage", "created_at", "id"]),
         ]
         constraints = [
             models.CheckConstraint(
@@ -49,65 +106,169 @@ class Document(models.Model):
     def __str__(self):
         return f"{self.title} [{self.status}]"
 
+    # Set by the `content` setter until the body row is written
+    _body_edited = False
+
+    @property
+    def content(self):
+        """The raw body. Reads the DocumentBody row on first use."""
+        return self._body().content
+
+    @content.setter
+    def content(self, value):
+        self._body().content = value
+        self._body_edited = True
+
+    def _body(self):
+        try:
+            return self.body
+        except DocumentBody.DoesNotExist:
+            self.body = DocumentBody(document=self)
+            return self.body
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        save_body = self._state.adding or (
+            self._body_edited and (update_fields is None or "content" in update_fields)
+        )
+        if update_fields is not None and "content" in update_fields:
+            # Not a column here; editing the body still touches the document
+            kwargs["update_fields"] = {*update_fields, "updated_at"} - {"content"}
+
+        with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+            super().save(*args, **kwargs)
+            if save_body:
+                body = self._body()
+                body.save(using=kwargs.get("using"), force_insert=body._state.adding)
+        self._body_edited = False
+
+    def _compare_and_set(self, expected, new):
+        """
+        Move the row from `expected` to `new` with one conditional UPDATE.
+
+        Returns False, without writing, when another request moved it
+        first; concurrent callers are serialised by the row lock, so
+        exactly one of them sees an affected row.
+        """
+        now = timezone.now()
+        updated = Document.objects.filter(pk=self.pk, status=expected).update(
+            status=new,
+            updated_at=now,
+            version=F("version") + 1,
+        )
+        if updated:
+            self.status = new
+            self.updated_at = now
+            self.version += 1
+        return bool(updated)
+
+    # Rules, guards and side effects live in workflow.transitions
+
+    @observe_transition("submit")
     def submit(self, user):
         """Submit a draft document for approval."""
-        if self.status != self.Status.DRAFT:
-            raise ValueError("Only draft documents can be submitted.")
-        if user != self.created_by:
-            raise PermissionError("Only the owner can submit.")
-        with transaction.atomic():
-            self.status = self.Status.SUBMITTED
-            self.save(update_fields=["status", "updated_at"])
-            AuditLog.log(
-                action=AuditAction.DOCUMENT_SUBMITTED,
-                actor=user,
-                document=self,
-            )
+        from workflow.transitions import apply_transition
+
+        return apply_transition(self, "submit", user)
 
+    @observe_transition("approve")
     def approve(self, user):
-        """Approve a submitted document."""
-        from .approval import ApprovalStep
-
-        if self.status != self.Status.SUBMITTED:
-            raise ValueError("Only submitted documents can be approved.")
-        if user == self.created_by:
-            raise PermissionError("Self-approval is not allowed.")
-        if not (user.groups.filter(name__in=["Manager", "Admin"]).exists() or user.is_superuser):
-            raise PermissionError("Only managers or admins can approve.")
-        with transaction.atomic():
-            self.status = self.Status.APPROVED
-            self.save(update_fields=["status", "updated_at"])
-            ApprovalStep.objects.create(
-                document=self,
-                decided_by=user,
-                status=self.Status.APPROVED,
-            )
-            AuditLog.log(
-                action=AuditAction.DOCUMENT_APPROVED,
-                actor=user,
-                document=self,
-            )
+        """
+        Approve a submitted document. On an approval chain this is a vote;
+        returns False while further stages or approvals are outstanding.
+        """
+        from workflow.transitions import apply_transition
 
+        return apply_transition(self, "approve", user)
+
+    @observe_transition("reject")
     def reject(self, user):
         """Reject a submitted document."""
-        from .approval import ApprovalStep
-
-        if self.status != self.Status.SUBMITTED:
-            raise ValueError("Only submitted documents can be rejected.")
-        if user == self.created_by:
-            raise PermissionError("Self-rejection is not allowed.")
-        if not (user.groups.filter(name__in=["Manager", "Admin"]).exists() or user.is_superuser):
-            raise PermissionError("Only managers or admins can reject.")
+        from workflow.transitions import apply_transition
+
+        return apply_transition(self, "reject", user)
+
+    def save_draft(self, expected_version):
+        """
+        Write the edited title/content if the row is still a draft at
+        `expected_version`. Returns False when it was changed or submitted
+        since the editor loaded it.
+        """
+        from workflow.services.document_render import render_content
+        from workflow.services.document_search import update_search_vector
+
+        body = self._body()
+        now = timezone.now()
         with transaction.atomic():
-            self.status = self.Status.REJECTED
-            self.save(update_fields=["status", "updated_at"])
-            ApprovalStep.objects.create(
-                document=self,
-                decided_by=user,
-                status=self.Status.REJECTED,
+            # In the transaction, so that a lost race discards the pasted
+            # images it would have stored
+            body_changed = render_content(body)
+            updated = Document.objects.filter(
+                pk=self.pk,
+                status=self.Status.DRAFT,
+                version=expected_version,
+            ).update(
+                title=self.title,
+                updated_at=now,
+                version=F("version") + 1,
             )
-            AuditLog.log(
-                action=AuditAction.DOCUMENT_REJECTED,
-                actor=user,
-                document=self,
-            )
\ No newline at end of file
+            if updated and body_changed:
+                fields = {
+                    "content": body.content,
+                    "content_html": body.content_html,
+                    "content_hash": body.content_hash,
+                }
+                # Rows from bulk_create or a skipped backfill have no body
+                # yet; the document's row lock serialises this insert
+                if not DocumentBody.objects.filter(document_id=self.pk).update(**fields):
+                    DocumentBody.objects.create(document_id=self.pk, **fields)
+            if not updated:
+                transaction.set_rollback(True)
+        if not updated:
+            return False
+        self._body_edited = False
+        self.version = expected_version + 1
+        self.updated_at = now
+        # .update() skips post_save, which normally refreshes the vector
+        # and drops cached lists
+        update_search_vector(self)
+        invalidate(DOCUMENTS)
+        return True
+
+
+class DocumentBody(models.Model):
+    """
+    The Summernote body of a document, in its own table so that lists,
+    queues and reports never read it. Loaded through `Document.content`
+    on the pages that show or edit it.
+    """
+
+    document = models.OneToOneField(
+        Document,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="body",
+    )
+    # Pasted images are moved to files on save (workflow.services.document_images)
+    content = models.TextField(blank=True, default="")
+    # Sanitized copy of `content` and the digest it was made from, written
+    # together with it (workflow.services.document_render)
+    content_html = models.TextField(blank=True, default="", editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
+
+    def __str__(self):
+        return f"Body of document {self.document_id}"
+
+    def save(self, *args, **kwargs):
+        from workflow.services.document_render import render_content
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            # Deferred fields are not saved, so a deferred body is unchanged
+            writes_content = "content" not in self.get_deferred_fields()
+        else:
+            writes_content = "content" in update_fields
+        if writes_content:
+            if render_content(self) and update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "content_html", "content_hash"}
+        super().save(*args, **kwargs)
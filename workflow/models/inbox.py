@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class InboxEntry(models.Model):
+    """
+    Denormalized approval queue: one row per (approver, submitted document)
+    the approver can still decide or vote on. Maintained in the same
+    transaction as submit, decisions and stage votes (see
+    workflow.services.approval_inbox), so the queue and the dashboard's
+    pending count are index lookups on `approver`.
+    """
+
+    approver = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="inbox_entries",
+    )
+    document = models.ForeignKey(
+        "workflow.Document",
+        on_delete=models.CASCADE,
+        related_name="inbox_entries",
+    )
+    # Copy of Document.created_at, the queue's sort key
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["approver", "document"],
+                name="unique_inbox_entry",
+            ),
+        ]
+        indexes = [
+            # Keyset pagination of one approver's queue, oldest first
+            models.Index(fields=["approver", "created_at", "document"]),
+        ]
+
+    def __str__(self):
+        return f"{self.approver_id} ← {self.document_id}"  # type: ignore
@@ -0,0 +1,32 @@
+from django.db import models
+from django.db.models import F
+
+
+class DocumentStatusCounter(models.Model):
+    """
+    Denormalized per-status document count.
+    Maintained inside the same transaction as every status change so the
+    dashboard can read totals without scanning `workflow_document`.
+    """
+
+    status = models.CharField(max_length=20, primary_key=True)
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.status}: {self.count}"
+
+    @classmethod
+    def adjust(cls, status, delta):
+        """Atomically add `delta` to the counter for `status`."""
+        updated = cls.objects.filter(status=status).update(count=F("count") + delta)
+        if updated:
+            return
+        _, created = cls.objects.get_or_create(status=status, defaults={"count": delta})
+        if not created:
+            cls.objects.filter(status=status).update(count=F("count") + delta)
+
+    @classmethod
+    def shift(cls, from_status, to_status):
+        """Move one document from `from_status` to `to_status`."""
+        cls.adjust(from_status, -1)
+        cls.adjust(to_status, 1)
@@ -0,0 +1,148 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import Http404
+
+
+def encode_cursor(created_at, pk):
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor into ``(created_at, pk)``.
+    Raises Http404 for malformed input, like Django's page lookups.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, TypeError):
+        raise Http404("Invalid page cursor.")
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated queryset.
+    Mirrors the parts of Django's ``Page`` the templates rely on.
+    """
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not (self._has_next and self.object_list):
+            return None
+        last = self.object_list[-1]
+        return encode_cursor(last.created_at, last.pk)
+
+    @property
+    def previous_cursor(self):
+        if not (self._has_previous and self.object_list):
+            return None
+        first = self.object_list[0]
+        return encode_cursor(first.created_at, first.pk)
+
+
+def _keyset_slice(queryset, per_page, after, before, descending, keys):
+    """The ordered, seeked queryset of one page plus its lookahead row."""
+    newest_first = descending if not before else not descending
+    time_key, pk_key = keys
+    if newest_first:
+        ordering = (f"-{time_key}", f"-{pk_key}")
+    else:
+        ordering = (time_key, pk_key)
+
+    cursor = before or after
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        op = "lt" if newest_first else "gt"
+        seek = Q(**{f"{time_key}__{op}": created_at}) | Q(
+            **{time_key: created_at, f"{pk_key}__{op}": pk}
+        )
+        queryset = queryset.filter(seek)
+
+    return queryset.order_by(*ordering)[: per_page + 1]
+
+
+def keyset_rows(queryset, per_page, after=None, before=None, descending=True, keys=("created_at", "id")):
+    """
+    The queryset `paginate_keyset` reads for this page, lookahead row
+    included, e.g. to read a few columns of the page cheaply.
+    """
+    return _keyset_slice(queryset, per_page, after, before, descending, keys)
+
+
+def _keyset_page(rows, per_page, after, before):
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if not before:
+        return KeysetPage(rows, has_next=has_more, has_previous=bool(after))
+
+    rows.reverse()
+    return KeysetPage(rows, has_next=True, has_previous=has_more)
+
+
+def paginate_keyset(queryset, per_page, after=None, before=None, descending=True, keys=("created_at", "id")):
+    """
+    Seek-paginate ``queryset`` on ``(created_at, id)``.
+
+    ``keys`` names the two columns to sort and seek on, for querysets
+    driven by another table's index; they must hold the rows' created_at
+    and pk. Cost depends only on ``per_page``: each page is a single
+    indexed range scan, no OFFSET and no COUNT(*).
+    """
+    rows = list(_keyset_slice(queryset, per_page, after, before, descending, keys))
+    return _keyset_page(rows, per_page, after, before)
+
+
+async def apaginate_keyset(queryset, per_page, after=None, before=None, descending=True, keys=("created_at", "id")):
+    """`paginate_keyset` for async views; the page is read with `aiterator()`."""
+    rows = [
+        row async for row in
+        _keyset_slice(queryset, per_page, after, before, descending, keys).aiterator()
+    ]
+    return _keyset_page(rows, per_page, after, before)
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin replacing OFFSET pagination with ``(created_at, id)``
+    keyset pagination driven by ``?after=`` / ``?before=`` cursors.
+    """
+
+    paginate_by = 25
+    keyset_descending = True
+    keyset_keys = ("created_at", "id")
+
+    def paginate_queryset(self, queryset, page_size):
+        page = paginate_keyset(
+            queryset,
+            page_size,
+            after=self.request.GET.get("after"),  # type: ignore
+            before=self.request.GET.get("before"),  # type: ignore
+            descending=self.keyset_descending,
+            keys=self.keyset_keys,
+        )
+        return None, page, page.object_list, page.has_other_pages()
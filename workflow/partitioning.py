@@ -0,0 +1,266 @@
+"""
+Monthly range partitioning of `workflow_auditlog` on PostgreSQL.
+
+The table is partitioned on `created_at`. Each calendar month (UTC) gets
+its own partition named `workflow_auditlog_pYYYY_MM`, plus a DEFAULT
+partition that catches anything outside the created ranges. Partitions
+should exist before their month starts (see `ensure_partitions`). Rows
+that land in the DEFAULT partition anyway are moved into their month's
+partition when it is created, and `ensure_partitions` creates one for
+every month found there. `default_partition_rows` feeds an alerting
+gauge on /metrics.
+
+Other database backends keep a plain table; every function here is a
+no-op for them and `is_supported` returns False.
+"""
+
+import gzip
+from datetime import datetime, timezone
+
+TABLE = "workflow_auditlog"
+LEGACY_TABLE = f"{TABLE}_legacy"
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_PREFIX = f"{TABLE}_p"
+
+
+def is_supported(connection):
+    return connection.vendor == "postgresql"
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(start):
+    return f"{PARTITION_PREFIX}{start.year:04d}_{start.month:02d}"
+
+
+def parse_partition_name(name):
+    """Return the month start encoded in a partition name, or None."""
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        year, month = name[len(PARTITION_PREFIX):].split("_")
+        return datetime(int(year), int(month), 1, tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def month_range(first, last):
+    """Month starts from `first` to `last`, both inclusive."""
+    current = month_start(first)
+    while current <= last:
+        yield current
+        current = add_months(current, 1)
+
+
+def is_partitioned(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection):
+    """Names of the monthly partitions currently attached, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND pg_table_is_visible(p.oid)",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return sorted(n for n in names if parse_partition_name(n))
+
+
+def default_partition_rows(connection):
+    """Rows in the DEFAULT partition; anything but 0 needs `ensure_partitions`."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM "{DEFAULT_PARTITION}"')
+        return cursor.fetchone()[0]
+
+
+def _default_months(cursor):
+    cursor.execute(
+        "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC') "
+        f'FROM "{DEFAULT_PARTITION}"'
+    )
+    return [month.replace(tzinfo=timezone.utc) for (month,) in cursor.fetchall()]
+
+
+def create_partition(connection, start):
+    """
+    Create the partition for the month starting at `start`, moving its
+    rows out of the DEFAULT partition, which would otherwise make
+    PostgreSQL refuse the new range.
+    """
+    from django.db import transaction
+
+    name = partition_name(start)
+    end = add_months(start, 1)
+    in_range = "created_at >= %s AND created_at < %s"
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [f'"{name}"'])
+        if cursor.fetchone()[0] is not None:
+            return name
+        cursor.execute(f'SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE {in_range} LIMIT 1', [start, end])
+        if cursor.fetchone() is None:
+            cursor.execute(
+                f'CREATE TABLE "{name}" PARTITION OF "{TABLE}" FOR VALUES FROM (%s) TO (%s)',
+                [start, end],
+            )
+            return name
+        # Fill a standalone table, then attach it; attaching builds the
+        # parent's indexes and checks DEFAULT no longer holds the range
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE {in_range} RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+            [start, end],
+        )
+    return name
+
+
+def ensure_partitions(connection, months_ahead=3, now=None):
+    """
+    Create partitions from the current month through `months_ahead`, and
+    for every month that has rows in the DEFAULT partition.
+    """
+    if not is_supported(connection):
+        return []
+    now = now or datetime.now(timezone.utc)
+    first = month_start(now)
+    last = add_months(first, months_ahead)
+    with connection.cursor() as cursor:
+        stranded = _default_months(cursor)
+    months = sorted({*month_range(first, last), *stranded})
+    return [create_partition(connection, start) for start in months]
+
+
+def archive_partition(connection, name, archive_dir):
+    """Stream one partition into `<archive_dir>/<name>.csv.gz`."""
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.csv.gz"
+    with connection.cursor() as cursor, gzip.open(path, "wb") as out:
+        with cursor.copy(
+            f'COPY (SELECT * FROM "{name}" ORDER BY created_at, id) '
+            "TO STDOUT WITH (FORMAT csv, HEADER true)"
+        ) as copy:
+            for block in copy:
+                out.write(block)
+    return path
+
+
+def retire_partitions(connection, before, archive_dir=None):
+    """
+    Detach and drop every monthly partition that ends on or before `before`.
+    With `archive_dir`, each partition is written out as gzipped CSV first.
+    Returns `[(name, archive_path_or_None), ...]`.
+    """
+    if not is_supported(connection):
+        return []
+
+    retired = []
+    for name in list_partitions(connection):
+        start = parse_partition_name(name)
+        if add_months(start, 1) > before:
+            continue
+        path = archive_partition(connection, name, archive_dir) if archive_dir else None
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+            cursor.execute(f'DROP TABLE "{name}"')
+        retired.append((name, path))
+    return retired
+
+
+def _index_definitions(cursor, table):
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes "
+        "WHERE tablename = %s AND indexname <> %s",
+        [table, f"{table}_pkey"],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _foreign_keys(cursor, table):
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _rebuild_table(schema_editor, partition_clause, primary_key):
+    """
+    Recreate `workflow_auditlog` from its current contents, keeping
+    column defaults, identity, index and foreign-key names.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        indexes = _index_definitions(cursor, TABLE)
+        foreign_keys = _foreign_keys(cursor, TABLE)
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{LEGACY_TABLE}"')
+        cursor.execute(
+            f'ALTER TABLE "{LEGACY_TABLE}" '
+            f'RENAME CONSTRAINT "{TABLE}_pkey" TO "{LEGACY_TABLE}_pkey"'
+        )
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{LEGACY_TABLE}" '
+            f"INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS) "
+            f"{partition_clause}"
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY ({primary_key})')
+
+        if partition_clause:
+            cursor.execute(
+                f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT'
+            )
+            cursor.execute(f'SELECT min(created_at) FROM "{LEGACY_TABLE}"')
+            oldest = cursor.fetchone()[0] or datetime.now(timezone.utc)
+            last = add_months(month_start(datetime.now(timezone.utc)), 3)
+            for start in month_range(oldest, last):
+                create_partition(schema_editor.connection, start)
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{LEGACY_TABLE}"')
+        cursor.execute(f'DROP TABLE "{LEGACY_TABLE}"')
+
+        for indexdef in indexes:
+            cursor.execute(indexdef)
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}'
+            )
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('\"{TABLE}\"', 'id'), "
+            f'COALESCE((SELECT max(id) FROM "{TABLE}"), 0) + 1, false)'
+        )
+
+
+def partition_auditlog(apps, schema_editor):
+    """Migration step: convert the plain table into a partitioned one."""
+    if not is_supported(schema_editor.connection) or is_partitioned(schema_editor.connection):
+        return
+    _rebuild_table(schema_editor, "PARTITION BY RANGE (created_at)", "id, created_at")
+
+
+def unpartition_auditlog(apps, schema_editor):
+    """Migration reverse step: fold all partitions back into a plain table."""
+    if not is_supported(schema_editor.connection) or not is_partitioned(schema_editor.connection):
+        return
+    _rebuild_table(schema_editor, "", "id")
@@ -0,0 +1,185 @@
+"""
+Evaluation engine for multi-stage approval chains (see models/chain.py).
+
+A submitted document with a workflow sits in one open stage at a time
+(`Document.current_stage`). Approvers vote on that stage; once
+`required_approvals` approvals are in, the document moves to the next
+stage, and after the last stage it is approved. Any rejection rejects it.
+
+Every call below runs a fixed number of queries, however long the chain
+or however many approvers a stage has.
+"""
+
+from django.db.models import Exists, F, OuterRef, Q
+from django.contrib.auth import get_user_model
+
+from workflow.models import (
+    AuditAction,
+    AuditLog,
+    Document,
+    StageDecision,
+    WorkflowStage,
+)
+from workflow.services.roles import APPROVER_ROLES
+
+# record_vote() outcomes
+VOTE_CONFLICT = "conflict"  # stage closed or vote already cast meanwhile
+VOTE_RECORDED = "recorded"  # counted; the document is still SUBMITTED
+VOTE_FINAL = "final"  # chain finished; caller moves the document status
+
+
+def first_stage(workflow_id=None):
+    """First stage of `workflow_id`, or of the default workflow if None."""
+    stages = WorkflowStage.objects.order_by("position")
+    if workflow_id is None:
+        stages = stages.filter(workflow__is_default=True)
+    else:
+        stages = stages.filter(workflow_id=workflow_id)
+    return stages.first()
+
+
+def enter_first_stage(document):
+    """
+    On submit: open the first stage of the document's workflow (or of the
+    default one). Documents with no workflow to follow are left alone.
+    """
+    stage = first_stage(document.workflow_id)
+    if stage is None:
+        return
+    Document.objects.filter(pk=document.pk).update(
+        workflow_id=stage.workflow_id,
+        current_stage=stage,
+    )
+    document.workflow_id = stage.workflow_id
+    document.current_stage = stage
+
+
+def stage_ids_subquery(user):
+    """Stages `user` approves, directly or through a group."""
+    User = get_user_model()
+    group_ids = User.groups.through.objects.filter(user_id=user.pk).values("group_id")
+    return (
+        WorkflowStage.objects
+        .filter(Q(approvers=user) | Q(approver_group__in=group_ids))
+        .values("pk")
+    )
+
+
+def stage_ids_for(user):
+    return set(stage_ids_subquery(user).values_list("pk", flat=True))
+
+
+def votes_by(user, document_ids):
+    """`{(document_id, stage_id)}` the user already voted on."""
+    if not document_ids:
+        return set()
+    return set(
+        StageDecision.objects
+        .filter(decided_by=user, document_id__in=document_ids)
+        .values_list("document_id", "stage_id")
+    )
+
+
+def pending_stage_filter(user):
+    """
+    Q for submitted documents awaiting `user`: single-step documents, plus
+    chain documents whose open stage `user` approves and has not voted on.
+    Served by the (current_stage, created_at, id) index and the
+    unique_vote_per_stage index.
+    """
+    already_voted = StageDecision.objects.filter(
+        document=OuterRef("pk"),
+        stage=OuterRef("current_stage"),
+        decided_by=user,
+    )
+    return Q(current_stage__isnull=True) | (
+        Q(current_stage__in=stage_ids_subquery(user)) & ~Exists(already_voted)
+    )
+
+
+def pending_approvers(document):
+    """
+    Users who can still vote on the document's open stage (one query).
+    Voting also needs an approver role, as for single-step documents.
+    """
+    User = get_user_model()
+    stage_id = document.current_stage_id
+    if stage_id is None:
+        return User.objects.none()
+
+    voted = StageDecision.objects.filter(
+        document_id=document.pk, stage_id=stage_id, decided_by=OuterRef("pk")
+    )
+    return (
+        User.objects
+        .filter(Q(approval_stages=stage_id) | Q(groups__approval_stages=stage_id))
+        .filter(Q(is_superuser=True) | Q(groups__name__in=APPROVER_ROLES))
+        .exclude(pk=document.created_by_id)
+        .exclude(Exists(voted))
+        .distinct()
+    )
+
+
+def record_vote(document, user, decision):
+    """
+    Cast `user`'s vote on the open stage. Must run inside a transaction.
+
+    The first statement is a conditional UPDATE on the document row, so
+    votes on the same document are serialised and the quorum count below
+    sees every earlier vote.
+    """
+    stage_id = document.current_stage_id
+    locked = Document.objects.filter(
+        pk=document.pk,
+        status=Document.Status.SUBMITTED,
+        current_stage_id=stage_id,
+    ).update(version=F("version") + 1)
+    if not locked:
+        return VOTE_CONFLICT
+    document.version += 1
+
+    if StageDecision.objects.filter(document=document, stage_id=stage_id, decided_by=user).exists():
+        return VOTE_CONFLICT
+    StageDecision.objects.create(
+        document=document, stage_id=stage_id, decided_by=user, status=decision
+    )
+
+    if decision == Document.Status.REJECTED:
+        _close_chain(document)
+        return VOTE_FINAL
+
+    stage = WorkflowStage.objects.get(pk=stage_id)
+    approvals = StageDecision.objects.filter(
+        document=document, stage_id=stage_id, status=Document.Status.APPROVED
+    ).count()
+    metadata = {
+        "stage": stage.name,
+        "approvals": approvals,
+        "required": stage.required_approvals,
+    }
+    if approvals >= stage.required_approvals:
+        next_stage = (
+            WorkflowStage.objects
+            .filter(workflow_id=stage.workflow_id, position__gt=stage.position)
+            .order_by("position")
+            .first()
+        )
+        if next_stage is None:
+            _close_chain(document)
+            return VOTE_FINAL
+        Document.objects.filter(pk=document.pk).update(current_stage=next_stage)
+        document.current_stage = next_stage
+        metadata["next_stage"] = next_stage.name
+
+    AuditLog.log(
+        action=AuditAction.STAGE_APPROVED,
+        actor=user,
+        document=document,
+        metadata=metadata,
+    )
+    return VOTE_RECORDED
+
+
+def _close_chain(document):
+    Document.objects.filter(pk=document.pk).update(current_stage=None)
+    document.current_stage = None
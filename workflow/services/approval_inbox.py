@@ -0,0 +1,178 @@
+"""
+Maintenance of the denormalized approval queue (models.InboxEntry).
+
+Every write path that changes who may decide a document refreshes its
+entries inside the same transaction:
+
+- submit, approve, reject and stage votes (workflow.transitions)
+- bulk decisions (workflow.services.bulk_decision)
+- documents created as SUBMITTED, role changes and stage approver changes
+  (workflow.signals)
+
+`Document.objects.awaiting_decision_by(user)` stays the source of truth;
+`check_inbox_drift()` compares the table against it and `rebuild_inbox()`
+recomputes it from scratch.
+"""
+
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Q
+
+from workflow import live
+from workflow.cache import INBOX, invalidate
+from workflow.models import Document, InboxEntry
+from workflow.services.approval_chain import pending_approvers
+from workflow.services.roles import APPROVER_ROLES, is_approver
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def _approvers():
+    User = get_user_model()
+    return (
+        User.objects
+        .filter(Q(is_superuser=True) | Q(groups__name__in=APPROVER_ROLES))
+        .distinct()
+    )
+
+
+def approver_ids(document):
+    """Users who can decide `document` now (empty unless SUBMITTED)."""
+    if document.status != Document.Status.SUBMITTED:
+        return []
+    if document.current_stage_id is not None:
+        approvers = pending_approvers(document)
+    else:
+        approvers = _approvers().exclude(pk=document.created_by_id)
+    return list(approvers.values_list("pk", flat=True))
+
+
+def refresh(document):
+    """
+    Replace the entries of one document (two or three queries, plus one
+    to diff against the old entries while live subscribers are connected).
+    """
+    entries = InboxEntry.objects.filter(document_id=document.pk)
+    watched = live.broker.has_subscribers()
+    previous = set(entries.values_list("approver_id", flat=True)) if watched else set()
+    entries.delete()
+    current = approver_ids(document)
+    InboxEntry.objects.bulk_create(
+        InboxEntry(approver_id=pk, document_id=document.pk, created_at=document.created_at)
+        for pk in current
+    )
+    if watched:
+        live.publish_queue_change(document, set(current) - previous, previous - set(current))
+
+
+def remove_documents(document_ids):
+    """Drop the entries of decided documents."""
+    entries = InboxEntry.objects.filter(document_id__in=document_ids)
+    if live.broker.has_subscribers():
+        removed = {}
+        for approver_id, document_id in entries.values_list("approver_id", "document_id"):
+            removed.setdefault(document_id, []).append(approver_id)
+        live.publish_queue_removals(removed)
+    entries.delete()
+
+
+def refresh_users(user_ids):
+    """Recompute the queues of users whose roles changed."""
+    User = get_user_model()
+    with transaction.atomic():
+        InboxEntry.objects.filter(approver_id__in=user_ids).delete()
+        for user in User.objects.filter(pk__in=user_ids):
+            if not is_approver(user):
+                continue
+            InboxEntry.objects.bulk_create(
+                InboxEntry(approver=user, document_id=pk, created_at=created_at)
+                for pk, created_at in Document.objects.awaiting_decision_by(user)
+                .values_list("pk", "created_at")
+                .iterator()
+            )
+    live.publish_resync(user_ids)
+
+
+def refresh_stage(stage_id):
+    """Recompute entries of documents waiting on a reconfigured stage."""
+    with transaction.atomic():
+        documents = Document.objects.filter(
+            status=Document.Status.SUBMITTED, current_stage_id=stage_id
+        ).only("id", "status", "created_by_id", "created_at", "current_stage_id")
+        for document in documents:
+            refresh(document)
+
+
+def documents_for(user):
+    """
+    `user`'s queue as a Document queryset, ordered through the inbox index.
+    Paginate it on ("inbox_created_at", "inbox_document_id").
+    """
+    return (
+        Document.objects
+        .filter(inbox_entries__approver=user)
+        .annotate(
+            inbox_created_at=F("inbox_entries__created_at"),
+            inbox_document_id=F("inbox_entries__document_id"),
+        )
+    )
+
+
+def pending_count(user):
+    return InboxEntry.objects.filter(approver=user).count()
+
+
+async def apending_count(user):
+    return await InboxEntry.objects.filter(approver=user).acount()
+
+
+def expected_entries():
+    """Yield `(approver_id, document_id, created_at)` for every pending decision."""
+    approvers = list(_approvers().values_list("pk", flat=True))
+    single_step = (
+        Document.objects
+        .filter(status=Document.Status.SUBMITTED, current_stage__isnull=True)
+        .values_list("pk", "created_by_id", "created_at")
+    )
+    for document_id, owner_id, created_at in single_step.iterator():
+        for approver_id in approvers:
+            if approver_id != owner_id:
+                yield approver_id, document_id, created_at
+
+    # One query per chain document: votes differ per document
+    chained = (
+        Document.objects
+        .filter(status=Document.Status.SUBMITTED, current_stage__isnull=False)
+        .only("id", "status", "created_by_id", "created_at", "current_stage_id")
+    )
+    for document in chained.iterator():
+        for approver_id in pending_approvers(document).values_list("pk", flat=True):
+            yield approver_id, document.pk, document.created_at
+
+
+def check_inbox_drift():
+    """
+    Compare stored entries against a fresh computation.
+    Returns `(missing, extra)` sets of `(approver_id, document_id)`.
+    """
+    expected = {(a, d) for a, d, _ in expected_entries()}
+    stored = set(InboxEntry.objects.values_list("approver_id", "document_id"))
+    return expected - stored, stored - expected
+
+
+def rebuild_inbox():
+    """Recompute the whole table from Document, stages and votes."""
+    created = 0
+    with transaction.atomic():
+        InboxEntry.objects.all().delete()
+        rows = expected_entries()
+        while batch := list(islice(rows, REBUILD_BATCH_SIZE)):
+            InboxEntry.objects.bulk_create(
+                InboxEntry(approver_id=a, document_id=d, created_at=created_at)
+                for a, d, created_at in batch
+            )
+            created += len(batch)
+    invalidate(INBOX)
+    return created
@@ -0,0 +1,268 @@
+"""
+Optional asynchronous AuditLog pipeline.
+
+With ``AUDIT_ASYNC`` enabled, ``AuditLog.log`` hands committed entries to a
+per-process ``AuditWriter`` instead of inserting them inline. The writer
+appends each entry to a local spool segment (so a crash cannot lose it),
+buffers it in memory, and a background thread flushes the buffer with
+``bulk_create`` every ``AUDIT_FLUSH_INTERVAL`` seconds or once
+``AUDIT_BATCH_SIZE`` entries are waiting. A segment is deleted only after
+its entries are in the database; segments orphaned by a dead process are
+replayed on the next start or by ``manage.py replay_audit_spool``.
+
+Delivery is at-least-once: a crash between commit and segment removal
+replays that segment. A batch the database rejects (say, an entry whose
+document was deleted before the insert) is retried one entry at a time;
+entries that still fail are appended to ``dead/`` in the spool directory
+and logged, so they cannot hold back the segments behind them.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections, transaction
+
+from workflow.cache import AUDIT, invalidate
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger("workflow.audit")
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _serialize(entry):
+    return {
+        "action": entry.action,
+        "actor_id": entry.actor_id,
+        "document_id": entry.document_id,
+        "metadata": entry.metadata,
+        "created_at": entry.created_at.isoformat(),
+    }
+
+
+def _bulk_create(records, batch_size):
+    from workflow.models import AuditLog
+
+    # One transaction, so a rejected batch leaves nothing behind to duplicate
+    with transaction.atomic():
+        AuditLog.objects.bulk_create(
+            (
+                AuditLog(
+                    action=r["action"],
+                    actor_id=r["actor_id"],
+                    document_id=r["document_id"],
+                    metadata=r["metadata"],
+                    created_at=datetime.fromisoformat(r["created_at"]),
+                )
+                for r in records
+            ),
+            batch_size=batch_size,
+        )
+
+
+def _insert(records, batch_size):
+    """
+    Insert `records`, one at a time if the batch violates a constraint.
+    Return the records the database rejected.
+    """
+    rejected = []
+    try:
+        _bulk_create(records, batch_size)
+    except (IntegrityError, DataError):
+        for record in records:
+            try:
+                _bulk_create([record], 1)
+            except (IntegrityError, DataError):
+                rejected.append(record)
+    # AuditLog.log invalidated before the rows existed
+    invalidate(AUDIT)
+    return rejected
+
+
+def _try_lock(fh):
+    """Take an exclusive, non-blocking lock; True if this process owns it."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class _Segment:
+    """An append-only spool file owned (flocked) by this process."""
+
+    def __init__(self, directory):
+        self.path = Path(directory) / f"{os.getpid()}-{uuid.uuid4().hex}.jsonl"
+        self.fh = open(self.path, "a", encoding="utf-8")
+        _try_lock(self.fh)
+        self.records = []
+
+    def append(self, record, fsync):
+        self.fh.write(json.dumps(record) + "\n")
+        self.fh.flush()
+        if fsync:
+            os.fsync(self.fh.fileno())
+        self.records.append(record)
+
+    def discard(self):
+        self.fh.close()
+        self.path.unlink(missing_ok=True)
+
+
+class AuditWriter:
+    def __init__(self, spool_dir, batch_size=500, flush_interval=1.0, fsync=False):
+        self.spool_dir = Path(spool_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._segment = None
+        self._sealed = []
+        self._thread = None
+
+        self.stats = {"submitted": 0, "written": 0, "batches": 0, "replayed": 0, "rejected": 0}
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            self.recover()
+        except Exception:
+            logger.exception("Audit spool replay failed; will retry on next start")
+        self._thread = threading.Thread(
+            target=self._run,
+            name="audit-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, entry):
+        """Spool and buffer one unsaved AuditLog instance."""
+        record = _serialize(entry)
+        with self._lock:
+            if self._segment is None:
+                self._segment = _Segment(self.spool_dir)
+            self._segment.append(record, self.fsync)
+            self.stats["submitted"] += 1
+            full = len(self._segment.records) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write every buffered entry to the database."""
+        with self._flush_lock:
+            with self._lock:
+                if self._segment is not None:
+                    self._sealed.append(self._segment)
+                    self._segment = None
+
+            while self._sealed:
+                segment = self._sealed[0]
+                # If the database is unreachable the segment stays sealed
+                # and is retried next cycle
+                rejected = self._write(segment.path, segment.records)
+                self.stats["written"] += len(segment.records) - len(rejected)
+                self.stats["batches"] += 1
+                segment.discard()
+                self._sealed.pop(0)
+
+    def recover(self):
+        """Replay spool segments left behind by processes that died."""
+        replayed = 0
+        for path in sorted(self.spool_dir.glob("*.jsonl")):
+            with open(path, "r+", encoding="utf-8") as fh:
+                if not _try_lock(fh):
+                    continue  # owned by a live writer
+                records = []
+                for line in fh:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break  # torn final line from a crash mid-write
+                if records:
+                    try:
+                        rejected = self._write(path, records)
+                    except Exception:
+                        # Left in place for the next replay
+                        logger.exception("Could not replay audit spool segment", extra={"failure": path.name})
+                        continue
+                    replayed += len(records) - len(rejected)
+            path.unlink(missing_ok=True)
+        self.stats["replayed"] += replayed
+        if replayed:
+            logger.info("Replayed spooled audit entries", extra={"action": "AUDIT_REPLAY"})
+        return replayed
+
+    def _write(self, path, records):
+        """Insert a segment's records, moving the rejected ones to `dead/`."""
+        rejected = _insert(records, self.batch_size)
+        if rejected:
+            dead_dir = self.spool_dir / "dead"
+            dead_dir.mkdir(exist_ok=True)
+            with open(dead_dir / path.name, "a", encoding="utf-8") as fh:
+                fh.writelines(json.dumps(record) + "\n" for record in rejected)
+            self.stats["rejected"] += len(rejected)
+            logger.error(
+                "Audit entries rejected by the database; kept in the dead-letter spool",
+                extra={"action": "AUDIT_REJECTED", "failure": str(dead_dir / path.name)},
+            )
+        return rejected
+
+    def close(self):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval * 5)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Audit flush failed at shutdown; entries remain spooled")
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit flush failed; entries remain spooled")
+            finally:
+                close_old_connections()
+
+
+def get_audit_writer():
+    """Process-wide writer built from settings, started on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                writer = AuditWriter(
+                    spool_dir=settings.AUDIT_SPOOL_DIR,
+                    batch_size=settings.AUDIT_BATCH_SIZE,
+                    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+                    fsync=settings.AUDIT_SPOOL_FSYNC,
+                )
+                writer.start()
+                atexit.register(writer.close)
+                _writer = writer
+    return _writer
@@ -0,0 +1,157 @@
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from workflow.metrics import record_queue_time
+from workflow.models import (
+    ApprovalStep,
+    AuditLog,
+    Document,
+    DocumentStatusCounter,
+    TransitionConflict,
+)
+from workflow.services import approval_inbox
+from workflow.services.roles import is_approver
+from workflow.transitions import TRANSITIONS, apply_transition
+
+MAX_BATCH_SIZE = 500
+
+DECISIONS = ("approve", "reject")
+
+
+class BulkOutcome(models.TextChoices):
+    APPROVED = "APPROVED", "Approved"
+    REJECTED = "REJECTED", "Rejected"
+    NOT_FOUND = "NOT_FOUND", "Document not found"
+    INVALID_STATE = "INVALID_STATE", "Document is not submitted"
+    SELF_DECISION = "SELF_DECISION", "Cannot decide on own document"
+    LOCKED = "LOCKED", "Document is being decided by someone else"
+    VOTE_RECORDED = "VOTE_RECORDED", "Approval recorded; awaiting further approvers"
+    NOT_PENDING = "NOT_PENDING", "Not a pending approver for this stage"
+
+
+def decide_documents(user, document_ids, decision):
+    """
+    Approve or reject many submitted documents in one transaction.
+
+    Applies the same rules as `Document.approve/reject`, but checks the
+    actor's role once, locks candidates with SELECT ... FOR UPDATE SKIP
+    LOCKED and writes ApprovalStep/AuditLog rows with bulk_create.
+    Documents on an approval chain are votes with per-stage rules, so they
+    go through `apply_transition` one at a time instead.
+    Returns `{document_id: BulkOutcome}`.
+    """
+    if decision not in DECISIONS:
+        raise ValueError(f"Unknown decision: {decision!r}.")
+    if not is_approver(user):
+        raise PermissionError("Only managers or admins can approve or reject.")
+
+    ids = list(dict.fromkeys(int(pk) for pk in document_ids))
+    if len(ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} documents per batch.")
+
+    transition = TRANSITIONS[decision]
+    target_status = transition.target
+    outcome = BulkOutcome(target_status)
+
+    with transaction.atomic():
+        # Rows another approver holds are skipped, not waited on; they are
+        # reported as LOCKED below. Self-owned documents are never locked.
+        documents = list(
+            Document.objects
+            .select_for_update(skip_locked=True)
+            .filter(pk__in=ids, status=Document.Status.SUBMITTED, current_stage__isnull=True)
+            .exclude(created_by=user)
+            .only("id", "status", "created_by_id", "updated_at")
+        )
+        decided_ids = [doc.pk for doc in documents]
+
+        if documents:
+            now = timezone.now()
+            moved = Document.objects.filter(
+                pk__in=decided_ids,
+                status=Document.Status.SUBMITTED,
+                current_stage__isnull=True,
+            ).update(
+                status=target_status,
+                updated_at=now,
+                version=F("version") + 1,
+            )
+            if moved != len(documents):
+                # Without row locks (SQLite) a single-document decision can
+                # land in between; keep the rows this update moved, marked
+                # by its timestamp. The rest are reported as decided below.
+                moved_ids = set(
+                    Document.objects.filter(pk__in=decided_ids, updated_at=now).values_list("pk", flat=True)
+                )
+                documents = [doc for doc in documents if doc.pk in moved_ids]
+                decided_ids = [doc.pk for doc in documents]
+
+        if documents:
+            ApprovalStep.objects.bulk_create(
+                ApprovalStep(document=doc, decided_by=user, status=target_status)
+                for doc in documents
+            )
+            AuditLog.bulk_log(action=transition.audit_action, actor=user, documents=documents)
+            DocumentStatusCounter.adjust(Document.Status.SUBMITTED, -len(documents))
+            DocumentStatusCounter.adjust(target_status, len(documents))
+            approval_inbox.remove_documents(decided_ids)
+            record_queue_time(target_status, [doc.updated_at for doc in documents])
+
+    results = {pk: outcome for pk in decided_ids}
+    results.update(_decide_staged(user, [pk for pk in ids if pk not in results], decision))
+    results.update(_classify_skipped(user, [pk for pk in ids if pk not in results]))
+    return results
+
+
+def _decide_staged(user, ids, decision):
+    """Vote on the chain documents among `ids`, each in its own transaction."""
+    if not ids:
+        return {}
+
+    documents = (
+        Document.objects
+        .filter(pk__in=ids, status=Document.Status.SUBMITTED, current_stage__isnull=False)
+        .exclude(created_by=user)
+        .only("id", "status", "created_by_id", "updated_at", "version", "current_stage_id")
+    )
+    results = {}
+    for document in documents:
+        try:
+            decided = apply_transition(document, decision, user)
+        except TransitionConflict:
+            results[document.pk] = BulkOutcome.LOCKED
+        except PermissionError:
+            results[document.pk] = BulkOutcome.NOT_PENDING
+        except ValueError:
+            results[document.pk] = BulkOutcome.INVALID_STATE
+        else:
+            results[document.pk] = (
+                BulkOutcome(TRANSITIONS[decision].target) if decided else BulkOutcome.VOTE_RECORDED
+            )
+    return results
+
+
+def _classify_skipped(user, ids):
+    """Explain why documents were left out of the batch."""
+    if not ids:
+        return {}
+
+    rows = {
+        pk: (status, owner_id)
+        for pk, status, owner_id in Document.objects.filter(pk__in=ids)
+        .values_list("pk", "status", "created_by_id")
+    }
+    results = {}
+    for pk in ids:
+        if pk not in rows:
+            results[pk] = BulkOutcome.NOT_FOUND
+            continue
+        status, owner_id = rows[pk]
+        if owner_id == user.pk:
+            results[pk] = BulkOutcome.SELF_DECISION
+        elif status != Document.Status.SUBMITTED:
+            results[pk] = BulkOutcome.INVALID_STATE
+        else:
+            results[pk] = BulkOutcome.LOCKED
+    return results
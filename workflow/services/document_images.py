@@ -0,0 +1,96 @@
+"""
+Content-addressed storage for images pasted into document bodies.
+
+Summernote inlines pasted pictures as base64 `data:` URIs, which turns a
+body into megabytes of text. `extract_images()` writes each one to
+`MEDIA_ROOT/document-images/<aa>/<sha256>.<ext>` through the default
+storage and points the `src` at the file instead. Identical images share
+one file, so re-saving a body, or pasting the same logo into many
+documents, stores nothing new.
+
+Called by `render_content()` whenever a body is rendered, so new edits
+and `manage.py render_documents` both go through it. Files are written
+when the transaction that saves the body commits, so a save that loses
+a version race or rolls back leaves none behind. Bytes that do not
+start like their declared image type are not stored.
+"""
+
+import base64
+import binascii
+import hashlib
+import re
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+IMAGE_DIR = "document-images"
+
+# Same types the sanitizer lets through as data URIs
+EXTENSIONS = {"png": "png", "jpeg": "jpg", "gif": "gif", "webp": "webp"}
+
+# Leading bytes of each type; WEBP also has "WEBP" at offset 8
+_SIGNATURES = {
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "jpeg": (b"\xff\xd8\xff",),
+    "gif": (b"GIF87a", b"GIF89a"),
+    "webp": (b"RIFF",),
+}
+
+_DATA_IMAGE = re.compile(
+    r"""(?P<attr>\bsrc\s*=\s*)(?P<quote>["'])"""
+    r"""data:image/(?P<type>png|jpeg|gif|webp);base64,(?P<data>[A-Za-z0-9+/=\s]+)"""
+    r"""(?P=quote)""",
+    re.IGNORECASE,
+)
+
+
+def image_name(data, image_type):
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{IMAGE_DIR}/{digest[:2]}/{digest}.{EXTENSIONS[image_type.lower()]}"
+
+
+def is_image(data, image_type):
+    image_type = image_type.lower()
+    if not data.startswith(_SIGNATURES[image_type]):
+        return False
+    return image_type != "webp" or data[8:12] == b"WEBP"
+
+
+def store_image(data, image_type):
+    """
+    Save `data` once the current transaction commits, unless an identical
+    image is stored; returns its URL.
+    """
+    name = image_name(data, image_type)
+
+    def save():
+        if not default_storage.exists(name):
+            # A concurrent writer of the same bytes makes storage pick a
+            # suffixed name; the file at `name` holds the same image
+            default_storage.save(name, ContentFile(data))
+
+    transaction.on_commit(save)
+    return default_storage.url(name)
+
+
+def extract_images(content):
+    """
+    `content` with every base64 image `src` replaced by the URL of its
+    stored file. URIs that do not decode, or whose bytes are not of the
+    declared type, are left for the sanitizer.
+    """
+    if not content or "data:image/" not in content:
+        return content
+
+    def replace(match):
+        try:
+            data = base64.b64decode("".join(match["data"].split()), validate=True)
+        except (binascii.Error, ValueError):
+            return match[0]
+        if not is_image(data, match["type"]):
+            return match[0]
+        url = store_image(data, match["type"])
+        return f'{match["attr"]}{match["quote"]}{url}{match["quote"]}'
+
+    return _DATA_IMAGE.sub(replace, content)
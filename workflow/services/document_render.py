@@ -0,0 +1,185 @@
+"""
+Sanitize-on-write rendering of Summernote document bodies.
+
+`DocumentBody.save()` and `Document.save_draft()` keep two columns next
+to the raw `content`:
+
+- `content_html`: the body cleaned with bleach, output as is by the
+  detail page;
+- `content_hash`: the digest of the raw body and of the policy version it
+  was cleaned with. Saves that leave the body unchanged skip the cleaner.
+
+Rendering first moves pasted images out of the body into files
+(workflow.services.document_images).
+
+Detail pages read `content_html` and never parse the raw body. Rows saved
+before these columns existed (empty `content_hash`) are cleaned on read
+and cached under `(id, updated_at)` until `manage.py render_documents`
+backfills them.
+"""
+
+import hashlib
+import threading
+
+import bleach
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.safestring import mark_safe
+
+from workflow.models import DocumentBody
+from workflow.services.document_images import extract_images
+
+try:
+    from bleach.css_sanitizer import CSSSanitizer
+except ImportError:  # tinycss2 (bleach[css]) missing: inline styles are dropped
+    CSSSanitizer = None
+
+# Bump when the policy below changes; `render_documents` re-cleans stale rows.
+# 2: pasted images are stored as files
+POLICY_VERSION = 2
+
+# What the Summernote toolbar in workflow.forms can produce
+ALLOWED_TAGS = frozenset({
+    "a", "b", "blockquote", "br", "code", "div", "em", "font", "h1", "h2",
+    "h3", "h4", "h5", "h6", "hr", "i", "img", "li", "ol", "p", "pre", "s",
+    "small", "span", "strike", "strong", "sub", "sup", "table", "tbody",
+    "td", "tfoot", "th", "thead", "tr", "u", "ul",
+})
+ALLOWED_ATTRIBUTES = {
+    "*": {"class", "style"},
+    "a": {"href", "title", "target", "rel"},
+    "font": {"color", "face", "size"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan"},
+}
+ALLOWED_PROTOCOLS = frozenset({"http", "https", "mailto", "data"})
+ALLOWED_CSS_PROPERTIES = frozenset({
+    "background-color", "color", "float", "font-family", "font-size",
+    "font-style", "font-weight", "height", "line-height", "margin-left",
+    "text-align", "text-decoration", "width",
+})
+# Pasted images arrive as data URIs; SVG is excluded because it can script
+DATA_IMAGE_PREFIXES = (
+    "data:image/png;", "data:image/jpeg;", "data:image/gif;", "data:image/webp;",
+)
+
+CACHE_KEY = "rbaw:document-html:{}:{}"
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _allow_attribute(tag, name, value):
+    allowed = ALLOWED_ATTRIBUTES.get(tag, set()) | ALLOWED_ATTRIBUTES["*"]
+    if name not in allowed:
+        return False
+    if name == "style" and CSSSanitizer is None:
+        return False
+    url = value.strip().lower()
+    if name == "href":
+        return not url.startswith("data:")
+    if name == "src" and url.startswith("data:"):
+        return url.startswith(DATA_IMAGE_PREFIXES)
+    return True
+
+
+# bleach cleaners keep parser state, so each thread builds its own
+_local = threading.local()
+
+
+def _cleaner():
+    cleaner = getattr(_local, "cleaner", None)
+    if cleaner is None:
+        cleaner = _local.cleaner = bleach.Cleaner(
+            tags=ALLOWED_TAGS,
+            attributes=_allow_attribute,
+            protocols=ALLOWED_PROTOCOLS,
+            strip=True,
+            strip_comments=True,
+            css_sanitizer=CSSSanitizer(allowed_css_properties=ALLOWED_CSS_PROPERTIES) if CSSSanitizer else None,
+        )
+    return cleaner
+
+
+def sanitize(content):
+    """Clean Summernote HTML down to the tags, attributes and URLs above."""
+    return _cleaner().clean(content or "")
+
+
+def content_digest(content):
+    raw = f"{POLICY_VERSION}\0{content or ''}".encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def render_content(body):
+    """
+    Refresh `content_html` and `content_hash` on the DocumentBody if its
+    content changed, storing pasted images on the way. Returns True when
+    they were rewritten.
+    """
+    if content_digest(body.content) == body.content_hash:
+        return False
+    body.content = extract_images(body.content)
+    body.content_html = sanitize(body.content)
+    body.content_hash = content_digest(body.content)
+    return True
+
+
+def rendered_html(document):
+    """
+    Safe body of `document` for templates. Loading the instance with
+    `.select_related("body").defer("body__content")` avoids reading the
+    raw body unless the row has not been rendered yet.
+    """
+    body = document.body
+    if body.content_hash:
+        return mark_safe(body.content_html)
+
+    key = CACHE_KEY.format(document.pk, document.updated_at.timestamp())
+    html = cache.get(key)
+    if html is None:
+        html = sanitize(body.content)
+        cache.set(key, html, CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+async def arendered_html(document):
+    body = document.body
+    if body.content_hash:
+        return mark_safe(body.content_html)
+    return await sync_to_async(rendered_html)(document)
+
+
+def render_documents(only_missing=False, chunk_size=500):
+    """
+    Backfill `content_html` for bodies never rendered, or rendered from a
+    different body or policy version. Returns `(checked, rendered)`.
+
+    Rendering stores pasted images as files, so this is also how
+    existing documents shed them after an upgrade.
+
+    Each row is written only if its hash is still the one read, so a
+    concurrent edit, which renders on save, is never overwritten.
+    """
+    qs = DocumentBody.objects.order_by("pk")
+    if only_missing:
+        qs = qs.filter(content_hash="")
+
+    checked = rendered = 0
+    for body in qs.iterator(chunk_size=chunk_size):
+        checked += 1
+        read_hash = body.content_hash
+        if content_digest(body.content) == read_hash:
+            continue
+        with transaction.atomic():
+            render_content(body)
+            updated = DocumentBody.objects.filter(pk=body.pk, content_hash=read_hash).update(
+                content=body.content,
+                content_html=body.content_html,
+                content_hash=body.content_hash,
+            )
+            if not updated:
+                # Discard the images stored for the overwritten body
+                transaction.set_rollback(True)
+        rendered += updated
+    return checked, rendered
@@ -0,0 +1,151 @@
+import html
+from html.parser import HTMLParser
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection
+from django.db.models import F, Func, Q, Value
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from workflow.models import Document
+
+SEARCH_CONFIG = "english"
+
+# Control characters cannot appear in Summernote output, so they are safe
+# placeholders for highlight boundaries until the headline is escaped.
+_START_SEL = "\x02"
+_STOP_SEL = "\x03"
+
+
+class _TextExtractor(HTMLParser):
+    """Collects text nodes; tag boundaries become word breaks."""
+
+    _SKIP = {"script", "style"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skipping += 1
+        self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skipping:
+            self._skipping -= 1
+        self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(value):
+    """Strip Summernote markup and entities, leaving indexable text."""
+    parser = _TextExtractor()
+    parser.feed(value or "")
+    parser.close()
+    return " ".join("".join(parser.parts).split())
+
+
+def is_supported():
+    return connection.vendor == "postgresql"
+
+
+def build_search_vector(title, content):
+    """Title outranks body text; body is indexed without its markup."""
+    return SearchVector(Value(title), weight="A", config=SEARCH_CONFIG) + SearchVector(
+        Value(html_to_text(content)), weight="B", config=SEARCH_CONFIG
+    )
+
+
+def update_search_vector(document):
+    """Recompute one document's vector. No-op off PostgreSQL."""
+    if not is_supported():
+        return
+    Document.objects.filter(pk=document.pk).update(
+        search_vector=build_search_vector(document.title, document.content)
+    )
+
+
+def rebuild_search_vectors(only_missing=False, chunk_size=1000):
+    """Backfill vectors for existing rows; returns the number updated."""
+    if not is_supported():
+        return 0
+
+    qs = Document.objects.select_related("body").only("id", "title", "body__content").order_by("pk")
+    if only_missing:
+        qs = qs.filter(search_vector__isnull=True)
+
+    updated = 0
+    batch = []
+    for document in qs.iterator(chunk_size=chunk_size):
+        document.search_vector = build_search_vector(document.title, document.content)
+        batch.append(document)
+        if len(batch) >= chunk_size:
+            Document.objects.bulk_update(batch, ["search_vector"])
+            updated += len(batch)
+            batch = []
+    if batch:
+        Document.objects.bulk_update(batch, ["search_vector"])
+        updated += len(batch)
+    return updated
+
+
+class _StripTags(Func):
+    function = "regexp_replace"
+    template = "%(function)s(%(expressions)s, '<[^>]*>', ' ', 'g')"
+
+
+def search_documents(user, query):
+    """
+    Documents visible to `user` matching `query`, best match first.
+    Each result carries `rank` and an HTML-escaped `headline`.
+    """
+    qs = (
+        Document.objects
+        .visible_to(user)
+        .select_related("created_by")
+        .defer("search_vector")
+    )
+
+    if not is_supported():
+        # Portable fallback: unranked substring match, newest first
+        return qs.filter(
+            Q(title__icontains=query) | Q(body__content__icontains=query)
+        ).order_by("-created_at", "-id")
+
+    search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+    return (
+        qs.filter(search_vector=search_query)
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            headline=SearchHeadline(
+                _StripTags(F("body__content")),
+                search_query,
+                config=SEARCH_CONFIG,
+                start_sel=_START_SEL,
+                stop_sel=_STOP_SEL,
+                max_words=35,
+                min_words=15,
+            ),
+        )
+        .order_by("-rank", "-created_at", "-id")
+    )
+
+
+def render_headline(headline):
+    """Escape a headline and turn highlight markers into <mark> tags."""
+    if not headline:
+        return ""
+    escaped = escape(html.unescape(headline))
+    return mark_safe(
+        escaped.replace(_START_SEL, "<mark>").replace(_STOP_SEL, "</mark>")
+    )
@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.core.cache import cache
+
+EMPLOYEE_ROLES = ("Employee", "Manager", "Admin")
+APPROVER_ROLES = ("Manager", "Admin")
+ADMIN_ROLES = ("Admin",)
+
+# Attribute used to memoise group names on a user instance.
+# Django builds a fresh ``request.user`` per request, so this acts as a
+# per-request cache for views, context processors and domain guards alike.
+_ROLE_ATTR = "_rbaw_role_names"
+_CACHE_KEY = "rbaw:roles:{}"
+
+
+def _cache_timeout():
+    """
+    Cross-request cache TTL in seconds. ``0`` disables the shared cache.
+    """
+    return getattr(settings, "ROLE_CACHE_TIMEOUT", 0)
+
+
+def role_cache_enabled():
+    return bool(_cache_timeout())
+
+
+def get_role_names(user):
+    """
+    Return the user's group names as a frozenset.
+    Loaded at most once per user instance (one query per request).
+    """
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    names = getattr(user, _ROLE_ATTR, None)
+    if names is not None:
+        return names
+
+    timeout = _cache_timeout()
+    key = _CACHE_KEY.format(user.pk)
+    if timeout:
+        names = cache.get(key)
+
+    if names is None:
+        names = frozenset(user.groups.values_list("name", flat=True))
+        if timeout:
+            cache.set(key, names, timeout)
+
+    setattr(user, _ROLE_ATTR, names)
+    return names
+
+
+async def aget_role_names(user):
+    """`get_role_names` for async views, sharing its memo and cache."""
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    names = getattr(user, _ROLE_ATTR, None)
+    if names is not None:
+        return names
+
+    timeout = _cache_timeout()
+    key = _CACHE_KEY.format(user.pk)
+    if timeout:
+        names = await cache.aget(key)
+
+    if names is None:
+        names = frozenset([name async for name in user.groups.values_list("name", flat=True)])
+        if timeout:
+            await cache.aset(key, names, timeout)
+
+    setattr(user, _ROLE_ATTR, names)
+    return names
+
+
+def has_any_role(user, roles):
+    """
+    True if the user belongs to at least one of ``roles``.
+    Superuser status is not considered here; callers decide.
+    """
+    return not get_role_names(user).isdisjoint(roles)
+
+
+def is_approver(user):
+    """Managers, admins and superusers may decide on documents."""
+    return user.is_superuser or has_any_role(user, APPROVER_ROLES)
+
+
+async def ahas_any_role(user, roles):
+    return not (await aget_role_names(user)).isdisjoint(roles)
+
+
+async def ais_approver(user):
+    return user.is_superuser or await ahas_any_role(user, APPROVER_ROLES)
+
+
+def is_admin(user):
+    return user.is_superuser or has_any_role(user, ADMIN_ROLES)
+
+
+def invalidate_roles(*user_ids, user=None):
+    """
+    Drop cached role names for the given user ids (and instance, if given).
+    """
+    if user is not None:
+        if hasattr(user, _ROLE_ATTR):
+            delattr(user, _ROLE_ATTR)
+        user_ids = (*user_ids, user.pk)
+
+    keys = [_CACHE_KEY.format(pk) for pk in user_ids if pk is not None]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,128 @@
+import asyncio
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from workflow.cache import DOCUMENTS, INBOX, acached, cached, invalidate
+from workflow.models import Document, DocumentStatusCounter
+from workflow.services import approval_inbox
+
+Status = Document.Status
+
+
+def compute_status_summary(user=None):
+    """
+    Scan `workflow_document` once and return per-status counts.
+    If `user` is given, also counts submitted documents not owned by them.
+    """
+    aggregates = {
+        "total_docs": Count("id"),
+        "draft_count": Count("id", filter=Q(status=Status.DRAFT)),
+        "submitted_count": Count("id", filter=Q(status=Status.SUBMITTED)),
+        "approved_count": Count("id", filter=Q(status=Status.APPROVED)),
+        "rejected_count": Count("id", filter=Q(status=Status.REJECTED)),
+    }
+    if user is not None:
+        aggregates["pending_approvals"] = Count(
+            "id",
+            filter=Q(status=Status.SUBMITTED) & ~Q(created_by=user),
+        )
+    return Document.objects.aggregate(**aggregates)
+
+
+_COUNTERS_KEY = "rbaw:status-counters"
+_PENDING_KEY = "rbaw:pending:{}"
+
+
+def get_status_summary(user):
+    """
+    Read dashboard counts from the denormalized counters.
+    Costs one lookup of four counter rows plus an indexed count of the
+    user's inbox entries, independent of table size, and nothing while
+    both are cached (workflow.cache, until a document or the inbox
+    changes).
+    """
+    counts = cached(_COUNTERS_KEY, _counters, tags=(DOCUMENTS,))
+    pending = cached(
+        _PENDING_KEY.format(user.pk),
+        lambda: approval_inbox.pending_count(user),
+        tags=(INBOX,),
+    )
+    return _summary(counts, pending)
+
+
+async def aget_status_summary(user):
+    """`get_status_summary` for async views, running both lookups concurrently."""
+    counts, pending = await asyncio.gather(
+        acached(_COUNTERS_KEY, _acounters, tags=(DOCUMENTS,)),
+        acached(
+            _PENDING_KEY.format(user.pk),
+            lambda: approval_inbox.apending_count(user),
+            tags=(INBOX,),
+        ),
+    )
+    return _summary(counts, pending)
+
+
+def _counters():
+    return dict(
+        DocumentStatusCounter.objects.values_list("status", "count")
+    )
+
+
+async def _acounters():
+    # Not aiterator(): ValuesListIterable runs its query before the
+    # first thread hop, i.e. on the event loop
+    return {
+        status: count
+        async for status, count in
+        DocumentStatusCounter.objects.values_list("status", "count")
+    }
+
+
+def _summary(counts, pending_approvals):
+    return {
+        "total_docs": sum(counts.get(s, 0) for s in Status.values),
+        "draft_count": counts.get(Status.DRAFT, 0),
+        "submitted_count": counts.get(Status.SUBMITTED, 0),
+        "approved_count": counts.get(Status.APPROVED, 0),
+        "rejected_count": counts.get(Status.REJECTED, 0),
+        "pending_approvals": pending_approvals,
+    }
+
+
+def check_status_counter_drift():
+    """
+    Compare stored counters against a fresh scan.
+    Returns `{status: (stored, actual)}` for every mismatching status.
+    """
+    actual = dict(
+        Document.objects.order_by().values_list("status").annotate(n=Count("id"))
+    )
+    stored = dict(
+        DocumentStatusCounter.objects.values_list("status", "count")
+    )
+    return {
+        status: (stored.get(status, 0), actual.get(status, 0))
+        for status in Status.values
+        if stored.get(status, 0) != actual.get(status, 0)
+    }
+
+
+def rebuild_status_counters():
+    """
+    Recompute every counter from `workflow_document`.
+    Locks the counter rows so concurrent transitions wait for the rebuild.
+    """
+    with transaction.atomic():
+        list(DocumentStatusCounter.objects.select_for_update())
+        actual = dict(
+            Document.objects.order_by().values_list("status").annotate(n=Count("id"))
+        )
+        for status in Status.values:
+            DocumentStatusCounter.objects.update_or_create(
+                status=status,
+                defaults={"count": actual.get(status, 0)},
+            )
+    invalidate(DOCUMENTS)
+    return actual
@@ -1,8 +1,26 @@
-from django.db.models.signals import post_migrate
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 
+from workflow import cache, db_pool
+from workflow.models import ApprovalStep, Document, DocumentStatusCounter, WorkflowStage
+from workflow.services import approval_inbox
+from workflow.services.document_search import update_search_vector
+from workflow.services.roles import invalidate_roles, role_cache_enabled
+
+User = get_user_model()
+
+
 @receiver(post_migrate)
 def create_default_groups(sender, **kwargs):
     """
@@ -17,3 +35,158 @@ def create_default_groups(sender, **kwargs):
 
     for group_name in groups.keys():
         Group.objects.get_or_create(name=group_name)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep cached role names in sync with `User.groups`.
+    Handles both `user.groups.*` and `group.user_set.*` mutations.
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_roles(user=instance)
+        return
+
+    # Reverse changes only affect the shared cache; other user instances
+    # are request-scoped and expire on their own.
+    if not role_cache_enabled():
+        return
+
+    if action in ("post_add", "post_remove"):
+        invalidate_roles(*pk_set)
+    elif action == "pre_clear":
+        # pk_set is not provided for clear(); capture members beforehand.
+        invalidate_roles(*instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def refresh_inbox_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Gaining or losing an approver role adds or drops queue entries."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            approval_inbox.refresh_users([instance.pk])
+        return
+
+    if action in ("post_add", "post_remove"):
+        approval_inbox.refresh_users(pk_set)
+    elif action == "pre_clear":
+        instance._inbox_members = list(instance.user_set.values_list("pk", flat=True))
+    elif action == "post_clear":
+        approval_inbox.refresh_users(getattr(instance, "_inbox_members", []))
+
+
+@receiver(pre_save, sender=User)
+def remember_superuser_flag(sender, instance, update_fields, **kwargs):
+    """Note the stored flag, so saves that keep it skip the inbox rebuild."""
+    if instance._state.adding or (update_fields is not None and "is_superuser" not in update_fields):
+        return
+    instance._stored_is_superuser = (
+        User.objects.filter(pk=instance.pk).values_list("is_superuser", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def refresh_inbox_on_superuser_change(sender, instance, created, **kwargs):
+    """Superusers approve without a role group."""
+    if created:
+        changed = instance.is_superuser
+    else:
+        stored = instance.__dict__.pop("_stored_is_superuser", None)
+        changed = stored is not None and stored != instance.is_superuser
+    if changed:
+        approval_inbox.refresh_users([instance.pk])
+        cache.invalidate(cache.INBOX)
+
+
+@receiver(m2m_changed, sender=WorkflowStage.approvers.through)
+def refresh_inbox_on_stage_approvers_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        approval_inbox.refresh_stage(instance.pk)
+    elif action != "post_clear":
+        for stage_id in pk_set:
+            approval_inbox.refresh_stage(stage_id)
+
+
+@receiver(post_save, sender=WorkflowStage)
+def refresh_inbox_on_stage_change(sender, instance, created, **kwargs):
+    """A new approver group or quorum changes who is waited on."""
+    if not created:
+        approval_inbox.refresh_stage(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_roles_on_group_change(sender, instance, **kwargs):
+    """A renamed or deleted group changes the role names of its members."""
+    if kwargs.get("created") or not role_cache_enabled():
+        return
+    invalidate_roles(*instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Document)
+def count_created_document(sender, instance, created, **kwargs):
+    """
+    New documents enter the status counters here.
+    Transitions adjust counters themselves inside `Document.submit/approve/reject`.
+    """
+    if created:
+        DocumentStatusCounter.adjust(instance.status, 1)
+
+
+@receiver(post_save, sender=Document)
+def queue_created_document(sender, instance, created, **kwargs):
+    """Documents created straight into SUBMITTED (imports, fixtures) join the queue."""
+    if created and instance.status == Document.Status.SUBMITTED:
+        approval_inbox.refresh(instance)
+
+
+@receiver(post_save, sender=Document)
+def refresh_search_vector(sender, instance, update_fields, **kwargs):
+    """
+    Re-index only when searchable text may have changed: the title, or
+    the body, which `Document.save()` writes to its own table.
+    """
+    if update_fields is None or "title" in update_fields or instance._body_edited:
+        update_search_vector(instance)
+
+
+@receiver(post_delete, sender=Document)
+def count_deleted_document(sender, instance, **kwargs):
+    DocumentStatusCounter.adjust(instance.status, -1)
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def invalidate_document_caches(sender, **kwargs):
+    """Counts, queues and lists cached from documents (workflow.cache)."""
+    cache.invalidate(cache.DOCUMENTS, cache.INBOX)
+
+
+@receiver(post_save, sender=ApprovalStep)
+def invalidate_caches_on_decision(sender, created, **kwargs):
+    if created:
+        cache.invalidate(cache.DOCUMENTS, cache.INBOX)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=WorkflowStage.approvers.through)
+def invalidate_inbox_caches(sender, action, **kwargs):
+    """Who is waited on changes with roles and stage approvers."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        cache.invalidate(cache.INBOX)
+
+
+@receiver(post_save, sender=WorkflowStage)
+def invalidate_inbox_caches_on_stage_change(sender, created, **kwargs):
+    if not created:
+        cache.invalidate(cache.INBOX)
+
+
+@receiver(connection_created)
+def start_pool_stats_logging(sender, connection, **kwargs):
+    """Log pool statistics from any process that checks out a pooled connection."""
+    if getattr(connection, "pool", None) is not None:
+        db_pool.start_stats_logging()
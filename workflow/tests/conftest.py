@@ -1,8 +1,22 @@
 import pytest
 from django.contrib.auth.models import User, Group
+from django.core.cache import caches
 from workflow.models import Document
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(settings):
+    """
+    Start every test from an empty cache, with the shared tier in memory:
+    rolled-back rows must not be served from a previous test's entries.
+    """
+    settings.CACHES = {
+        **settings.CACHES,
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "rbaw-tests"},
+    }
+    caches["default"].clear()
+
+
 @pytest.fixture
 def employee(db):
     user = User.objects.create_user(username="employee", password="pass")
@@ -50,3 +64,10 @@ def client_logged_in(client):
         client.login(username=user.username, password="pass")
         return client
     return _login
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Keeps images extracted from document bodies out of the project's media/."""
+    settings.MEDIA_ROOT = tmp_path / "media"
+    return settings.MEDIA_ROOT
@@ -0,0 +1,209 @@
+import pytest
+from django.contrib.auth.models import Group, User
+from django.urls import reverse
+
+from workflow.models import (
+    ApprovalStep,
+    ApprovalWorkflow,
+    AuditAction,
+    AuditLog,
+    Document,
+    StageDecision,
+    TransitionConflict,
+    WorkflowStage,
+)
+from workflow.services import approval_chain
+from workflow.services.bulk_decision import BulkOutcome, decide_documents
+from workflow.transitions import allowed_actions
+
+
+def _approver(username, *groups):
+    user = User.objects.create_user(username=username, password="pass")
+    user.groups.add(Group.objects.get(name="Manager"), *groups)
+    return user
+
+
+@pytest.fixture
+def finance(db):
+    group = Group.objects.create(name="Finance")
+    return [_approver(f"finance{i}", group) for i in range(3)]
+
+
+@pytest.fixture
+def chain(db, manager, admin, finance):
+    """Review by named approvers, then Finance group sign-off (2 of 3)."""
+    workflow = ApprovalWorkflow.objects.create(name="Purchase", is_default=True)
+    review = WorkflowStage.objects.create(workflow=workflow, position=1, name="Manager review")
+    review.approvers.set([manager, admin])
+    WorkflowStage.objects.create(
+        workflow=workflow,
+        position=2,
+        name="Finance",
+        approver_group=Group.objects.get(name="Finance"),
+        required_approvals=2,
+    )
+    return workflow
+
+
+@pytest.fixture
+def chained_document(chain, employee):
+    doc = Document.objects.create(title="Laptop", content="c", created_by=employee)
+    doc.submit(employee)
+    return doc
+
+
+@pytest.mark.django_db
+def test_submit_enters_first_stage_of_default_workflow(chain, chained_document):
+    chained_document.refresh_from_db()
+    assert chained_document.workflow == chain
+    assert chained_document.current_stage.name == "Manager review"
+
+
+@pytest.mark.django_db
+def test_document_is_approved_after_every_stage_reaches_quorum(chained_document, manager, finance):
+    assert chained_document.approve(manager) is False
+    chained_document.refresh_from_db()
+    assert chained_document.status == Document.Status.SUBMITTED
+    assert chained_document.current_stage.name == "Finance"
+
+    assert chained_document.approve(finance[0]) is False
+    chained_document.refresh_from_db()
+    assert chained_document.current_stage.name == "Finance"
+
+    assert chained_document.approve(finance[1]) is True
+    chained_document.refresh_from_db()
+    assert chained_document.status == Document.Status.APPROVED
+    assert chained_document.current_stage is None
+    assert StageDecision.objects.filter(document=chained_document).count() == 3
+    assert ApprovalStep.objects.filter(document=chained_document, decided_by=finance[1]).exists()
+
+    actions = list(
+        AuditLog.objects.filter(document=chained_document)
+        .order_by("id")
+        .values_list("action", flat=True)
+    )
+    assert actions[-3:] == [
+        AuditAction.STAGE_APPROVED,
+        AuditAction.STAGE_APPROVED,
+        AuditAction.DOCUMENT_APPROVED,
+    ]
+
+
+@pytest.mark.django_db
+def test_single_rejection_rejects_the_document(chained_document, manager, finance):
+    chained_document.approve(manager)
+    chained_document.refresh_from_db()
+    chained_document.approve(finance[0])
+    chained_document.refresh_from_db()
+
+    assert chained_document.reject(finance[1]) is True
+    chained_document.refresh_from_db()
+    assert chained_document.status == Document.Status.REJECTED
+    assert chained_document.current_stage is None
+
+
+@pytest.mark.django_db
+def test_only_pending_stage_approvers_can_vote_once(chained_document, manager, finance):
+    # Finance cannot skip ahead of the manager review
+    with pytest.raises(PermissionError):
+        chained_document.approve(finance[0])
+
+    chained_document.approve(manager)
+    chained_document.refresh_from_db()
+    with pytest.raises(PermissionError):
+        chained_document.approve(manager)  # not a finance approver
+
+    chained_document.approve(finance[0])
+    chained_document.refresh_from_db()
+    with pytest.raises(PermissionError):
+        chained_document.approve(finance[0])
+
+
+@pytest.mark.django_db
+def test_stale_vote_on_closed_stage_conflicts(chained_document, manager, admin):
+    stale = Document.objects.get(pk=chained_document.pk)
+    chained_document.approve(manager)
+
+    with pytest.raises(TransitionConflict):
+        stale.approve(admin)
+    assert not StageDecision.objects.filter(decided_by=admin).exists()
+
+
+@pytest.mark.django_db
+def test_vote_query_count_is_constant(chain, employee, finance, django_assert_max_num_queries):
+    stage = chain.stages.get(position=2)
+    finance_group = Group.objects.get(name="Finance")
+    for i in range(20):
+        _approver(f"extra{i}", finance_group)
+    doc = Document.objects.create(title="Big", content="c", created_by=employee, status=Document.Status.SUBMITTED)
+    Document.objects.filter(pk=doc.pk).update(current_stage=stage, workflow=chain)
+    doc.refresh_from_db()
+
+    voter = User.objects.get(pk=finance[0].pk)
+    # Vote, quorum check and inbox upkeep, however many approvers there are
+    with django_assert_max_num_queries(15):
+        doc.approve(voter)
+
+
+@pytest.mark.django_db
+def test_approval_queue_lists_documents_awaiting_each_user(chained_document, manager, finance, employee):
+    def queue(user):
+        return set(Document.objects.awaiting_decision_by(user).values_list("pk", flat=True))
+
+    legacy = Document.objects.create(title="Legacy", content="c", created_by=employee, status=Document.Status.SUBMITTED)
+
+    assert queue(manager) == {chained_document.pk, legacy.pk}
+    assert queue(finance[0]) == {legacy.pk}  # not their stage yet
+
+    chained_document.approve(manager)
+    assert queue(manager) == {legacy.pk}
+    assert queue(finance[0]) == {chained_document.pk, legacy.pk}
+
+    chained_document.refresh_from_db()
+    chained_document.approve(finance[0])
+    assert queue(finance[0]) == {legacy.pk}
+    assert chained_document.pk in queue(finance[1])
+    assert set(approval_chain.pending_approvers(chained_document)) == {finance[1], finance[2]}
+
+
+@pytest.mark.django_db
+def test_allowed_actions_follow_the_open_stage(chained_document, manager, finance):
+    assert allowed_actions(manager, [chained_document])[chained_document.pk] == {"approve", "reject"}
+    assert allowed_actions(finance[0], [chained_document])[chained_document.pk] == frozenset()
+
+    chained_document.approve(manager)
+    chained_document.refresh_from_db()
+    assert allowed_actions(manager, [chained_document])[chained_document.pk] == frozenset()
+    assert allowed_actions(finance[0], [chained_document])[chained_document.pk] == {"approve", "reject"}
+
+
+@pytest.mark.django_db
+def test_approve_view_reports_recorded_vote(client_logged_in, chained_document, manager):
+    resp = client_logged_in(manager).post(
+        reverse("workflow:document-approve", args=[chained_document.pk]), follow=True
+    )
+    assert resp.status_code == 200
+    assert b"waiting on other approvers" in resp.content
+
+
+@pytest.mark.django_db
+def test_bulk_decision_votes_on_chain_documents(chained_document, submitted_document, manager, finance):
+    Document.objects.filter(pk=submitted_document.pk).update(current_stage=None, workflow=None)
+
+    results = decide_documents(manager, [chained_document.pk, submitted_document.pk], "approve")
+    assert results == {
+        chained_document.pk: BulkOutcome.VOTE_RECORDED,
+        submitted_document.pk: BulkOutcome.APPROVED,
+    }
+
+    results = decide_documents(manager, [chained_document.pk], "approve")
+    assert results == {chained_document.pk: BulkOutcome.NOT_PENDING}
+
+
+@pytest.mark.django_db
+def test_documents_without_workflow_keep_single_decision(submitted_document, manager):
+    assert submitted_document.current_stage_id is None
+    assert submitted_document.approve(manager) is True
+    submitted_document.refresh_from_db()
+    assert submitted_document.status == Document.Status.APPROVED
+    assert not StageDecision.objects.exists()
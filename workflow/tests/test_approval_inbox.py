@@ -0,0 +1,158 @@
+import pytest
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from workflow.models import ApprovalWorkflow, Document, InboxEntry, WorkflowStage
+from workflow.services import approval_inbox
+from workflow.services.approval_inbox import check_inbox_drift
+from workflow.services.bulk_decision import decide_documents
+
+
+def inbox(user):
+    return set(InboxEntry.objects.filter(approver=user).values_list("document_id", flat=True))
+
+
+@pytest.mark.django_db
+def test_submit_fills_and_decision_clears_entries(submitted_document, employee, manager, admin):
+    assert inbox(manager) == {submitted_document.pk}
+    assert inbox(admin) == {submitted_document.pk}
+    assert inbox(employee) == set()
+
+    submitted_document.approve(manager)
+    assert not InboxEntry.objects.exists()
+
+
+@pytest.mark.django_db
+def test_owner_never_gets_own_document(manager, employee):
+    doc = Document.objects.create(title="Own", content="c", created_by=manager)
+    doc.submit(manager)
+    assert inbox(manager) == set()
+
+
+@pytest.mark.django_db
+def test_queue_view_reads_the_inbox(client_logged_in, manager, submitted_document):
+    client = client_logged_in(manager)
+    url = reverse("workflow:document-approve", args=[submitted_document.pk])
+    assert url.encode() in client.get(reverse("workflow:manager-document-list")).content
+
+    InboxEntry.objects.filter(approver=manager).delete()
+    assert url.encode() not in client.get(reverse("workflow:manager-document-list")).content
+
+
+@pytest.mark.django_db
+def test_queue_paginates_on_inbox_keys(client_logged_in, manager, employee):
+    docs = [
+        Document.objects.create(title=f"Doc {i}", content="c", created_by=employee, status=Document.Status.SUBMITTED)
+        for i in range(30)
+    ]
+    client = client_logged_in(manager)
+
+    first = client.get(reverse("workflow:manager-document-list"))
+    page = first.context["page_obj"]
+    assert [d.pk for d in page] == [d.pk for d in docs[:25]]
+
+    second = client.get(reverse("workflow:manager-document-list"), {"after": page.next_cursor})
+    assert [d.pk for d in second.context["page_obj"]] == [d.pk for d in docs[25:]]
+
+
+@pytest.mark.django_db
+def test_role_changes_update_the_inbox(submitted_document, employee):
+    user = User.objects.create_user(username="promoted", password="pass")
+    assert inbox(user) == set()
+
+    user.groups.add(Group.objects.get(name="Manager"))
+    assert inbox(user) == {submitted_document.pk}
+
+    user.groups.clear()
+    assert inbox(user) == set()
+
+    Group.objects.get(name="Admin").user_set.add(user)
+    assert inbox(user) == {submitted_document.pk}
+
+
+@pytest.mark.django_db
+def test_superuser_flag_changes_update_the_inbox(submitted_document, monkeypatch):
+    user = User.objects.create_user(username="root", password="pass")
+    user.is_superuser = True
+    user.save()
+    assert inbox(user) == {submitted_document.pk}
+
+    refreshed = []
+    monkeypatch.setattr(approval_inbox, "refresh_users", refreshed.extend)
+    user.set_password("other")
+    user.first_name = "Root"
+    user.save()
+    assert refreshed == []
+
+    monkeypatch.undo()
+    user.is_superuser = False
+    user.save()
+    assert inbox(user) == set()
+
+
+@pytest.mark.django_db
+def test_chain_votes_move_entries_between_stages(employee, manager, admin):
+    finance = User.objects.create_user(username="finance", password="pass")
+    finance.groups.add(Group.objects.get(name="Manager"))
+    workflow = ApprovalWorkflow.objects.create(name="Two step", is_default=True)
+    review = WorkflowStage.objects.create(workflow=workflow, position=1, name="Review", required_approvals=2)
+    review.approvers.set([manager, admin])
+    WorkflowStage.objects.create(workflow=workflow, position=2, name="Finance").approvers.set([finance])
+
+    doc = Document.objects.create(title="Chain", content="c", created_by=employee)
+    doc.submit(employee)
+    assert set(InboxEntry.objects.values_list("approver_id", flat=True)) == {manager.pk, admin.pk}
+
+    doc.approve(manager)
+    assert set(InboxEntry.objects.values_list("approver_id", flat=True)) == {admin.pk}
+
+    doc.refresh_from_db()
+    doc.approve(admin)
+    assert set(InboxEntry.objects.values_list("approver_id", flat=True)) == {finance.pk}
+    assert check_inbox_drift() == (set(), set())
+
+
+@pytest.mark.django_db
+def test_bulk_decision_clears_entries(employee, manager):
+    docs = [
+        Document.objects.create(title=f"Doc {i}", content="c", created_by=employee, status=Document.Status.SUBMITTED)
+        for i in range(3)
+    ]
+    decide_documents(manager, [d.pk for d in docs], "reject")
+    assert not InboxEntry.objects.exists()
+
+
+@pytest.mark.django_db
+def test_dashboard_pending_count_reads_the_inbox(client_logged_in, manager, submitted_document):
+    response = client_logged_in(manager).get(reverse("workflow:dashboard"))
+    assert response.context["pending_approvals"] == 1
+
+
+@pytest.mark.django_db
+def test_command_detects_and_repairs_drift(submitted_document, manager, admin):
+    InboxEntry.objects.filter(approver=manager).delete()
+    Document.objects.filter(pk=submitted_document.pk).update(status=Document.Status.DRAFT)
+    Document.objects.create(title="Imported", content="c", created_by=manager, status=Document.Status.DRAFT)
+    Document.objects.filter(title="Imported").update(status=Document.Status.SUBMITTED)
+
+    with pytest.raises(CommandError):
+        call_command("approval_inbox")
+
+    call_command("approval_inbox", "--rebuild")
+    assert check_inbox_drift() == (set(), set())
+    assert inbox(admin) == set(Document.objects.filter(title="Imported").values_list("pk", flat=True))
+    call_command("approval_inbox")
+
+
+@pytest.mark.django_db
+def test_admin_edits_keep_the_inbox(client, manager, submitted_document):
+    from workflow.tests.test_status_summary import admin_change
+
+    client.force_login(User.objects.create_superuser("root", password="pass"))
+    resp = admin_change(client, submitted_document, title="Renamed", status=Document.Status.DRAFT)
+
+    assert resp.status_code == 302
+    assert inbox(manager) == {submitted_document.pk}
+    assert check_inbox_drift() == (set(), set())
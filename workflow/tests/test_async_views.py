@@ -0,0 +1,199 @@
+import importlib
+import logging
+from contextlib import contextmanager
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+
+from workflow.cache import AUDIT, DOCUMENTS, tag_versions
+from workflow.models import Document
+from workflow.views import (
+    AsyncDashboardView,
+    AsyncDocumentAuditLogView,
+    AsyncDocumentDetailView,
+    AsyncDocumentListView,
+)
+
+
+def _reload_urls():
+    import rbaw_project.urls
+    import workflow.urls
+
+    importlib.reload(workflow.urls)
+    importlib.reload(rbaw_project.urls)
+    clear_url_caches()
+
+
+@contextmanager
+def async_routing():
+    try:
+        with override_settings(ASYNC_VIEWS=True):
+            _reload_urls()
+            yield
+    finally:
+        _reload_urls()
+
+
+@pytest.fixture
+def async_views():
+    with async_routing():
+        yield
+
+
+@pytest.fixture
+def async_client_for():
+    def _login(user):
+        client = AsyncClient()
+        client.force_login(user)
+        return client
+    return _login
+
+
+def aget(client, url, **extra):
+    return async_to_sync(client.get)(url, **extra)
+
+
+def test_setting_routes_pages_to_async_views(async_views):
+    assert resolve(reverse("workflow:dashboard")).func.view_class is AsyncDashboardView
+    assert resolve(reverse("workflow:document-list")).func.view_class is AsyncDocumentListView
+    assert resolve(reverse("workflow:document-detail", args=[1])).func.view_class is AsyncDocumentDetailView
+    assert resolve(reverse("workflow:document-audit-log", args=[1])).func.view_class is AsyncDocumentAuditLogView
+
+
+@pytest.mark.django_db
+def test_async_pages_match_sync_pages(client_logged_in, async_client_for, admin, employee, submitted_document):
+    docs = [
+        Document.objects.create(title=f"Doc {i}", content="c", created_by=employee)
+        for i in range(30)
+    ]
+    urls = {
+        "list": reverse("workflow:document-list"),
+        "next": reverse("workflow:document-list"),
+        "detail": reverse("workflow:document-detail", args=[submitted_document.pk]),
+        "audit": reverse("workflow:document-audit-log", args=[submitted_document.pk]),
+        "dashboard": reverse("workflow:dashboard"),
+    }
+
+    def snapshot(get):
+        page = get(urls["list"]).context["page_obj"]
+        following = get(urls["next"], data={"after": page.next_cursor}).context["page_obj"]
+        detail = get(urls["detail"]).context
+        audit = get(urls["audit"]).context
+        dashboard = get(urls["dashboard"]).context
+        return {
+            "list": [(d.pk, d.allowed_actions) for d in page],
+            "next": [d.pk for d in following],
+            "cursors": (page.next_cursor, following.previous_cursor),
+            "detail": detail["document"].pk,
+            "audit": ([log.pk for log in audit["logs"]], audit["page_obj"].number, audit["is_paginated"]),
+            "dashboard": (
+                [log.pk for log in dashboard["recent_logs"]],
+                {k: dashboard[k] for k in ("total_docs", "draft_count", "submitted_count", "pending_approvals")},
+            ),
+        }
+
+    expected = snapshot(client_logged_in(admin).get)
+    # Otherwise the async dashboard reuses the cached recent activity
+    cache.clear()
+
+    client = async_client_for(admin)
+    with async_routing():
+        actual = snapshot(lambda url, **kw: aget(client, url, **kw))
+
+    assert actual == expected
+    assert len(expected["list"]) == 25
+    assert expected["dashboard"][1]["total_docs"] == len(docs) + 1
+
+
+@pytest.mark.django_db
+def test_async_views_enforce_access(async_views, async_client_for, employee, manager, draft_document):
+    other = async_client_for(manager)
+    assert aget(other, reverse("workflow:document-detail", args=[draft_document.pk])).status_code == 200
+
+    outsider = Document.objects.create(title="Theirs", content="c", created_by=manager)
+    owner = async_client_for(employee)
+    assert aget(owner, reverse("workflow:document-detail", args=[outsider.pk])).status_code == 404
+    assert aget(owner, reverse("workflow:document-audit-log", args=[outsider.pk])).status_code == 404
+    assert aget(owner, reverse("workflow:document-detail", args=[0])).status_code == 404
+    assert aget(owner, reverse("workflow:document-audit-log", args=[draft_document.pk]), data={"page": 9}).status_code == 404
+    assert aget(owner, reverse("workflow:dashboard")).status_code == 403
+
+    anonymous = aget(AsyncClient(), reverse("workflow:document-list"))
+    assert anonymous.status_code == 302
+    assert anonymous.url.startswith(reverse("login"))
+
+
+@pytest.mark.django_db
+def test_async_detail_needs_fewer_queries(client_logged_in, async_client_for, manager, submitted_document):
+    url = reverse("workflow:document-detail", args=[submitted_document.pk])
+    sync_client = client_logged_in(manager)
+    with CaptureQueriesContext(connection) as sync_queries:
+        sync_client.get(url)
+
+    client = async_client_for(manager)
+    with async_routing(), CaptureQueriesContext(connection) as async_queries:
+        aget(client, url)
+
+    # The owner is loaded with the document instead of lazily
+    assert len(async_queries) == len(sync_queries) - 1
+
+
+@pytest.mark.django_db
+def test_async_pages_answer_not_modified(async_views, async_client_for, manager, submitted_document):
+    client = async_client_for(manager)
+    for url in (
+        reverse("workflow:document-list"),
+        reverse("workflow:document-detail", args=[submitted_document.pk]),
+        reverse("workflow:document-audit-log", args=[submitted_document.pk]),
+    ):
+        # The first visit sets the CSRF cookie
+        aget(client, url)
+        etag = aget(client, url)["ETag"]
+        assert aget(client, url, headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.django_db
+def test_async_dashboard_renders_activity_after_fragment_expires(
+    async_views, async_client_for, manager, submitted_document
+):
+    client = async_client_for(manager)
+    url = reverse("workflow:dashboard")
+    assert b"No recent activity." not in aget(client, url).content
+
+    version = ":".join(tag_versions(AUDIT, DOCUMENTS))
+    cache.delete(make_template_fragment_key("recent_activity", [version]))
+
+    assert b"No recent activity." not in aget(client, url).content
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.mark.django_db
+@override_settings(REQUEST_PROFILING_SAMPLE_RATE=1.0, REQUEST_SLOW_MS=0)
+def test_middleware_profiles_async_requests(async_views, async_client_for, employee, draft_document):
+    handler = _ListHandler()
+    logger = logging.getLogger("workflow.request")
+    logger.addHandler(handler)
+    try:
+        response = aget(async_client_for(employee), reverse("workflow:document-list"), headers={"X-Correlation-ID": "abc-123"})
+    finally:
+        logger.removeHandler(handler)
+
+    assert response["X-Correlation-ID"] == "abc-123"
+    (record,) = handler.records
+    assert record.status == 200
+    assert record.db_queries > 0
+    assert record.template_ms is not None
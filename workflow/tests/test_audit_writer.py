@@ -0,0 +1,129 @@
+import json
+
+import pytest
+from django.db import transaction
+
+from workflow.models import AuditAction, AuditLog, Document
+from workflow.services import audit_writer
+from workflow.services.audit_writer import AuditWriter
+
+
+@pytest.fixture
+def writer(settings, tmp_path, monkeypatch):
+    settings.AUDIT_ASYNC = True
+    writer = AuditWriter(spool_dir=tmp_path, batch_size=2)
+    monkeypatch.setattr(audit_writer, "_writer", writer)
+    return writer
+
+
+@pytest.mark.django_db
+def test_log_is_spooled_until_flush(writer, employee, draft_document, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        entry = AuditLog.log(
+            action=AuditAction.DOCUMENT_CREATED,
+            actor=employee,
+            document=draft_document,
+        )
+
+    assert entry.pk is None
+    assert not AuditLog.objects.filter(action=AuditAction.DOCUMENT_CREATED).exists()
+    assert len(list(writer.spool_dir.glob("*.jsonl"))) == 1
+
+    writer.flush()
+
+    stored = AuditLog.objects.get(action=AuditAction.DOCUMENT_CREATED)
+    assert stored.created_at == entry.created_at
+    assert stored.actor == employee
+    assert list(writer.spool_dir.glob("*.jsonl")) == []
+
+
+@pytest.mark.django_db
+def test_rolled_back_transition_is_never_spooled(writer, employee, draft_document, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                AuditLog.log(
+                    action=AuditAction.DOCUMENT_SUBMITTED,
+                    actor=employee,
+                    document=draft_document,
+                )
+                raise RuntimeError
+
+    assert writer.stats["submitted"] == 0
+
+
+@pytest.mark.django_db
+def test_transitions_flow_through_writer(writer, employee, draft_document, manager, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        draft_document.submit(employee)
+        draft_document.approve(manager)
+
+    writer.flush()
+    assert list(
+        AuditLog.objects.filter(document=draft_document)
+        .order_by("created_at")
+        .values_list("action", flat=True)
+    ) == [AuditAction.DOCUMENT_SUBMITTED, AuditAction.DOCUMENT_APPROVED]
+
+
+@pytest.mark.django_db
+def test_recover_replays_orphaned_segment(tmp_path, employee, draft_document):
+    record = {
+        "action": AuditAction.DOCUMENT_CREATED,
+        "actor_id": employee.pk,
+        "document_id": draft_document.pk,
+        "metadata": {},
+        "created_at": "2026-01-01T00:00:00+00:00",
+    }
+    segment = tmp_path / "12345-dead.jsonl"
+    # Second line was torn by a crash mid-write
+    segment.write_text(json.dumps(record) + "\n" + '{"action": "DOC')
+
+    writer = AuditWriter(spool_dir=tmp_path)
+    assert writer.recover() == 1
+    assert AuditLog.objects.filter(document=draft_document).count() == 1
+    assert not segment.exists()
+
+
+def _record(document_id, actor_id):
+    return {
+        "action": AuditAction.DOCUMENT_CREATED,
+        "actor_id": actor_id,
+        "document_id": document_id,
+        "metadata": {},
+        "created_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rejected_segment_does_not_block_later_ones(tmp_path, employee, draft_document):
+    # Deleted before its deferred insert; the audit log cascades from documents
+    gone = Document.objects.create(title="Gone", content="c", created_by=employee)
+    gone_id = gone.pk
+    gone.delete()
+    (tmp_path / "1-a.jsonl").write_text(json.dumps(_record(gone_id, employee.pk)) + "\n")
+    (tmp_path / "2-b.jsonl").write_text(json.dumps(_record(draft_document.pk, employee.pk)) + "\n")
+
+    writer = AuditWriter(spool_dir=tmp_path)
+    writer.recover()
+
+    assert AuditLog.objects.filter(document=draft_document).count() == 1
+    assert list(tmp_path.glob("*.jsonl")) == []
+    # Partitioned PostgreSQL tables carry no foreign key, so there it is stored
+    dead = tmp_path / "dead" / "1-a.jsonl"
+    assert dead.exists() or AuditLog.objects.filter(document_id=gone_id).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_flush_moves_past_rejected_entries(writer, employee, draft_document):
+    gone = Document.objects.create(title="Gone", content="c", created_by=employee)
+    gone_id = gone.pk
+    gone.delete()
+    writer.submit(AuditLog(action=AuditAction.DOCUMENT_CREATED, actor=employee, document_id=gone_id))
+    writer.submit(AuditLog(action=AuditAction.DOCUMENT_CREATED, actor=employee, document=draft_document))
+
+    writer.flush()
+
+    assert AuditLog.objects.filter(document=draft_document).count() == 1
+    assert writer._sealed == []
+    assert writer.stats["written"] + writer.stats["rejected"] == 2
@@ -0,0 +1,46 @@
+import copy
+
+import pytest
+
+from benchmarks import baseline, bench_urls
+
+
+def test_every_route_has_a_benchmark_scenario():
+    assert bench_urls.check_coverage() == []
+
+
+@pytest.mark.django_db
+def test_url_benchmark_smoke_run():
+    results = bench_urls.run(repeat=1, warmup=0)
+    assert set(results) == {s.key for s in bench_urls.SCENARIOS}
+    assert results["GET workflow:document-list"]["queries"] > 0
+
+
+RESULTS = {
+    "urls": {"GET workflow:document-list": {"p50_ms": 10.0, "p95_ms": 12.0, "queries": 4, "status": 200}},
+    "transitions": {
+        "throughput_per_s": 200.0,
+        "latency": {"submit": {"p50_ms": 5.0, "p95_ms": 50.0}},
+        "violations": {"duplicate_decisions": 0, "status_counter_drift": 2},
+    },
+}
+
+
+def test_compare_accepts_noise_within_tolerance():
+    current = copy.deepcopy(RESULTS)
+    current["urls"]["GET workflow:document-list"]["p50_ms"] = 14.0
+    current["transitions"]["violations"]["status_counter_drift"] = 5
+    assert baseline.compare(current, RESULTS, tolerance=0.5, slack_ms=0) == []
+
+
+def test_compare_flags_regressions():
+    current = copy.deepcopy(RESULTS)
+    current["urls"]["GET workflow:document-list"]["queries"] = 5
+    current["urls"]["GET workflow:document-list"]["p95_ms"] = 30.0
+    current["transitions"]["violations"]["duplicate_decisions"] = 1
+    current["transitions"]["throughput_per_s"] = 100.0
+
+    regressions = baseline.compare(current, RESULTS, tolerance=0.5, slack_ms=0)
+    assert len(regressions) == 4
+    assert any("5 queries" in line for line in regressions)
+    assert any("duplicate_decisions" in line for line in regressions)
@@ -0,0 +1,129 @@
+import pytest
+from django.db.models import QuerySet
+from django.urls import reverse
+
+from workflow.models import ApprovalStep, AuditAction, AuditLog, Document
+from workflow.services.bulk_decision import BulkOutcome, decide_documents
+from workflow.services.status_summary import check_status_counter_drift
+
+
+def _submitted(owner, n):
+    return [
+        Document.objects.create(
+            title=f"Doc {i}",
+            content="c",
+            created_by=owner,
+            status=Document.Status.SUBMITTED,
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_approve_decides_every_submitted_document(manager, employee):
+    docs = _submitted(employee, 5)
+
+    results = decide_documents(manager, [d.pk for d in docs], "approve")
+
+    assert set(results.values()) == {BulkOutcome.APPROVED}
+    assert Document.objects.filter(status=Document.Status.APPROVED).count() == 5
+    assert ApprovalStep.objects.filter(decided_by=manager).count() == 5
+    assert AuditLog.objects.filter(action=AuditAction.DOCUMENT_APPROVED).count() == 5
+    assert check_status_counter_drift() == {}
+
+
+@pytest.mark.django_db
+def test_bulk_decision_reports_skipped_documents(manager, employee, draft_document):
+    own = _submitted(manager, 1)[0]
+    ok = _submitted(employee, 1)[0]
+
+    results = decide_documents(manager, [ok.pk, own.pk, draft_document.pk, 999999], "reject")
+
+    assert results == {
+        ok.pk: BulkOutcome.REJECTED,
+        own.pk: BulkOutcome.SELF_DECISION,
+        draft_document.pk: BulkOutcome.INVALID_STATE,
+        999999: BulkOutcome.NOT_FOUND,
+    }
+    assert not AuditLog.objects.filter(document__in=[own, draft_document]).exclude(
+        action=AuditAction.DOCUMENT_SUBMITTED
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_decision_requires_approver(employee, manager):
+    doc = _submitted(manager, 1)[0]
+    with pytest.raises(PermissionError):
+        decide_documents(employee, [doc.pk], "approve")
+
+
+@pytest.mark.django_db
+def test_bulk_decision_uses_constant_queries(manager, employee, django_assert_max_num_queries):
+    docs = _submitted(employee, 50)
+    with django_assert_max_num_queries(10):
+        decide_documents(manager, [d.pk for d in docs], "approve")
+
+
+@pytest.mark.django_db
+def test_bulk_endpoint_returns_json_outcomes(client_logged_in, manager, employee):
+    docs = _submitted(employee, 2)
+    client = client_logged_in(manager)
+
+    resp = client.post(
+        reverse("workflow:document-bulk-decision"),
+        {"decision": "approve", "document_ids": [d.pk for d in docs]},
+        HTTP_ACCEPT="application/json",
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()["results"] == {str(d.pk): "APPROVED" for d in docs}
+
+
+@pytest.mark.django_db
+def test_bulk_endpoint_forbidden_for_employee(client_logged_in, employee, manager):
+    doc = _submitted(manager, 1)[0]
+    client = client_logged_in(employee)
+    resp = client.post(
+        reverse("workflow:document-bulk-decision"),
+        {"decision": "approve", "document_ids": [doc.pk]},
+    )
+    assert resp.status_code == 403
+
+
+@pytest.mark.django_db
+def test_bulk_endpoint_rejects_unknown_decision(client_logged_in, manager):
+    client = client_logged_in(manager)
+    resp = client.post(
+        reverse("workflow:document-bulk-decision"),
+        {"decision": "publish", "document_ids": [1]},
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_document_decided_concurrently_is_skipped(monkeypatch, manager, admin, employee):
+    from workflow.services import bulk_decision
+
+    docs = _submitted(employee, 3)
+    rival = docs[1]
+
+    def read_then_race(rows):
+        # Another approver decides one document after the batch read it,
+        # as can happen where SELECT ... FOR UPDATE locks nothing
+        is_batch = isinstance(rows, QuerySet)
+        rows = list(rows)
+        if is_batch:
+            rival.approve(admin)
+        return rows
+
+    monkeypatch.setattr(bulk_decision, "list", read_then_race, raising=False)
+    results = decide_documents(manager, [d.pk for d in docs], "reject")
+
+    assert results == {
+        docs[0].pk: BulkOutcome.REJECTED,
+        rival.pk: BulkOutcome.INVALID_STATE,
+        docs[2].pk: BulkOutcome.REJECTED,
+    }
+    assert ApprovalStep.objects.get(document=rival).decided_by == admin
+    assert AuditLog.objects.filter(action=AuditAction.DOCUMENT_REJECTED).count() == 2
+    assert check_status_counter_drift() == {}
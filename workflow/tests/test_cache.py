@@ -0,0 +1,138 @@
+import threading
+
+import pytest
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache, caches
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from workflow import metrics
+from workflow.cache import DOCUMENTS, INBOX, LocalTier, cached, invalidate
+from workflow.models import Document
+from workflow.services.status_summary import get_status_summary
+
+
+def requests_total(tier, result):
+    return metrics.registry.snapshot().get(
+        ("rbaw_cache_requests_total", (("tier", tier), ("result", result))), 0
+    )
+
+
+def test_local_tier_evicts_least_recently_used():
+    tier = LocalTier(max_entries=2)
+    tier.set("a", b"1", expires_at=100)
+    tier.set("b", b"2", expires_at=100)
+    tier.get("a", now=0)
+    assert tier.set("c", b"3", expires_at=100) == 1
+
+    assert tier.get("b", now=0) != b"2"
+    assert (tier.get("a", now=0), tier.get("c", now=0)) == (b"1", b"3")
+    assert tier.evictions == 1
+
+
+def test_local_tier_expires_entries():
+    tier = LocalTier(max_entries=10)
+    tier.set("a", b"1", expires_at=100)
+    assert tier.get("a", now=99) == b"1"
+    assert tier.get("a", now=100) != b"1"
+    assert len(tier) == 0
+
+
+def test_shared_hits_fill_the_local_tier():
+    caches["shared"].set("greeting", "hello")
+    before = (requests_total("local", "hit"), requests_total("shared", "hit"))
+
+    assert cache.get("greeting") == "hello"
+    assert cache.get("greeting") == "hello"
+
+    after = (requests_total("local", "hit"), requests_total("shared", "hit"))
+    assert (after[0] - before[0], after[1] - before[1]) == (1, 1)
+    assert cache.stats()["entries"] == 1
+
+
+def test_writes_and_deletes_reach_both_tiers():
+    cache.set("key", {"n": 1})
+    assert caches["shared"].get("key") == {"n": 1}
+
+    cache.delete("key")
+    assert cache.get("key") is None
+    assert caches["shared"].get("key") is None
+
+
+def test_cached_values_are_copies():
+    cache.set("counts", {"DRAFT": 1})
+    cache.get("counts")["DRAFT"] = 99
+    assert cache.get("counts") == {"DRAFT": 1}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cached_recomputes_after_invalidation():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cached("answer", compute, tags=(DOCUMENTS,)) == 1
+    assert cached("answer", compute, tags=(DOCUMENTS,)) == 1
+    invalidate(INBOX)
+    assert cached("answer", compute, tags=(DOCUMENTS,)) == 1
+    invalidate(DOCUMENTS)
+    assert cached("answer", compute, tags=(DOCUMENTS,)) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_invalidation_waits_for_commit():
+    with transaction.atomic():
+        invalidate(DOCUMENTS)
+        # Another request caches the rows as they were before the commit
+        other = threading.Thread(
+            target=cached, args=("stale", lambda: "before commit"), kwargs={"tags": (DOCUMENTS,)}
+        )
+        other.start()
+        other.join()
+
+    assert cached("stale", lambda: "after commit", tags=(DOCUMENTS,)) == "after commit"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transactions_bypass_the_cache():
+    cached("counts", lambda: "committed")
+    with transaction.atomic():
+        assert cached("counts", lambda: "uncommitted") == "uncommitted"
+        cached("fresh", lambda: "uncommitted")
+    assert cached("fresh", lambda: "committed") == "committed"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dashboard_counts_follow_transitions(client_logged_in, manager, employee):
+    client = client_logged_in(manager)
+    assert client.get(reverse("workflow:dashboard")).context["submitted_count"] == 0
+
+    with CaptureQueriesContext(connection) as warm:
+        client.get(reverse("workflow:dashboard"))
+    assert not [q for q in warm.captured_queries if "workflow_" in q["sql"]]
+
+    doc = Document.objects.create(title="Quarterly budget", content="c", created_by=employee)
+    doc.submit(employee)
+    response = client.get(reverse("workflow:dashboard"))
+    assert (response.context["submitted_count"], response.context["pending_approvals"]) == (1, 1)
+    assert "Quarterly budget" in response.content.decode()
+
+    doc.approve(manager)
+    response = client.get(reverse("workflow:dashboard"))
+    assert (response.context["submitted_count"], response.context["approved_count"]) == (0, 1)
+    assert response.context["pending_approvals"] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_membership_change_refreshes_pending_count(submitted_document):
+    reviewer = User.objects.create_user(username="reviewer", password="pass")
+    assert get_status_summary(reviewer)["pending_approvals"] == 0
+
+    reviewer.groups.add(Group.objects.get(name="Manager"))
+    assert get_status_summary(reviewer)["pending_approvals"] == 1
+
+    Group.objects.get(name="Manager").user_set.remove(reviewer)
+    assert get_status_summary(reviewer)["pending_approvals"] == 0
@@ -0,0 +1,130 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from workflow.models import AuditAction, AuditLog, Document
+
+pytestmark = pytest.mark.django_db
+
+
+def revisit(client, url):
+    """GET `url` until it carries an ETag, then return it with the conditional GET's response."""
+    response = client.get(url)
+    if "ETag" not in response:
+        # The first visit sets the CSRF cookie the ETag covers
+        response = client.get(url)
+    assert response.status_code == 200
+    etag = response["ETag"]
+    return etag, client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+
+def test_detail_page_answers_not_modified(client_logged_in, employee, draft_document):
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-detail", args=[draft_document.pk])
+    etag, response = revisit(client, url)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert "private" in response["Cache-Control"] and "no-cache" in response["Cache-Control"]
+    assert "Last-Modified" not in response
+    assert not response.content
+
+
+def test_not_modified_skips_the_page_queries(client_logged_in, employee, draft_document):
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-detail", args=[draft_document.pk])
+    client.get(url)
+    etag = client.get(url)["ETag"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert not [q for q in ctx.captured_queries if "workflow_documentbody" in q["sql"]]
+
+
+def test_detail_changes_with_the_document(client_logged_in, employee, draft_document):
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-detail", args=[draft_document.pk])
+    etag, _ = revisit(client, url)
+
+    draft_document.submit(employee)
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_etag_covers_the_users_roles(client_logged_in, manager, submitted_document):
+    client = client_logged_in(manager)
+    url = reverse("workflow:document-detail", args=[submitted_document.pk])
+    etag, _ = revisit(client, url)
+
+    manager.groups.add(Group.objects.get(name="Admin"))
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_if_modified_since_alone_renders_the_page(client_logged_in, manager, submitted_document):
+    client = client_logged_in(manager)
+    url = reverse("workflow:document-detail", args=[submitted_document.pk])
+    revisit(client, url)
+
+    manager.groups.add(Group.objects.get(name="Admin"))
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+    assert response.status_code == 200
+
+
+def test_unreadable_document_is_still_not_found(client_logged_in, employee, manager, draft_document):
+    owner = client_logged_in(employee)
+    url = reverse("workflow:document-detail", args=[draft_document.pk])
+    etag, _ = revisit(owner, url)
+
+    other = Document.objects.create(title="Other", content="c", created_by=manager)
+    other_url = reverse("workflow:document-detail", args=[other.pk])
+    assert owner.get(other_url, HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+
+def test_list_changes_with_its_documents(client_logged_in, employee, draft_document):
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-list")
+    etag, response = revisit(client, url)
+    assert response.status_code == 304
+
+    Document.objects.create(title="Another", content="c", created_by=employee)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_audit_page_changes_with_new_entries(client_logged_in, manager, submitted_document):
+    client = client_logged_in(manager)
+    url = reverse("workflow:document-audit-log", args=[submitted_document.pk])
+    etag, response = revisit(client, url)
+    assert response.status_code == 304
+
+    AuditLog.log(action=AuditAction.STAGE_APPROVED, actor=manager, document=submitted_document)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_pending_messages_are_rendered(client_logged_in, manager, employee, submitted_document):
+    client = client_logged_in(manager)
+    url = reverse("workflow:document-detail", args=[submitted_document.pk])
+    etag, _ = revisit(client, url)
+
+    other = Document.objects.create(title="Other", content="c", created_by=employee)
+    other.submit(employee)
+    client.post(reverse("workflow:document-approve", args=[other.pk]))
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Document approved." in response.content.decode()
+
+
+def test_setting_turns_it_off(client_logged_in, employee, draft_document, settings):
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-detail", args=[draft_document.pk])
+    etag, _ = revisit(client, url)
+
+    settings.CONDITIONAL_GET = False
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "ETag" not in response
@@ -0,0 +1,98 @@
+import json
+import logging
+
+import pytest
+from django.db import connection, connections
+
+from workflow import db_pool, metrics
+from workflow.logging import JsonFormatter
+
+POOLED = "pooled"
+
+pytestmark = [
+    pytest.mark.skipif(connection.vendor != "postgresql", reason="connection pooling requires PostgreSQL"),
+    # Transactional, so that checkouts are not held open by a test transaction
+    pytest.mark.django_db(transaction=True, databases=["default", POOLED]),
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def pooled_alias(django_db_setup):
+    """A pooled alias on the test database, as DB_POOL would configure."""
+    primary = connections["default"].settings_dict
+    connections.settings[POOLED] = {
+        **primary,
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {**primary["OPTIONS"], "pool": {"min_size": 1, "max_size": 2, "timeout": 5.0}},
+        "TEST": {**primary["TEST"], "MIRROR": "default"},
+    }
+    yield
+    connections[POOLED].close()
+    connections[POOLED].close_pool()
+    del connections[POOLED]
+    del connections.settings[POOLED]
+
+
+@pytest.fixture
+def pooled():
+    conn = connections[POOLED]
+    conn.close()
+    conn.pool.pop_stats()
+    return conn
+
+
+def backend_pid(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+def test_checkouts_reuse_pooled_connections(pooled):
+    pids = set()
+    for _ in range(5):
+        pids.add(backend_pid(pooled))
+        pooled.close()
+
+    stats = pooled.pool.get_stats()
+    assert stats["requests_num"] == 5
+    assert len(pids) <= stats["pool_max"] == 2
+
+
+def test_broken_connections_are_replaced_on_checkout(pooled):
+    backend_pid(pooled)
+    pooled.close()
+    # As after a server restart or a proxy dropping idle connections
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity"
+            " WHERE datname = current_database() AND pid <> pg_backend_pid()"
+        )
+
+    backend_pid(pooled)
+    pooled.close()
+    assert pooled.pool.get_stats()["connections_lost"] >= 1
+
+
+def test_stats_are_logged_and_counted(pooled, caplog):
+    backend_pid(pooled)
+    pooled.close()
+    before = metrics.registry.snapshot().get(("rbaw_db_pool_requests_total", (("alias", POOLED),)), 0)
+
+    with caplog.at_level(logging.INFO, logger="workflow.db"):
+        db_pool.log_pool_stats()
+
+    [record] = [r for r in caplog.records if getattr(r, "db_alias", None) == POOLED]
+    assert record.pool_stats["requests_num"] == 1
+    assert record.pool_stats["pool_max"] == 2
+    assert json.loads(JsonFormatter().format(record))["pool_stats"]["requests_num"] == 1
+
+    after = metrics.registry.snapshot()[("rbaw_db_pool_requests_total", (("alias", POOLED),))]
+    assert after - before == 1
+    # Popped: the next line only covers what happens after this one
+    assert "requests_num" not in pooled.pool.get_stats()
+
+
+def test_only_opened_pools_are_reported(pooled):
+    backend_pid(pooled)
+    assert list(dict(db_pool.open_pools())) == [POOLED]
@@ -0,0 +1,154 @@
+import contextlib
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connections, transaction
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from workflow import db_router
+from workflow.models import AuditAction, AuditLog, Document
+from workflow.tests.test_async_views import async_routing
+
+REPLICA = "replica1"
+
+
+# Transactional, so that the replica's connection sees the rows tests write
+pytestmark = pytest.mark.django_db(transaction=True, databases=["default", REPLICA])
+
+
+@pytest.fixture(scope="module", autouse=True)
+def replica_alias(django_db_setup):
+    """A second alias on the test database, as DB_REPLICAS would configure."""
+    primary = connections["default"].settings_dict
+    connections.settings[REPLICA] = {**primary, "TEST": {**primary["TEST"], "MIRROR": "default"}}
+    yield
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = [REPLICA]
+    return connections[REPLICA]
+
+
+def workflow_reads(queries):
+    return [q["sql"] for q in queries if '"workflow_' in q["sql"] and q["sql"].lstrip().startswith("SELECT")]
+
+
+@pytest.mark.parametrize(
+    "user, route",
+    [
+        ("employee", "workflow:document-list"),
+        ("manager", "workflow:manager-document-list"),
+        ("admin", "reports:audit-log-list"),
+        ("employee", "workflow:document-audit-log"),
+    ],
+)
+def test_read_only_pages_read_from_replica(request, replica, client_logged_in, submitted_document, user, route):
+    args = [submitted_document.pk] if route == "workflow:document-audit-log" else []
+    client = client_logged_in(request.getfixturevalue(user))
+
+    with CaptureQueriesContext(connections["default"]) as primary, CaptureQueriesContext(replica) as copy:
+        resp = client.get(reverse(route, args=args))
+
+    assert resp.status_code == 200
+    assert workflow_reads(copy)
+    assert not workflow_reads(primary)
+    # The session and the user's roles stay on the primary
+    assert not [q for q in copy if "django_session" in q["sql"] or "auth_group" in q["sql"]]
+
+
+def test_other_pages_read_from_primary(replica, client_logged_in, employee, draft_document):
+    client = client_logged_in(employee)
+    with CaptureQueriesContext(replica) as copy:
+        assert client.get(reverse("workflow:document-detail", args=[draft_document.pk])).status_code == 200
+    assert not copy.captured_queries
+
+
+def test_writes_pin_the_browser_to_primary(replica, client_logged_in, employee, draft_document):
+    client = client_logged_in(employee)
+    client.cookies.pop(db_router.PIN_COOKIE, None)
+
+    resp = client.post(reverse("workflow:document-submit", args=[draft_document.pk]))
+    assert resp.cookies[db_router.PIN_COOKIE]["max-age"] == 5
+
+    with CaptureQueriesContext(replica) as copy:
+        page = client.get(reverse("workflow:document-list"))
+    assert not copy.captured_queries
+    assert page.context["documents"][0].status == Document.Status.SUBMITTED
+    assert db_router.PIN_COOKIE not in page.cookies  # reads do not extend the pin
+
+    client.cookies.pop(db_router.PIN_COOKIE)
+    with CaptureQueriesContext(replica) as copy:
+        client.get(reverse("workflow:document-list"))
+    assert workflow_reads(copy)
+
+
+def test_transitions_and_audit_stay_on_primary(replica, employee, manager, draft_document):
+    token = db_router.begin_request(pinned=False)
+    try:
+        db_router.read_from_replica()
+        with CaptureQueriesContext(replica) as copy:
+            draft_document.submit(employee)
+            draft_document.approve(manager)
+            AuditLog.log(action=AuditAction.DOCUMENT_CREATED, actor=employee, document=draft_document)
+            with transaction.atomic():
+                Document.objects.get(pk=draft_document.pk)
+        assert not copy.captured_queries
+
+        assert Document.objects.db_manager().get(pk=draft_document.pk)._state.db == REPLICA
+    finally:
+        assert db_router.end_request(token) is True
+
+
+def test_async_pages_read_from_replica(replica, manager, submitted_document):
+    client = AsyncClient()
+    client.force_login(manager)
+    with async_routing(), CaptureQueriesContext(replica) as copy:
+        resp = async_to_sync(client.get)(reverse("workflow:manager-document-list"))
+    assert resp.status_code == 200
+    assert workflow_reads(copy)
+
+
+@pytest.mark.parametrize("async_views", [False, True])
+def test_cached_dashboard_values_are_read_from_primary(
+    replica, client_logged_in, employee, manager, submitted_document, async_views
+):
+    """
+    A replica may lag behind the write that invalidated the cache; what it
+    returns must not be cached under the new tag versions for everyone.
+    """
+    if async_views:
+        client = AsyncClient()
+        client.force_login(manager)
+        get = async_to_sync(client.get)
+    else:
+        get = client_logged_in(manager).get
+    url = reverse("workflow:dashboard")
+
+    with async_routing() if async_views else contextlib.nullcontext():
+        get(url)
+        other = Document.objects.create(title="Other", content="c", created_by=employee)
+        other.submit(employee)
+
+        with CaptureQueriesContext(connections["default"]) as primary, CaptureQueriesContext(replica) as copy:
+            resp = get(url)
+        assert not workflow_reads(copy)
+        assert workflow_reads(primary)
+        assert resp.context["submitted_count"] == 2
+
+        # Warm: nothing left to read
+        with CaptureQueriesContext(connections["default"]) as primary, CaptureQueriesContext(replica) as copy:
+            get(url)
+        assert not workflow_reads(copy) and not workflow_reads(primary)
+
+
+def test_replicas_are_never_migrated(settings):
+    settings.DATABASE_REPLICAS = [REPLICA]
+    router = db_router.ReplicaRouter()
+    assert router.allow_migrate(REPLICA, "workflow") is False
+    assert router.allow_migrate("default", "workflow") is None
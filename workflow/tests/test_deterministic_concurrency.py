@@ -1,9 +1,11 @@
 import threading
 import pytest
-from django.db import connections
+from django.db import connection, connections
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from workflow.models import Document, ApprovalStep, AuditLog
+from workflow.services.bulk_decision import BulkOutcome, decide_documents
+from workflow.services.status_summary import check_status_counter_drift
 
 
 @pytest.mark.django_db(transaction=True)
@@ -47,4 +49,193 @@ def test_deterministic_single_winner_under_concurrency():
     assert ApprovalStep.objects.filter(document=document).count() == 1
     assert AuditLog.objects.filter(document=document).count() == 1
     assert len(results) == 1
-    assert len(errors) == 1
\ No newline at end of file
+    assert len(errors) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_and_single_decisions_have_single_winner():
+    User = get_user_model()
+    owner = User.objects.create_user(username="owner")
+    manager = User.objects.create_user(username="manager")
+    group, _ = Group.objects.get_or_create(name="Manager")
+    manager.groups.add(group)
+
+    documents = [
+        Document.objects.create(
+            title=f"Test {i}",
+            content="Test",
+            created_by=owner,
+            status=Document.Status.SUBMITTED,
+        )
+        for i in range(5)
+    ]
+    ids = [doc.pk for doc in documents]
+
+    wins = []
+    errors = []
+
+    def bulk_approve():
+        try:
+            results = decide_documents(manager, ids, "approve")
+            wins.extend(pk for pk, o in results.items() if o == BulkOutcome.APPROVED)
+        except Exception as e:
+            errors.append(type(e).__name__)
+        finally:
+            connections.close_all()
+
+    def single_reject():
+        try:
+            doc = Document.objects.get(pk=ids[0])
+            doc.reject(manager)
+            wins.append(ids[0])
+        except Exception as e:
+            errors.append(type(e).__name__)
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=bulk_approve),
+        threading.Thread(target=bulk_approve),
+        threading.Thread(target=single_reject),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # No document was decided twice; every win left exactly one step and audit
+    assert wins
+    assert len(wins) == len(set(wins))
+    for pk in ids:
+        steps = ApprovalStep.objects.filter(document_id=pk).count()
+        assert steps == (1 if pk in wins else 0)
+        assert AuditLog.objects.filter(document_id=pk).count() == steps
+        status = Document.objects.get(pk=pk).status
+        assert (status != Document.Status.SUBMITTED) == (pk in wins)
+
+
+THREADS = 16
+
+# The in-memory SQLite test database fails concurrent writers with "table
+# is locked" instead of queueing them; row-level races need PostgreSQL.
+requires_row_locking = pytest.mark.skipif(
+    connection.vendor == "sqlite",
+    reason="needs a database with row-level locking",
+)
+
+
+def _race(target, count=THREADS):
+    """Start `count` threads on `target` together; return their outcomes."""
+    barrier = threading.Barrier(count)
+    outcomes = []
+
+    def run():
+        try:
+            barrier.wait()
+            target()
+            outcomes.append("ok")
+        except Exception as e:
+            outcomes.append(type(e).__name__)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return outcomes
+
+
+@requires_row_locking
+@pytest.mark.django_db(transaction=True)
+def test_many_approvers_single_winner():
+    User = get_user_model()
+    owner = User.objects.create_user(username="owner")
+    group, _ = Group.objects.get_or_create(name="Manager")
+    managers = []
+    for i in range(THREADS):
+        manager = User.objects.create_user(username=f"manager{i}")
+        manager.groups.add(group)
+        managers.append(manager)
+    document = Document.objects.create(
+        title="Test", content="Test", created_by=owner, status=Document.Status.SUBMITTED
+    )
+    next_manager = iter(managers)
+    lock = threading.Lock()
+
+    def decide():
+        with lock:
+            manager = next(next_manager)
+        doc = Document.objects.get(pk=document.pk)
+        # Half approve, half reject
+        if manager.pk % 2:
+            doc.approve(manager)
+        else:
+            doc.reject(manager)
+
+    outcomes = _race(decide)
+
+    # Losers fail on the conditional UPDATE (or see the decided row), never
+    # on the unique ApprovalStep constraint
+    assert outcomes.count("ok") == 1
+    assert set(outcomes) <= {"ok", "TransitionConflict", "ValueError"}
+    assert ApprovalStep.objects.filter(document=document).count() == 1
+    assert AuditLog.objects.filter(document=document).count() == 1
+    assert check_status_counter_drift() == {}
+
+
+@requires_row_locking
+@pytest.mark.django_db(transaction=True)
+def test_many_concurrent_submits_single_winner():
+    owner = get_user_model().objects.create_user(username="owner")
+    document = Document.objects.create(title="Test", content="Test", created_by=owner)
+
+    outcomes = _race(lambda: Document.objects.get(pk=document.pk).submit(owner))
+
+    assert outcomes.count("ok") == 1
+    assert set(outcomes) <= {"ok", "TransitionConflict", "ValueError"}
+    document.refresh_from_db()
+    assert document.status == Document.Status.SUBMITTED
+    assert document.version == 2
+    assert AuditLog.objects.filter(document=document).count() == 1
+    assert check_status_counter_drift() == {}
+
+
+@pytest.mark.django_db
+def test_stale_draft_edit_is_rejected(client_logged_in, employee, draft_document):
+    from django.urls import reverse
+
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-edit", args=[draft_document.pk])
+    stale = draft_document.version
+
+    # Someone saves first (another tab)
+    resp = client.post(url, {"title": "First", "content": "one", "version": stale})
+    assert resp.status_code == 302
+
+    resp = client.post(url, {"title": "Second", "content": "two", "version": stale})
+    assert resp.status_code == 200
+    assert b"changed or submitted since you opened it" in resp.content
+
+    draft_document.refresh_from_db()
+    assert draft_document.title == "First"
+    assert draft_document.version == stale + 1
+
+
+@pytest.mark.django_db
+def test_admin_edit_invalidates_open_draft_edits(client_logged_in, employee, draft_document, rf):
+    from django.contrib.admin.sites import site
+    from django.urls import reverse
+
+    stale = draft_document.version
+    draft_document.title = "Fixed by an admin"
+    site._registry[Document].save_model(rf.post("/"), draft_document, form=None, change=True)
+    assert draft_document.version == stale + 1
+
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-edit", args=[draft_document.pk])
+    resp = client.post(url, {"title": "Mine", "content": "one", "version": stale})
+    assert b"changed or submitted since you opened it" in resp.content
+    draft_document.refresh_from_db()
+    assert draft_document.title == "Fixed by an admin"
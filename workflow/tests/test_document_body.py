@@ -0,0 +1,153 @@
+import base64
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from workflow.models import Document, DocumentBody
+from workflow.services.document_render import render_documents
+
+pytestmark = pytest.mark.usefixtures("media_root")
+
+PNG = b"\x89PNG\r\n\x1a\n fake png"
+JPEG = b"\xff\xd8\xff fake jpeg"
+
+
+def pasted(data, image_type):
+    return f'<img src="data:image/{image_type};base64,{base64.b64encode(data).decode()}">'
+
+
+def stored_images(media_root):
+    return sorted(p.name for p in (media_root / "document-images").rglob("*") if p.is_file())
+
+
+def image_urls(html):
+    return re.findall(r'src="(/media/document-images/[^"]+)"', html)
+
+
+@pytest.mark.django_db
+def test_pasted_images_are_stored_once_and_linked(employee, media_root, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        doc = Document.objects.create(
+            title="Logo",
+            content=f"<p>{pasted(PNG, 'png')}{pasted(PNG, 'png')}{pasted(JPEG, 'jpeg')}</p>",
+            created_by=employee,
+        )
+    doc.refresh_from_db()
+
+    assert "data:image" not in doc.content
+    png_url, same_url, jpeg_url = image_urls(doc.content)
+    assert png_url == same_url and png_url.endswith(".png") and jpeg_url.endswith(".jpg")
+    assert image_urls(doc.body.content_html) == [png_url, same_url, jpeg_url]
+    assert (media_root / png_url.removeprefix("/media/")).read_bytes() == PNG
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Document.objects.create(title="Logo again", content=pasted(PNG, "png"), created_by=employee)
+    assert len(stored_images(media_root)) == 2
+
+
+@pytest.mark.django_db
+def test_undecodable_images_are_left_to_the_sanitizer(employee, media_root):
+    doc = Document.objects.create(
+        title="Broken",
+        content='<img src="data:image/png;base64,not*base64">',
+        created_by=employee,
+    )
+    assert "data:image/png" in doc.content
+    assert not (media_root / "document-images").exists()
+
+
+@pytest.mark.django_db
+def test_lists_do_not_read_bodies(client_logged_in, employee, draft_document):
+    client = client_logged_in(employee)
+    with CaptureQueriesContext(connection) as queries:
+        client.get(reverse("workflow:document-list"))
+        client.get(reverse("workflow:dashboard"))
+    assert not [q for q in queries if "workflow_documentbody" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_editor_loads_and_saves_the_body(client_logged_in, employee, draft_document):
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-edit", args=[draft_document.pk])
+
+    with CaptureQueriesContext(connection) as queries:
+        page = client.get(url)
+    assert page.context["form"]["content"].value() == "content"
+    # Loaded with the document, not lazily
+    assert len([q for q in queries if "workflow_documentbody" in q["sql"]]) == 1
+
+    resp = client.post(url, {"title": "Edited", "content": "<p>new body</p>", "version": draft_document.version})
+    assert resp.status_code == 302
+    draft_document.refresh_from_db()
+    assert (draft_document.title, draft_document.content) == ("Edited", "<p>new body</p>")
+
+
+@pytest.mark.django_db
+def test_editing_a_document_without_a_body_row_stores_it(client_logged_in, employee):
+    # bulk_create skips save(), so no body row is written
+    (document,) = Document.objects.bulk_create([Document(title="Seeded", created_by=employee)])
+    assert not DocumentBody.objects.filter(document=document).exists()
+
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-edit", args=[document.pk])
+    resp = client.post(url, {"title": "Edited", "content": "<p>new body</p>", "version": document.version})
+    assert resp.status_code == 302
+    assert DocumentBody.objects.get(document=document).content == "<p>new body</p>"
+
+
+@pytest.mark.django_db
+def test_create_view_stores_the_body(client_logged_in, employee):
+    client = client_logged_in(employee)
+    resp = client.post(reverse("workflow:document-create"), {"title": "New", "content": "<p>hello</p>"})
+    assert resp.status_code == 302
+    body = DocumentBody.objects.get(document__title="New")
+    assert (body.content, body.content_html) == ("<p>hello</p>", "<p>hello</p>")
+
+
+@pytest.mark.django_db
+def test_render_documents_moves_images_out_of_existing_bodies(
+    employee, draft_document, media_root, django_capture_on_commit_callbacks
+):
+    # As left by the 0014 copy: rendered under the previous policy
+    DocumentBody.objects.filter(pk=draft_document.pk).update(
+        content=pasted(PNG, "png"), content_html=pasted(PNG, "png"), content_hash="v1"
+    )
+
+    assert render_documents(only_missing=True) == (0, 0)
+    with django_capture_on_commit_callbacks(execute=True):
+        assert render_documents() == (1, 1)
+
+    draft_document.refresh_from_db()
+    assert "data:image" not in draft_document.content
+    assert image_urls(draft_document.body.content_html) == image_urls(draft_document.content)
+    assert len(stored_images(media_root)) == 1
+
+
+@pytest.mark.django_db
+def test_images_not_of_their_declared_type_are_not_stored(
+    employee, media_root, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        doc = Document.objects.create(
+            title="Disguised", content=pasted(b"<script>alert(1)</script>", "png"), created_by=employee
+        )
+    assert "data:image/png" in doc.content
+    assert not (media_root / "document-images").exists()
+
+
+@pytest.mark.django_db
+def test_stale_draft_save_stores_no_images(
+    client_logged_in, employee, draft_document, media_root, django_capture_on_commit_callbacks
+):
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-edit", args=[draft_document.pk])
+    stale = draft_document.version
+    client.post(url, {"title": "First", "content": "one", "version": stale})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = client.post(url, {"title": "Second", "content": pasted(PNG, "png"), "version": stale})
+    assert resp.status_code == 200
+    assert not (media_root / "document-images").exists()
@@ -0,0 +1,141 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from workflow.models import Document, DocumentBody
+from workflow.services import document_render
+from workflow.services.document_render import content_digest, render_documents, sanitize
+
+# MALICIOUS pastes an image, which rendering stores as a file
+pytestmark = pytest.mark.usefixtures("media_root")
+
+MALICIOUS = (
+    '<p onclick="steal()">Hello <b>world</b></p>'
+    '<script>alert(1)</script>'
+    '<a href="javascript:alert(1)">js</a>'
+    '<a href="data:text/html;base64,PHNjcmlwdD4=">data</a>'
+    '<a href="https://example.com">ok</a>'
+    '<img src="data:image/svg+xml;base64,PHN2Zz4=">'
+    '<img src="data:image/png;base64,iVBORw0KGgo=" onerror="steal()">'
+)
+
+
+@pytest.fixture
+def count_sanitize(monkeypatch):
+    calls = []
+    real = document_render.sanitize
+
+    def counting(content):
+        calls.append(content)
+        return real(content)
+
+    monkeypatch.setattr(document_render, "sanitize", counting)
+    return calls
+
+
+def test_sanitize_keeps_summernote_markup_and_drops_scripts():
+    html = sanitize(MALICIOUS)
+    assert "<p>Hello <b>world</b></p>" in html
+    assert '<a href="https://example.com">ok</a>' in html
+    assert '<img src="data:image/png;base64,iVBORw0KGgo=">' in html
+    for unsafe in ("<script", "onclick", "onerror", "javascript:", "data:text/html", "svg"):
+        assert unsafe not in html
+
+
+@pytest.mark.django_db
+def test_rendering_is_stored_on_write_and_skipped_when_body_is_unchanged(employee, count_sanitize):
+    doc = Document.objects.create(title="T", content="<p>Body<script>x()</script></p>", created_by=employee)
+    assert doc.body.content_html == "<p>Bodyx()</p>"
+    assert doc.body.content_hash == content_digest(doc.content)
+    assert len(count_sanitize) == 1
+
+    doc.title = "Renamed"
+    doc.save()
+    doc.save(update_fields=["title"])
+    assert len(count_sanitize) == 1
+
+    doc.content = "<p>New</p>"
+    doc.save(update_fields=["content"])
+    doc.refresh_from_db()
+    assert doc.body.content_html == "<p>New</p>"
+
+
+@pytest.mark.django_db
+def test_save_draft_renders_the_edit(draft_document):
+    draft_document.content = "<p>Edited<script>x()</script></p>"
+    assert draft_document.save_draft(draft_document.version)
+    draft_document.refresh_from_db()
+    assert draft_document.body.content_html == "<p>Editedx()</p>"
+    assert draft_document.body.content_hash == content_digest(draft_document.content)
+
+
+@pytest.mark.django_db
+def test_detail_page_serves_the_stored_rendering(client_logged_in, employee, count_sanitize):
+    doc = Document.objects.create(title="T", content=MALICIOUS, created_by=employee)
+    client = client_logged_in(employee)
+
+    with CaptureQueriesContext(connection) as queries:
+        body = client.get(reverse("workflow:document-detail", args=[doc.pk])).content.decode()
+    assert "<p>Hello <b>world</b></p>" in body
+    assert "<script>alert(1)" not in body
+    assert len(count_sanitize) == 1  # on create only
+    document_query = next(q["sql"] for q in queries if 'FROM "workflow_document"' in q["sql"])
+    assert '"workflow_documentbody"."content_html"' in document_query
+    assert '"workflow_documentbody"."content",' not in document_query
+
+
+@pytest.mark.django_db
+def test_unrendered_rows_are_cleaned_once_per_version(client_logged_in, employee, count_sanitize):
+    doc = Document.objects.create(title="T", content=MALICIOUS, created_by=employee)
+    DocumentBody.objects.filter(pk=doc.pk).update(content=MALICIOUS, content_html="", content_hash="")
+    client = client_logged_in(employee)
+    url = reverse("workflow:document-detail", args=[doc.pk])
+
+    for _ in range(2):
+        body = client.get(url).content.decode()
+        assert "<p>Hello <b>world</b></p>" in body
+        assert "<script>alert(1)" not in body
+    assert len(count_sanitize) == 2  # create, then the first read
+
+
+@pytest.mark.django_db
+def test_command_backfills_missing_and_stale_renderings(employee):
+    fresh, missing, stale = (
+        Document.objects.create(title=f"Doc {i}", content=f"<p>{i}</p>", created_by=employee)
+        for i in range(3)
+    )
+    DocumentBody.objects.filter(pk=missing.pk).update(content_html="", content_hash="")
+    DocumentBody.objects.filter(pk=stale.pk).update(content="<p>changed in SQL</p>")
+
+    assert render_documents(only_missing=True) == (1, 1)
+    call_command("render_documents")
+
+    stale.refresh_from_db()
+    assert stale.body.content_html == "<p>changed in SQL</p>"
+    missing.refresh_from_db()
+    assert missing.body.content_hash == content_digest("<p>1</p>")
+    assert render_documents() == (3, 0)
+
+
+@pytest.mark.django_db
+def test_backfill_keeps_a_concurrent_edit(monkeypatch, draft_document):
+    DocumentBody.objects.filter(pk=draft_document.pk).update(content_hash="")
+    real = document_render.content_digest
+    edits = []
+
+    def edited_meanwhile(content):
+        # Committed by another request after the backfill read the row
+        if not edits:
+            edits.append(
+                DocumentBody.objects.filter(pk=draft_document.pk).update(
+                    content_html="<p>edit</p>", content_hash="edit"
+                )
+            )
+        return real(content)
+
+    monkeypatch.setattr(document_render, "content_digest", edited_meanwhile)
+    assert render_documents() == (1, 0)
+    draft_document.refresh_from_db()
+    assert draft_document.body.content_html == "<p>edit</p>"
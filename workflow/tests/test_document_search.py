@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from workflow.models import Document
+from workflow.services.document_search import html_to_text, render_headline
+from workflow.signals import refresh_search_vector
+
+requires_postgres = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="full-text search requires PostgreSQL"
+)
+
+
+def test_html_to_text_strips_summernote_markup():
+    html = '<p>Quarterly&nbsp;<b>budget</b></p><p>review</p><script>alert(1)</script><img src="data:x">'
+    assert html_to_text(html) == "Quarterly budget review"
+
+
+def test_render_headline_escapes_everything_but_marks():
+    rendered = render_headline("<script>x</script> \x02budget\x03 &amp; more")
+    assert rendered == "&lt;script&gt;x&lt;/script&gt; <mark>budget</mark> &amp; more"
+
+
+@pytest.mark.django_db
+def test_search_is_scoped_like_document_list(client_logged_in, employee, manager):
+    Document.objects.create(title="Budget plan", content="<p>numbers</p>", created_by=employee)
+    Document.objects.create(title="Budget review", content="<p>numbers</p>", created_by=manager)
+
+    client = client_logged_in(employee)
+    resp = client.get(reverse("workflow:document-search"), {"q": "budget"})
+
+    assert resp.status_code == 200
+    assert [d.title for d in resp.context["documents"]] == ["Budget plan"]
+
+
+@pytest.mark.django_db
+def test_empty_query_returns_nothing(client_logged_in, employee, draft_document):
+    client = client_logged_in(employee)
+    resp = client.get(reverse("workflow:document-search"))
+    assert list(resp.context["documents"]) == []
+
+
+@requires_postgres
+@pytest.mark.django_db
+def test_ranked_search_prefers_title_and_ignores_markup(client_logged_in, admin, employee):
+    body = Document.objects.create(
+        title="Travel notes",
+        content="<p>Remember the <strong>invoice</strong> for the trip.</p>",
+        created_by=employee,
+    )
+    title = Document.objects.create(title="Invoice policy", content="<p>Rules.</p>", created_by=employee)
+    Document.objects.create(title="Markup only", content='<p class="invoice">x</p>', created_by=employee)
+
+    client = client_logged_in(admin)
+    resp = client.get(reverse("workflow:document-search"), {"q": "invoices"})
+
+    docs = list(resp.context["documents"])
+    assert [d.pk for d in docs] == [title.pk, body.pk]
+    assert "<mark>invoice</mark>" in docs[1].highlighted
+
+
+@requires_postgres
+@pytest.mark.django_db
+def test_vector_follows_edits_but_not_transitions(employee, draft_document, django_assert_num_queries):
+    draft_document.title = "Procurement"
+    draft_document.save()
+    assert Document.objects.filter(search_vector="procurement").exists()
+
+    with django_assert_num_queries(0):
+        refresh_search_vector(Document, draft_document, update_fields={"status", "updated_at"})
@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+
+from workflow import live
+from workflow.models import AuditAction, AuditLog
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def subscribe(loop):
+    subscriptions = []
+
+    def _subscribe(user, maxsize=None):
+        subscription = live.broker.subscribe(user.pk, loop=loop, maxsize=maxsize)
+        subscriptions.append(subscription)
+        return subscription
+
+    yield _subscribe
+    for subscription in subscriptions:
+        live.broker.unsubscribe(subscription)
+
+
+def drain(loop, subscription):
+    loop.run_until_complete(asyncio.sleep(0))  # run call_soon_threadsafe callbacks
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+@pytest.mark.django_db
+def test_queue_events_follow_the_inbox(
+    subscribe, loop, employee, manager, draft_document, django_capture_on_commit_callbacks
+):
+    watching = subscribe(manager)
+    owner = subscribe(employee)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        draft_document.submit(employee)
+    events = drain(loop, watching)
+    assert ("queue", {
+        "op": "insert",
+        "document": {
+            "id": draft_document.pk,
+            "title": "Draft Doc",
+            "owner": "employee",
+            "created_at": draft_document.created_at.isoformat(),
+        },
+    }) in events
+    assert ("counts", {"DRAFT": -1, "SUBMITTED": 1}) in events
+    assert [e for e in drain(loop, owner) if e[0] == "queue"] == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        draft_document.approve(manager)
+    assert drain(loop, watching) == [
+        ("queue", {"op": "remove", "document": {"id": draft_document.pk}}),
+        ("counts", {"SUBMITTED": -1, "APPROVED": 1}),
+    ]
+
+
+@pytest.mark.django_db
+def test_nothing_is_published_without_commit(subscribe, loop, manager, submitted_document):
+    watching = subscribe(manager)
+    # The test transaction never commits, so on_commit callbacks never run
+    submitted_document.approve(manager)
+    assert drain(loop, watching) == []
+
+
+@pytest.mark.django_db
+def test_bulk_log_publishes_one_aggregated_delta(subscribe, loop, manager, django_capture_on_commit_callbacks):
+    watching = subscribe(manager)
+    with django_capture_on_commit_callbacks(execute=True):
+        AuditLog.bulk_log(action=AuditAction.DOCUMENT_CREATED, actor=manager, documents=[None] * 3)
+    assert drain(loop, watching) == [("counts", {"DRAFT": 3})]
+
+
+@pytest.mark.django_db
+def test_slow_subscriber_is_asked_to_resync(subscribe, loop, manager):
+    slow = subscribe(manager, maxsize=2)
+    for _ in range(3):
+        live.broker.publish_all(("counts", {"DRAFT": 1}))
+    assert drain(loop, slow) == [live.RESYNC]
+
+
+class _Client:
+    """Drives the ASGI app: reads the stream, publishes, then disconnects."""
+
+    def __init__(self, cookie, publish=()):
+        self.cookie = cookie
+        self.publish = list(publish)
+        self.messages = []
+        self._sent = asyncio.Event()
+
+    def scope(self):
+        return {
+            "type": "http",
+            "method": "GET",
+            "path": settings.LIVE_EVENTS_PATH,
+            "headers": [(b"cookie", self.cookie.encode())],
+        }
+
+    async def receive(self):
+        if self.publish:
+            await self._sent.wait()
+            self._sent.clear()
+            live.broker.publish_all(self.publish.pop(0))
+            await self._sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        self.messages.append(message)
+        self._sent.set()
+
+    def run(self):
+        async_to_sync(live.sse_application)(self.scope(), self.receive, self.send)
+        return self
+
+    @property
+    def body(self):
+        return b"".join(m.get("body", b"") for m in self.messages)
+
+
+def _session_cookie(client):
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+@pytest.mark.django_db
+def test_stream_requires_an_approver(client_logged_in, employee):
+    assert _Client("").run().messages[0]["status"] == 403
+    cookie = _session_cookie(client_logged_in(employee))
+    assert _Client(cookie).run().messages[0]["status"] == 403
+
+
+@pytest.mark.django_db
+def test_stream_sends_events_until_disconnect(client_logged_in, manager):
+    cookie = _session_cookie(client_logged_in(manager))
+    result = _Client(cookie, publish=[("counts", {"DRAFT": 1})]).run()
+
+    start = result.messages[0]
+    assert start["status"] == 200
+    assert (b"content-type", b"text/event-stream") in start["headers"]
+    assert b'event: counts\ndata: {"DRAFT":1}\n\n' in result.body
+    assert len(live.broker) == 0
+
+
+@pytest.mark.django_db
+@override_settings(LIVE_MAX_CONNECTIONS=0)
+def test_stream_rejects_connections_over_the_limit(client_logged_in, manager):
+    cookie = _session_cookie(client_logged_in(manager))
+    assert _Client(cookie).run().messages[0]["status"] == 503
+
+
+def test_asgi_application_routes_the_event_path():
+    from rbaw_project.asgi import application, django_application
+
+    assert application is not django_application
+    assert application.__module__ == "workflow.live"
+
+
+@pytest.mark.django_db
+def test_pages_render_live_hooks(client_logged_in, manager, submitted_document):
+    client = client_logged_in(manager)
+    queue = client.get(reverse("workflow:manager-document-list")).content.decode()
+    assert f'data-document-id="{submitted_document.pk}"' in queue
+    assert settings.LIVE_EVENTS_PATH in queue
+
+    dashboard = client.get(reverse("workflow:dashboard")).content.decode()
+    assert 'data-count="pending"' in dashboard
+    assert settings.LIVE_EVENTS_PATH in dashboard
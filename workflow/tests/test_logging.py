@@ -0,0 +1,128 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from workflow import metrics
+from workflow.logging import BackgroundLogHandler, JsonFormatter, RotatingFileSink
+from workflow.middleware import correlation_id_var
+
+
+def make_record(msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("workflow.test", logging.INFO, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class BlockingStream(io.StringIO):
+    """A stdout that stalls until released, like a stuck log collector."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(5)
+        return super().write(text)
+
+
+@pytest.fixture
+def handler_factory():
+    handlers = []
+
+    def make(**kwargs):
+        handler = BackgroundLogHandler(**kwargs)
+        handler.setFormatter(JsonFormatter())
+        handlers.append(handler)
+        return handler
+
+    yield make
+    for handler in handlers:
+        handler.close()
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_formatter_copies_known_extras_only():
+    payload = json.loads(JsonFormatter().format(make_record(actor="ann", status=200, secret="x")))
+    assert payload["message"] == "hello world"
+    assert (payload["actor"], payload["status"]) == ("ann", 200)
+    assert "secret" not in payload
+
+
+def test_records_are_written_by_the_background_thread(handler_factory):
+    stream = io.StringIO()
+    handler = handler_factory(stream=stream, flush_interval=60)
+
+    token = correlation_id_var.set("req-1")
+    try:
+        record = make_record(actor="ann")
+        handler.handle(record)
+    finally:
+        correlation_id_var.reset(token)
+    # Other handlers still get the record as it was logged
+    assert record.args == ("world",)
+
+    assert stream.getvalue() == ""
+    handler.flush()
+    [payload] = lines(stream)
+    assert (payload["message"], payload["actor"], payload["correlation_id"]) == ("hello world", "ann", "req-1")
+
+
+def test_full_queue_drops_and_counts_records(handler_factory):
+    stream = BlockingStream()
+    handler = handler_factory(stream=stream, queue_size=2, batch_size=1, flush_interval=0.01)
+    key = ("rbaw_log_records_dropped_total", (("level", "INFO"),))
+    before = metrics.registry.snapshot().get(key, 0)
+
+    for number in range(20):
+        handler.handle(make_record("line %s", (number,)))
+
+    assert handler.dropped > 0
+    assert metrics.registry.snapshot()[key] - before == handler.dropped
+
+    stream.release.set()
+    handler.flush()
+    written = lines(stream)
+    reports = [p["dropped"] for p in written if "dropped" in p]
+    assert sum(reports) == handler.dropped
+    assert len(written) == 20 - handler.dropped + len(reports)
+
+
+def test_file_sink_rotates_by_size(tmp_path):
+    sink = RotatingFileSink(tmp_path / "app-{pid}.log", max_bytes=10, rotate_seconds=0, backup_count=2)
+    for batch in ("first line", "second line", "third line", "fourth line"):
+        sink.write([batch])
+    sink.close()
+
+    current = sink.path
+    assert "{pid}" not in current.name
+    assert current.read_text() == "fourth line\n"
+    assert current.with_name(current.name + ".1").read_text() == "third line\n"
+    assert current.with_name(current.name + ".2").read_text() == "second line\n"
+    assert not current.with_name(current.name + ".3").exists()
+
+
+def test_file_sink_rotates_by_age(tmp_path, monkeypatch):
+    sink = RotatingFileSink(tmp_path / "app.log", max_bytes=0, rotate_seconds=60, backup_count=1)
+    clock = [1000.0]
+    monkeypatch.setattr("workflow.logging.time.time", lambda: clock[0])
+
+    sink.write(["old"])
+    clock[0] += 61
+    sink.write(["new"])
+    sink.close()
+
+    assert (tmp_path / "app.log").read_text() == "new\n"
+    assert (tmp_path / "app.log.1").read_text() == "old\n"
+
+
+def test_handler_writes_to_file_sink(handler_factory, tmp_path):
+    handler = handler_factory(console=False, file_path=str(tmp_path / "app.log"))
+    handler.handle(make_record(document=7))
+    handler.flush()
+    assert json.loads((tmp_path / "app.log").read_text())["document"] == 7
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from workflow import metrics
+from workflow.metrics import Registry
+
+
+def _sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    hist = registry.histogram("t_seconds", "Test.", ["op"], buckets=(0.1, 1.0))
+    hist.observe_many([0.05, 0.1, 0.5, 3.0], op="x")
+
+    text = registry.render()
+    assert "# TYPE t_seconds histogram" in text
+    assert _sample(text, 't_seconds_bucket{op="x",le="0.1"}') == 2
+    assert _sample(text, 't_seconds_bucket{op="x",le="1.0"}') == 3
+    assert _sample(text, 't_seconds_bucket{op="x",le="+Inf"}') == 4
+    assert _sample(text, 't_seconds_count{op="x"}') == 4
+    assert _sample(text, 't_seconds_sum{op="x"}') == pytest.approx(3.65)
+
+
+def test_counter_rejects_unknown_labels(registry):
+    counter = registry.counter("t_total", "Test.", ["action"])
+    with pytest.raises(ValueError):
+        counter.inc(actor="x")
+
+
+def test_other_process_files_are_summed(tmp_path, registry):
+    counter = registry.counter("t_total", "Test.", ["action"])
+    (tmp_path / "123-dead.json").write_text(json.dumps([["t_total", [["action", "A"]], 5.0]]))
+    (tmp_path / "456-torn.json").write_text("[[")  # mid-write; skipped
+
+    with override_settings(METRICS_DIR=str(tmp_path), METRICS_FLUSH_INTERVAL=3600):
+        counter.inc(2, action="A")
+        assert _sample(registry.render(), 't_total{action="A"}') == 7
+        registry.flush()
+        own = [p for p in tmp_path.glob("*.json") if p.name.startswith(str(registry._pid))]
+        assert len(own) == 1
+        assert json.loads(own[0].read_text()) == [["t_total", [["action", "A"]], 2.0]]
+
+
+@pytest.mark.django_db
+def test_transitions_feed_metrics(employee, manager, draft_document, django_capture_on_commit_callbacks):
+    def audit(action):
+        return metrics.registry.collect().get(("rbaw_audit_events_total", (("action", action),)), 0)
+
+    def transitions(name):
+        key = ("rbaw_transition_duration_seconds_count", (("transition", name), ("outcome", "ok")))
+        return metrics.registry.collect().get(key, 0)
+
+    submitted, approved = audit("DOCUMENT_SUBMITTED"), audit("DOCUMENT_APPROVED")
+    submits, queued = transitions("submit"), metrics.registry.collect().get(
+        ("rbaw_document_queue_seconds_count", (("decision", "APPROVED"),)), 0
+    )
+
+    with pytest.raises(ValueError):
+        draft_document.approve(manager)
+    # Counted only once the transition commits
+    with django_capture_on_commit_callbacks(execute=True):
+        draft_document.submit(employee)
+        draft_document.approve(manager)
+
+    assert audit("DOCUMENT_SUBMITTED") == submitted + 1
+    assert audit("DOCUMENT_APPROVED") == approved + 1
+    assert transitions("submit") == submits + 1
+    assert metrics.registry.collect()[
+        ("rbaw_document_queue_seconds_count", (("decision", "APPROVED"),))
+    ] == queued + 1
+
+
+@pytest.mark.django_db
+@override_settings(DEBUG=True)
+def test_metrics_endpoint(client, submitted_document):
+    resp = client.get(reverse("workflow:metrics"))
+    assert resp.status_code == 200
+    assert resp["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = resp.content.decode()
+    assert _sample(text, 'rbaw_documents{status="SUBMITTED"}') == 1
+    assert "# TYPE rbaw_view_db_seconds histogram" in text
+    assert "rbaw_queue_oldest_age_seconds " in text
+
+
+@pytest.mark.django_db
+@override_settings(METRICS_TOKEN="s3cret")
+def test_metrics_endpoint_token(client):
+    assert client.get(reverse("workflow:metrics")).status_code == 403
+    resp = client.get(reverse("workflow:metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+    assert resp.status_code == 200
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_needs_a_token_outside_debug(client):
+    assert client.get(reverse("workflow:metrics")).status_code == 403
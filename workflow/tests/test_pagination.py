@@ -0,0 +1,65 @@
+import pytest
+from django.urls import reverse
+
+from workflow.models import Document
+
+
+@pytest.fixture
+def many_documents(employee):
+    return [
+        Document.objects.create(
+            title=f"Doc {i}",
+            content="x" * 1000,
+            created_by=employee,
+            status=Document.Status.SUBMITTED,
+        )
+        for i in range(30)
+    ]
+
+
+@pytest.mark.django_db
+def test_document_list_walks_pages_with_cursors(client_logged_in, employee, many_documents):
+    client = client_logged_in(employee)
+
+    first = client.get(reverse("workflow:document-list"))
+    page = first.context["page_obj"]
+    assert len(page) == 25
+    assert page.has_next() and not page.has_previous()
+    assert page.object_list[0].pk == many_documents[-1].pk
+
+    second = client.get(reverse("workflow:document-list"), {"after": page.next_cursor})
+    page2 = second.context["page_obj"]
+    assert [d.pk for d in page2] == [d.pk for d in reversed(many_documents[:5])]
+    assert page2.has_previous() and not page2.has_next()
+
+    back = client.get(reverse("workflow:document-list"), {"before": page2.previous_cursor})
+    assert [d.pk for d in back.context["page_obj"]] == [d.pk for d in page]
+
+
+@pytest.mark.django_db
+def test_document_list_has_no_per_row_queries(client_logged_in, employee, many_documents, django_assert_max_num_queries):
+    client = client_logged_in(employee)
+    # session, user, groups, one page query
+    with django_assert_max_num_queries(4) as queries:
+        client.get(reverse("workflow:document-list"))
+
+    # Bodies live in their own table and are not loaded for lists
+    assert all("workflow_documentbody" not in q["sql"] for q in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_approval_queue_is_oldest_first_and_paginated(client_logged_in, manager, many_documents, django_assert_max_num_queries):
+    client = client_logged_in(manager)
+    with django_assert_max_num_queries(4):
+        resp = client.get(reverse("workflow:manager-document-list"))
+
+    page = resp.context["page_obj"]
+    assert [d.pk for d in page] == [d.pk for d in many_documents[:25]]
+    assert page.has_next()
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_returns_404(client_logged_in, employee):
+    client = client_logged_in(employee)
+    resp = client.get(reverse("workflow:document-list"), {"after": "not-a-cursor"})
+    assert resp.status_code == 404
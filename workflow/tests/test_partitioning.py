@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from workflow import partitioning
+
+
+def utc(year, month, day=1):
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+def test_month_arithmetic_wraps_years():
+    assert partitioning.add_months(utc(2026, 11), 3) == utc(2027, 2)
+    assert partitioning.add_months(utc(2026, 1), -1) == utc(2025, 12)
+    assert list(partitioning.month_range(utc(2026, 11, 17), utc(2027, 1))) == [
+        utc(2026, 11),
+        utc(2026, 12),
+        utc(2027, 1),
+    ]
+
+
+def test_partition_names_round_trip():
+    name = partitioning.partition_name(utc(2026, 3))
+    assert name == "workflow_auditlog_p2026_03"
+    assert partitioning.parse_partition_name(name) == utc(2026, 3)
+    assert partitioning.parse_partition_name("workflow_auditlog_default") is None
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor == "postgresql", reason="exercises the non-PostgreSQL path")
+def test_command_refuses_non_postgres_backends():
+    assert partitioning.ensure_partitions(connection) == []
+    with pytest.raises(CommandError, match="requires PostgreSQL"):
+        call_command("audit_partitions")
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="requires PostgreSQL")
+def test_partitions_created_and_retired(tmp_path, settings, employee, draft_document):
+    from workflow.models import AuditAction, AuditLog
+
+    settings.AUDIT_ARCHIVE_DIR = str(tmp_path)
+    assert partitioning.is_partitioned(connection)
+
+    old = utc(2020, 1, 15)
+    partitioning.create_partition(connection, partitioning.month_start(old))
+    AuditLog.objects.create(
+        action=AuditAction.DOCUMENT_CREATED,
+        actor=employee,
+        document=draft_document,
+        created_at=old,
+    )
+
+    call_command("audit_partitions", "--retire-before", "2020-02", "--archive")
+
+    assert "workflow_auditlog_p2020_01" not in partitioning.list_partitions(connection)
+    assert (tmp_path / "workflow_auditlog_p2020_01.csv.gz").exists()
+    assert not AuditLog.objects.filter(created_at=old).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="requires PostgreSQL")
+def test_rows_in_default_partition_move_to_their_month(employee, draft_document):
+    from workflow.metrics import database_gauges
+    from workflow.models import AuditAction, AuditLog
+
+    stray = utc(2019, 6, 10)
+    # No partition for the month yet, so it lands in DEFAULT
+    AuditLog.objects.create(
+        action=AuditAction.DOCUMENT_CREATED, actor=employee, document=draft_document, created_at=stray
+    )
+    assert partitioning.default_partition_rows(connection) == 1
+    gauges = {name: samples for name, _, samples in database_gauges()}
+    assert gauges["rbaw_audit_default_partition_rows"] == [((), 1)]
+
+    call_command("audit_partitions")
+
+    assert "workflow_auditlog_p2019_06" in partitioning.list_partitions(connection)
+    assert partitioning.default_partition_rows(connection) == 0
+    assert AuditLog.objects.filter(created_at=stray).count() == 1
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT count(*) FROM "workflow_auditlog_p2019_06"')
+        assert cursor.fetchone()[0] == 1
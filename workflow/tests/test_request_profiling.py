@@ -0,0 +1,70 @@
+import json
+import logging
+
+import pytest
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from workflow.logging import JsonFormatter
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def profile_records():
+    # The `workflow` logger does not propagate, so caplog cannot see these
+    handler = _ListHandler()
+    logger = logging.getLogger("workflow.request")
+    logger.addHandler(handler)
+    try:
+        yield handler.records
+    finally:
+        logger.removeHandler(handler)
+
+
+@pytest.mark.django_db
+@override_settings(REQUEST_PROFILING_SAMPLE_RATE=1.0, REQUEST_SLOW_MS=0)
+def test_sampled_request_is_profiled(employee, draft_document, profile_records):
+    client = Client()
+    client.force_login(employee)
+    resp = client.get(reverse("workflow:document-list"), HTTP_X_CORRELATION_ID="abc-123")
+    assert resp.status_code == 200
+
+    (record,) = profile_records
+    assert record.levelno == logging.INFO
+    assert record.path == "/documents/"
+    assert record.status == 200
+    assert record.db_queries > 0
+    assert record.db_time_ms >= 0
+    assert record.slowest_sql.startswith("SELECT")
+    assert record.template_ms is not None and record.template_ms <= record.latency_ms
+
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["correlation_id"] == "abc-123"
+    assert payload["db_queries"] == record.db_queries
+
+
+@pytest.mark.django_db
+@override_settings(REQUEST_PROFILING_SAMPLE_RATE=0.0, REQUEST_SLOW_MS=1)
+def test_slow_requests_are_logged_without_sampling(employee, profile_records):
+    client = Client()
+    client.force_login(employee)
+    client.get(reverse("workflow:document-list"))
+    assert [r.levelno for r in profile_records] == [logging.WARNING]
+    assert profile_records[0].getMessage() == "Slow request"
+
+
+@pytest.mark.django_db
+@override_settings(REQUEST_PROFILING_SAMPLE_RATE=0.0, REQUEST_SLOW_MS=60_000)
+def test_fast_unsampled_requests_are_not_logged(employee, profile_records):
+    client = Client()
+    client.force_login(employee)
+    client.get(reverse("workflow:document-list"))
+    assert profile_records == []
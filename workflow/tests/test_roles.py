@@ -0,0 +1,66 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from workflow.services.roles import get_role_names, has_any_role, is_approver
+
+
+@pytest.fixture
+def shared_role_cache(settings):
+    settings.ROLE_CACHE_TIMEOUT = 60
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def request_scoped_roles(settings):
+    settings.ROLE_CACHE_TIMEOUT = 0
+
+
+@pytest.mark.django_db
+def test_role_names_loaded_once_per_instance(request_scoped_roles, manager, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert get_role_names(manager) == {"Manager"}
+        assert is_approver(manager)
+        assert has_any_role(manager, ["Manager", "Admin"])
+
+
+@pytest.mark.django_db
+def test_membership_change_invalidates_instance(employee):
+    assert not is_approver(employee)
+    employee.groups.add(Group.objects.get(name="Manager"))
+    assert is_approver(employee)
+    employee.groups.clear()
+    assert get_role_names(employee) == frozenset()
+
+
+@pytest.mark.django_db
+def test_shared_cache_survives_new_instances(shared_role_cache, manager, django_assert_num_queries):
+    get_role_names(manager)
+    fresh = type(manager).objects.get(pk=manager.pk)
+    with django_assert_num_queries(0):
+        assert get_role_names(fresh) == {"Manager"}
+
+
+@pytest.mark.django_db
+def test_shared_cache_invalidated_by_reverse_membership_change(shared_role_cache, employee):
+    get_role_names(employee)
+    Group.objects.get(name="Admin").user_set.add(employee)
+
+    fresh = type(employee).objects.get(pk=employee.pk)
+    assert get_role_names(fresh) == {"Employee", "Admin"}
+
+
+@pytest.mark.django_db
+def test_approval_queue_resolves_roles_once(request_scoped_roles, client_logged_in, manager, submitted_document):
+    client = client_logged_in(manager)
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(reverse("workflow:manager-document-list"))
+    assert resp.status_code == 200
+
+    group_queries = [q for q in ctx.captured_queries if '"auth_group"' in q["sql"]]
+    assert len(group_queries) == 1
@@ -0,0 +1,103 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from workflow.models import Document, DocumentStatusCounter
+from workflow.services.status_summary import (
+    check_status_counter_drift,
+    compute_status_summary,
+    get_status_summary,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def test_counters_follow_transitions(employee, manager):
+    doc = Document.objects.create(title="T", content="c", created_by=employee)
+    doc.submit(employee)
+    doc.approve(manager)
+
+    other = Document.objects.create(title="U", content="c", created_by=employee)
+    other.submit(employee)
+    other.reject(manager)
+
+    Document.objects.create(title="V", content="c", created_by=employee).delete()
+
+    assert check_status_counter_drift() == {}
+    assert get_status_summary(manager) == compute_status_summary(manager)
+
+
+def test_failed_transition_leaves_counters_untouched(manager):
+    doc = Document.objects.create(
+        title="Self", content="c", created_by=manager, status=Document.Status.SUBMITTED
+    )
+    with pytest.raises(PermissionError):
+        doc.approve(manager)
+    assert check_status_counter_drift() == {}
+
+
+def test_pending_excludes_own_submissions(employee, manager):
+    Document.objects.create(title="A", content="c", created_by=employee, status=Document.Status.SUBMITTED)
+    Document.objects.create(title="B", content="c", created_by=manager, status=Document.Status.SUBMITTED)
+
+    summary = get_status_summary(manager)
+    assert summary["submitted_count"] == 2
+    assert summary["pending_approvals"] == 1
+
+
+def test_dashboard_does_not_scan_documents_per_status(client_logged_in, manager, employee):
+    for _ in range(3):
+        Document.objects.create(title="D", content="c", created_by=employee)
+    client = client_logged_in(manager)
+
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(reverse("workflow:dashboard"))
+    doc_counts = [q for q in ctx.captured_queries if 'COUNT' in q["sql"] and '"workflow_document"' in q["sql"]]
+    inbox_counts = [q for q in ctx.captured_queries if 'COUNT' in q["sql"] and '"workflow_inboxentry"' in q["sql"]]
+    assert doc_counts == []
+    assert len(inbox_counts) == 1
+
+
+def test_command_detects_and_repairs_drift(employee):
+    Document.objects.create(title="A", content="c", created_by=employee)
+    DocumentStatusCounter.objects.filter(status=Document.Status.DRAFT).update(count=42)
+
+    with pytest.raises(CommandError):
+        call_command("status_counters")
+
+    call_command("status_counters", "--rebuild")
+    assert check_status_counter_drift() == {}
+    call_command("status_counters")
+
+
+def admin_change(client, document, **changes):
+    """POST the admin change form of `document` with its current values plus `changes`."""
+    url = reverse("admin:workflow_document_change", args=[document.pk])
+    page = client.get(url)
+    forms = [page.context["adminform"].form]
+    for inline in page.context["inline_admin_formsets"]:
+        forms += [inline.formset.management_form, *inline.formset.forms]
+    data = {}
+    for form in forms:
+        for name, field in form.fields.items():
+            value = form.initial.get(name, field.initial)
+            if value is not None:
+                data[form.add_prefix(name)] = getattr(value, "pk", value)
+    data.update(changes)
+    return client.post(url, data)
+
+
+def test_admin_cannot_change_status(client, django_user_model, employee):
+    doc = Document.objects.create(title="T", content="c", created_by=employee)
+    client.force_login(django_user_model.objects.create_superuser("root", password="pass"))
+
+    resp = admin_change(client, doc, title="Renamed", status=Document.Status.APPROVED)
+
+    assert resp.status_code == 302
+    doc.refresh_from_db()
+    assert (doc.title, doc.status) == ("Renamed", Document.Status.DRAFT)
+    assert check_status_counter_drift() == {}
+    assert get_status_summary(employee) == compute_status_summary(employee)
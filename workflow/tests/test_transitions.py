@@ -0,0 +1,66 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from workflow.models import Document
+from workflow.transitions import (
+    ACTIONS_BY_SOURCE,
+    TRANSITIONS,
+    allowed_actions,
+)
+
+
+def test_table_is_compiled_per_source_state():
+    assert {a.name for a in ACTIONS_BY_SOURCE[Document.Status.DRAFT]} == {"edit", "submit"}
+    assert {a.name for a in ACTIONS_BY_SOURCE[Document.Status.SUBMITTED]} == {"approve", "reject"}
+    assert ACTIONS_BY_SOURCE[Document.Status.APPROVED] == ()
+    assert TRANSITIONS["approve"].target == Document.Status.APPROVED
+
+
+@pytest.fixture
+def mixed_documents(db, employee, manager):
+    docs = []
+    for owner in (employee, manager):
+        for status in Document.Status.values:
+            docs.append(Document.objects.create(title=status, content="c", created_by=owner, status=status))
+    return docs
+
+
+@pytest.mark.django_db
+def test_allowed_actions_per_role(employee, manager, mixed_documents):
+    def actions(user):
+        allowed = allowed_actions(user, mixed_documents)
+        return {
+            (doc.created_by_id == user.pk, doc.status): allowed[doc.pk]
+            for doc in mixed_documents
+        }
+
+    by_employee = actions(employee)
+    assert by_employee[(True, "DRAFT")] == {"edit", "submit"}
+    assert by_employee[(False, "DRAFT")] == frozenset()
+    assert by_employee[(False, "SUBMITTED")] == frozenset()
+
+    by_manager = actions(manager)
+    assert by_manager[(False, "SUBMITTED")] == {"approve", "reject"}
+    assert by_manager[(True, "SUBMITTED")] == frozenset()
+    assert by_manager[(False, "APPROVED")] == frozenset()
+
+
+@pytest.mark.django_db
+def test_allowed_actions_is_batched(manager, mixed_documents, django_assert_max_num_queries):
+    manager = User.objects.get(pk=manager.pk)  # no memoised roles
+    documents = list(Document.objects.only("id", "status", "created_by_id", "current_stage_id"))
+
+    # One role lookup for the whole page, nothing per document
+    with django_assert_max_num_queries(1):
+        allowed_actions(manager, documents * 50)
+
+
+@pytest.mark.django_db
+def test_list_templates_use_allowed_actions(client_logged_in, employee, manager, draft_document, submitted_document):
+    resp = client_logged_in(employee).get(reverse("workflow:document-list"))
+    assert reverse("workflow:document-submit", args=[draft_document.pk]).encode() in resp.content
+    assert reverse("workflow:document-submit", args=[submitted_document.pk]).encode() not in resp.content
+
+    resp = client_logged_in(manager).get(reverse("workflow:manager-document-list"))
+    assert reverse("workflow:document-approve", args=[submitted_document.pk]).encode() in resp.content
@@ -0,0 +1,272 @@
+"""
+Declarative Document state machine.
+
+Every action a user can take on a document is declared once below: the
+state it applies in, the guards that must pass, and, for transitions, the
+target state, side effects and audit action. The declarations are compiled
+at import into lookup tables keyed by name and by source state.
+
+`apply_transition` runs one transition: state check, guards, a conditional
+UPDATE, the status counters, the side effects and the audit entry, all in
+one atomic block. Decisions on documents with an approval chain are votes
+first (workflow.services.approval_chain); the document only moves once the
+last stage reaches quorum or someone rejects it.
+
+`allowed_actions` answers "what can this user do with these documents"
+for a whole page in one pass. Guards read user-level facts (roles, the
+stages the user approves, their votes on the page) from a GuardContext
+that loads each of them at most once per call, so nothing is queried per
+document.
+"""
+
+from functools import cached_property
+
+from django.db import transaction
+
+from workflow.metrics import record_queue_time
+from workflow.models import (
+    ApprovalStep,
+    AuditAction,
+    AuditLog,
+    Document,
+    DocumentStatusCounter,
+    TransitionConflict,
+)
+from workflow.services import approval_chain, approval_inbox
+from workflow.services.roles import is_approver
+
+Status = Document.Status
+
+
+class GuardContext:
+    """Per-call cache of the user-level facts guards need."""
+
+    def __init__(self, user, documents):
+        self.user = user
+        self.documents = documents
+
+    @cached_property
+    def is_approver(self):
+        return is_approver(self.user)
+
+    @cached_property
+    def stage_ids(self):
+        return approval_chain.stage_ids_for(self.user)
+
+    @cached_property
+    def votes(self):
+        return approval_chain.votes_by(
+            self.user, [d.pk for d in self.documents if d.current_stage_id]
+        )
+
+    def can_vote(self, document):
+        stage_id = document.current_stage_id
+        return stage_id in self.stage_ids and (document.pk, stage_id) not in self.votes
+
+
+class Guard:
+    """A condition with the PermissionError message shown when it fails."""
+
+    def __init__(self, check, message):
+        self.check = check
+        self.message = message
+
+
+def is_owner(message):
+    return Guard(lambda document, ctx: document.created_by_id == ctx.user.pk, message)
+
+
+def is_not_owner(message):
+    return Guard(lambda document, ctx: document.created_by_id != ctx.user.pk, message)
+
+
+def has_approver_role(message):
+    return Guard(lambda document, ctx: ctx.is_approver, message)
+
+
+def is_pending_stage_approver(message):
+    """Chain documents only: the user approves the open stage and has not voted."""
+    return Guard(
+        lambda document, ctx: document.current_stage_id is None or ctx.can_vote(document),
+        message,
+    )
+
+
+class Action:
+    """Something a user may do to a document in `source` state."""
+
+    def __init__(self, name, source, guards=()):
+        self.name = name
+        self.source = source
+        self.guards = tuple(guards)
+
+
+class Transition(Action):
+    """An Action that moves the document to `target`."""
+
+    def __init__(
+        self,
+        name,
+        source,
+        target,
+        audit_action,
+        guards=(),
+        effects=(),
+        staged=False,
+        invalid_state_message="",
+        conflict_message="",
+    ):
+        super().__init__(name, source, guards)
+        self.target = target
+        self.audit_action = audit_action
+        self.effects = tuple(effects)
+        # Counts as a vote on the open stage of chain documents
+        self.staged = staged
+        self.invalid_state_message = invalid_state_message
+        self.conflict_message = conflict_message
+
+
+# Side effects run inside the transition's transaction, after the status
+# moved. `entered_at` is when the document entered the source state.
+
+def record_approval_step(transition, document, user, entered_at):
+    ApprovalStep.objects.create(
+        document=document,
+        decided_by=user,
+        status=transition.target,
+    )
+
+
+def observe_queue_time(transition, document, user, entered_at):
+    record_queue_time(transition.target, [entered_at])
+
+
+def enter_approval_chain(transition, document, user, entered_at):
+    approval_chain.enter_first_stage(document)
+
+
+def sync_inbox(transition, document, user, entered_at):
+    approval_inbox.refresh(document)
+
+
+ACTIONS = (
+    Action(
+        "edit",
+        Status.DRAFT,
+        guards=[is_owner("Only the owner can edit.")],
+    ),
+    Transition(
+        "submit",
+        Status.DRAFT,
+        Status.SUBMITTED,
+        AuditAction.DOCUMENT_SUBMITTED,
+        guards=[is_owner("Only the owner can submit.")],
+        effects=[enter_approval_chain, sync_inbox],
+        invalid_state_message="Only draft documents can be submitted.",
+        conflict_message="Document was already submitted.",
+    ),
+    Transition(
+        "approve",
+        Status.SUBMITTED,
+        Status.APPROVED,
+        AuditAction.DOCUMENT_APPROVED,
+        guards=[
+            is_not_owner("Self-approval is not allowed."),
+            has_approver_role("Only managers or admins can approve."),
+            is_pending_stage_approver("You are not a pending approver for this stage."),
+        ],
+        effects=[observe_queue_time, record_approval_step, sync_inbox],
+        staged=True,
+        invalid_state_message="Only submitted documents can be approved.",
+        conflict_message="Document was already decided.",
+    ),
+    Transition(
+        "reject",
+        Status.SUBMITTED,
+        Status.REJECTED,
+        AuditAction.DOCUMENT_REJECTED,
+        guards=[
+            is_not_owner("Self-rejection is not allowed."),
+            has_approver_role("Only managers or admins can reject."),
+            is_pending_stage_approver("You are not a pending approver for this stage."),
+        ],
+        effects=[observe_queue_time, record_approval_step, sync_inbox],
+        staged=True,
+        invalid_state_message="Only submitted documents can be rejected.",
+        conflict_message="Document was already decided.",
+    ),
+)
+
+# Compiled lookup tables
+ACTIONS_BY_NAME = {action.name: action for action in ACTIONS}
+TRANSITIONS = {a.name: a for a in ACTIONS if isinstance(a, Transition)}
+ACTIONS_BY_SOURCE = {
+    status: tuple(a for a in ACTIONS if a.source == status)
+    for status in Status.values
+}
+
+
+def apply_transition(document, name, user):
+    """
+    Run transition `name` for `user`.
+
+    Raises ValueError if the document is in the wrong state and
+    PermissionError if a guard fails, both before touching the database.
+    Raises TransitionConflict if a concurrent request moved the row first.
+    Returns True once the document changed state, or False when the call
+    only recorded a vote on an approval chain stage.
+    """
+    transition = TRANSITIONS[name]
+    if document.status != transition.source:
+        raise ValueError(transition.invalid_state_message)
+    ctx = GuardContext(user, [document])
+    for guard in transition.guards:
+        if not guard.check(document, ctx):
+            raise PermissionError(guard.message)
+
+    entered_at = document.updated_at
+    with transaction.atomic():
+        vote = None
+        if transition.staged and document.current_stage_id:
+            vote = approval_chain.record_vote(document, user, transition.target)
+
+        if vote in (None, approval_chain.VOTE_FINAL):
+            moved = document._compare_and_set(transition.source, transition.target)
+            if moved:
+                DocumentStatusCounter.shift(transition.source, transition.target)
+                for effect in transition.effects:
+                    effect(transition, document, user, entered_at)
+                AuditLog.log(action=transition.audit_action, actor=user, document=document)
+        else:
+            moved = vote == approval_chain.VOTE_RECORDED
+            if moved:
+                # The voter, or the whole stage, leaves the inbox
+                approval_inbox.refresh(document)
+    # Raised after the block: the loser's transaction has nothing to undo
+    if not moved:
+        raise TransitionConflict(transition.conflict_message)
+    return vote is None or vote == approval_chain.VOTE_FINAL
+
+
+def allowed_actions(user, documents):
+    """
+    `{document.pk: frozenset(action names)}` for `user` over `documents`.
+    Needs only `status`, `created_by_id` and `current_stage_id` loaded.
+    """
+    ctx = GuardContext(user, documents)
+    result = {}
+    for document in documents:
+        result[document.pk] = frozenset(
+            action.name
+            for action in ACTIONS_BY_SOURCE.get(document.status, ())
+            if all(guard.check(document, ctx) for guard in action.guards)
+        )
+    return result
+
+
+def annotate_allowed_actions(user, documents):
+    """Set `allowed_actions` on each document instance, for templates."""
+    allowed = allowed_actions(user, documents)
+    for document in documents:
+        document.allowed_actions = allowed[document.pk]
+    return documents
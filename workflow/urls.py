@@ -1,34 +1,54 @@
+from django.conf import settings
 from django.urls import path
-from workflow.views.dashboard import DashboardView
-from workflow.views.document_detail import DocumentDetailView
+from workflow.views.dashboard import AsyncDashboardView, DashboardView
+from workflow.views.document_detail import AsyncDocumentDetailView, DocumentDetailView
 from workflow.views.home import home
-from workflow.views.document_list import DocumentListView
+from workflow.views.document_list import AsyncDocumentListView, DocumentListView
 from workflow.views.document_create import DocumentCreateView
 from workflow.views.document_submit import DocumentSubmitView
 from workflow.views import DocumentUpdateView
 from workflow.views import ApprovalQueueListView
 from workflow.views import DocumentApproveView
 from workflow.views import DocumentRejectView
-from workflow.views import DocumentAuditLogView
+from workflow.views import DocumentBulkDecisionView
+from workflow.views import AsyncDocumentAuditLogView, DocumentAuditLogView
+from workflow.views import DocumentSearchView
+from workflow.views import metrics
 
 app_name = "workflow"
 
+
+def _view(sync_cls, async_cls):
+    """Route to the async variant when ASYNC_VIEWS is on."""
+    return (async_cls if settings.ASYNC_VIEWS else sync_cls).as_view()
+
+
 urlpatterns = [
     path(
         "",
         home,
         name="home"
     ),
+    path(
+        "metrics",
+        metrics,
+        name="metrics",
+    ),
     path(
         "dashboard/",
-        DashboardView.as_view(),
+        _view(DashboardView, AsyncDashboardView),
         name="dashboard",
     ),
     path(
         "documents/",
-        DocumentListView.as_view(),
+        _view(DocumentListView, AsyncDocumentListView),
         name="document-list"
     ),
+    path(
+        "documents/search/",
+        DocumentSearchView.as_view(),
+        name="document-search",
+    ),
     path(
         "documents/create/",
         DocumentCreateView.as_view(),
@@ -36,7 +56,7 @@ urlpatterns = [
     ),
     path(
         "documents/<int:pk>/",
-        DocumentDetailView.as_view(),
+        _view(DocumentDetailView, AsyncDocumentDetailView),
         name="document-detail",
     ),
     path(
@@ -54,6 +74,11 @@ urlpatterns = [
         ApprovalQueueListView.as_view(),
         name="manager-document-list",
     ),
+    path(
+        "documents/approvals/bulk/",
+        DocumentBulkDecisionView.as_view(),
+        name="document-bulk-decision",
+    ),
     path(
         "documents/<int:pk>/approve/",
         DocumentApproveView.as_view(),
@@ -66,7 +91,7 @@ urlpatterns = [
     ),
     path(
         "documents/<int:pk>/audit/",
-        DocumentAuditLogView.as_view(),
+        _view(DocumentAuditLogView, AsyncDocumentAuditLogView),
         name="document-audit-log",
     ),
 ]
@@ -1,10 +1,16 @@
 from .document_update import DocumentUpdateView
 from .document_review_list import ApprovalQueueListView
-from .document_decision import DocumentApproveView, DocumentRejectView
+from .document_decision import (
+    DocumentApproveView,
+    DocumentRejectView,
+    DocumentBulkDecisionView,
+)
 from .login_redirect import RoleBasedLoginView
-from .document_audit import DocumentAuditLogView
-from .document_list import DocumentListView
-from .document_detail import DocumentDetailView
+from .document_audit import AsyncDocumentAuditLogView, DocumentAuditLogView
+from .document_list import AsyncDocumentListView, DocumentListView
+from .document_search import DocumentSearchView
+from .document_detail import AsyncDocumentDetailView, DocumentDetailView
 from .document_submit import DocumentSubmitView
 from .home import home
-from .dashboard import DashboardView
\ No newline at end of file
+from .dashboard import AsyncDashboardView, DashboardView
+from .metrics import metrics
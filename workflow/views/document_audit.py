@@ -1,12 +1,20 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import InvalidPage, Paginator
 from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.views.generic import ListView
+from django.views.generic import ListView, TemplateView
 
+from workflow.mixins import AsyncLoginRequiredMixin, ConditionalGetMixin, ReadReplicaMixin
 from workflow.models import Document, AuditLog
+from workflow.services.roles import is_approver
+from workflow.views.document_detail import (
+    adocument_page_version,
+    aget_readable_document,
+    document_page_version,
+)
 
 
-class DocumentAuditLogView(LoginRequiredMixin, ListView):
+class DocumentAuditLogView(ReadReplicaMixin, LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = AuditLog
     template_name = "reports/document_audit_log.html"
     context_object_name = "logs"
@@ -19,20 +27,67 @@ class DocumentAuditLogView(LoginRequiredMixin, ListView):
         # Permission check: owner, manager, admin, or superuser
         if not (
             document.created_by == user
-            or user.groups.filter(name__in=["Manager", "Admin"]).exists()
-            or user.is_superuser
+            or is_approver(user)
         ):
             raise Http404
 
         self.document = document
-        return (
-            AuditLog.objects
-            .filter(document=document)
-            .select_related("actor")
-            .order_by("-created_at")  # newest first
-        )
+        return _logs_of(document)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["document"] = self.document
-        return context
\ No newline at end of file
+        return context
+
+    def get_page_version(self, request, pk):
+        return document_page_version(request.user, pk, with_events=True)
+
+
+def _logs_of(document):
+    return (
+        AuditLog.objects
+        .filter(document=document)
+        .select_related("actor")
+        .order_by("-created_at")  # newest first
+    )
+
+
+class AsyncDocumentAuditLogView(ReadReplicaMixin, AsyncLoginRequiredMixin, ConditionalGetMixin, TemplateView):
+    """
+    DocumentAuditLogView for async views: the page count comes from
+    `acount()` and the page rows from `aiterator()`.
+    """
+
+    template_name = "reports/document_audit_log.html"
+    paginate_by = DocumentAuditLogView.paginate_by
+
+    async def aget_page_version(self, request, pk):
+        return await adocument_page_version(request.user, pk, with_events=True)
+
+    async def get(self, request, pk):
+        document = await aget_readable_document(request.user, pk, with_body=False)
+        logs = _logs_of(document)
+
+        paginator = Paginator(logs, self.paginate_by)
+        paginator.count = await logs.acount()
+        page = self._page(paginator, request.GET.get("page") or 1)
+        page.object_list = [log async for log in page.object_list.aiterator()]
+
+        return self.render_to_response(self.get_context_data(
+            document=document,
+            logs=page.object_list,
+            object_list=page.object_list,
+            paginator=paginator,
+            page_obj=page,
+            is_paginated=page.has_other_pages(),
+        ))
+
+    @staticmethod
+    def _page(paginator, number):
+        # Same lookup rules as ListView.paginate_queryset
+        if number == "last":
+            number = paginator.num_pages
+        try:
+            return paginator.page(int(number))
+        except (ValueError, InvalidPage):
+            raise Http404
@@ -1,5 +1,6 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
+from django.db import transaction
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 from workflow.models.audit import AuditAction
@@ -16,15 +17,18 @@ class DocumentCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.created_by = self.request.user
-        response = super().form_valid(form)
 
-        messages.success(self.request, "Document created successfully.")
+        # Document row, status counter and audit entry commit together
+        with transaction.atomic():
+            response = super().form_valid(form)
+
+            AuditLog.log(
+                action=AuditAction.DOCUMENT_CREATED,
+                actor=self.request.user,
+                document=self.object, # type: ignore
+                metadata={"document_id": self.object.id}, # type: ignore
+            )
 
-        AuditLog.log(
-            action=AuditAction.DOCUMENT_CREATED,
-            actor=self.request.user,
-            document=self.object, # type: ignore
-            metadata={"document_id": self.object.id}, # type: ignore
-        )
+        messages.success(self.request, "Document created successfully.")
         return response
 
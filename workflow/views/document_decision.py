@@ -1,10 +1,13 @@
 from django.contrib import messages
-from django.http import HttpResponseBadRequest, HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.views import View
 
 from workflow.mixins import ApproverRequiredMixin
-from workflow.models import Document
+from workflow.models import Document, TransitionConflict
+from workflow.services.bulk_decision import BulkOutcome, decide_documents
+
+VOTE_RECORDED_MESSAGE = "Approval recorded; waiting on other approvers."
 
 
 class DocumentApproveView(ApproverRequiredMixin, View):
@@ -16,13 +19,18 @@ class DocumentApproveView(ApproverRequiredMixin, View):
             return HttpResponseForbidden("You cannot approve your own document.")
 
         try:
-            document.approve(request.user)
+            decided = document.approve(request.user)
+        except TransitionConflict as e:
+            return HttpResponse(str(e), status=409)
         except ValueError as e:
             return HttpResponseBadRequest(str(e))
         except PermissionError as e:
             return HttpResponseForbidden(str(e))
 
-        messages.success(request, "Document approved.")
+        if decided:
+            messages.success(request, "Document approved.")
+        else:
+            messages.success(request, VOTE_RECORDED_MESSAGE)
         return redirect("workflow:manager-document-list")
 
 
@@ -34,11 +42,53 @@ class DocumentRejectView(ApproverRequiredMixin, View):
             return HttpResponseForbidden("You cannot reject your own document.")
 
         try:
-            document.reject(request.user)
+            decided = document.reject(request.user)
+        except TransitionConflict as e:
+            return HttpResponse(str(e), status=409)
         except ValueError as e:
             return HttpResponseBadRequest(str(e))
         except PermissionError as e:
             return HttpResponseForbidden(str(e))
 
-        messages.success(request, "Document rejected.")
-        return redirect("workflow:manager-document-list")
\ No newline at end of file
+        if decided:
+            messages.success(request, "Document rejected.")
+        else:
+            messages.success(request, VOTE_RECORDED_MESSAGE)
+        return redirect("workflow:manager-document-list")
+
+
+class DocumentBulkDecisionView(ApproverRequiredMixin, View):
+    """
+    Approve or reject several queued documents in one request.
+    Expects `decision` ("approve"/"reject") and repeated `document_ids`.
+    """
+
+    def post(self, request):
+        try:
+            results = decide_documents(
+                request.user,
+                request.POST.getlist("document_ids"),
+                request.POST.get("decision"),
+            )
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        except PermissionError as e:
+            return HttpResponseForbidden(str(e))
+
+        if "application/json" in request.headers.get("Accept", ""):
+            return JsonResponse(
+                {"results": {str(pk): outcome for pk, outcome in results.items()}}
+            )
+
+        decided = sum(
+            1 for outcome in results.values()
+            if outcome in (BulkOutcome.APPROVED, BulkOutcome.REJECTED)
+        )
+        votes = sum(1 for outcome in results.values() if outcome == BulkOutcome.VOTE_RECORDED)
+        skipped = len(results) - decided - votes
+        messages.success(request, f"{decided} document(s) decided.")
+        if votes:
+            messages.info(request, f"{votes} approval(s) recorded; waiting on other approvers.")
+        if skipped:
+            messages.warning(request, f"{skipped} document(s) skipped.")
+        return redirect("workflow:manager-document-list")
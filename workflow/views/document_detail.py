@@ -1,25 +1,119 @@
-from django.views.generic import DetailView
+from django.views.generic import DetailView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import OuterRef, Subquery
 from django.shortcuts import get_object_or_404
 from django.http import Http404
 
-from workflow.models import Document
+from workflow.mixins import AsyncLoginRequiredMixin, ConditionalGetMixin
+from workflow.models import AuditLog, Document
+from workflow.services.document_render import arendered_html, rendered_html
+from workflow.services.roles import ais_approver, is_approver
 
+# The page shows the stored rendering, never the raw body
+DEFERRED_FIELDS = ("search_vector", "body__content")
 
-class DocumentDetailView(LoginRequiredMixin, DetailView):
+
+class DocumentDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     model = Document
     template_name = "workflow/document_detail.html"
     context_object_name = "document"
 
     def get_object(self, queryset=None):
-        document = get_object_or_404(Document, pk=self.kwargs["pk"])
+        document = get_object_or_404(
+            Document.objects.select_related("body").defer(*DEFERRED_FIELDS),
+            pk=self.kwargs["pk"],
+        )
         user = self.request.user
 
         if not (
             document.created_by == user
-            or user.groups.filter(name__in=["Manager", "Admin"]).exists()
-            or user.is_superuser
+            or is_approver(user)
         ):
             raise Http404
 
         return document
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["content_html"] = rendered_html(self.object)
+        return context
+
+    def get_page_version(self, request, pk):
+        return document_page_version(request.user, pk)
+
+
+def _version_row(pk, with_events):
+    fields = ["created_by_id", "updated_at", "version"]
+    queryset = Document.objects.filter(pk=pk)
+    if with_events:
+        latest = AuditLog.objects.filter(document=OuterRef("pk")).order_by("-created_at")
+        queryset = queryset.annotate(last_event=Subquery(latest.values("created_at")[:1]))
+        fields.append("last_event")
+    return queryset.values_list(*fields)
+
+
+def _page_version(row):
+    owner_id, updated_at, version, *events = row
+    # Every edit, transition and stage vote bumps `version`
+    parts = [str(version), updated_at.isoformat(), *(e.isoformat() for e in events if e)]
+    return ":".join(parts)
+
+
+def document_page_version(user, pk, with_events=False):
+    """
+    Version of document `pk`'s detail page, or of its
+    audit trail with `with_events`, for ConditionalGetMixin. One indexed
+    lookup; None if `user` may not read the document, so that the view
+    answers 404 as usual.
+    """
+    row = _version_row(pk, with_events).first()
+    if row is None or not (row[0] == user.pk or is_approver(user)):
+        return None
+    return _page_version(row)
+
+
+async def adocument_page_version(user, pk, with_events=False):
+    row = await _version_row(pk, with_events).afirst()
+    if row is None or not (row[0] == user.pk or await ais_approver(user)):
+        return None
+    return _page_version(row)
+
+
+async def aget_readable_document(user, pk, with_body=True):
+    """
+    The document `pk` if `user` owns it or is an approver, else Http404.
+    Loads the owner, and the rendered body unless `with_body` is False,
+    in the same query.
+    """
+    qs = Document.objects.select_related("created_by")
+    if with_body:
+        qs = qs.select_related("body").defer(*DEFERRED_FIELDS)
+    else:
+        qs = qs.defer("search_vector")
+    try:
+        document = await qs.aget(pk=pk)
+    except Document.DoesNotExist:
+        raise Http404
+
+    if not (
+        document.created_by_id == user.pk
+        or await ais_approver(user)
+    ):
+        raise Http404
+
+    return document
+
+
+class AsyncDocumentDetailView(AsyncLoginRequiredMixin, ConditionalGetMixin, TemplateView):
+    template_name = "workflow/document_detail.html"
+
+    async def aget_page_version(self, request, pk):
+        return await adocument_page_version(request.user, pk)
+
+    async def get(self, request, pk):
+        document = await aget_readable_document(request.user, pk)
+        return self.render_to_response(self.get_context_data(
+            object=document,
+            document=document,
+            content_html=await arendered_html(document),
+        ))
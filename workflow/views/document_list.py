@@ -1,23 +1,85 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import ListView
+from django.views.generic import ListView, TemplateView
 
+from workflow.mixins import (
+    AllowedActionsMixin,
+    AsyncLoginRequiredMixin,
+    ConditionalGetMixin,
+    ReadReplicaMixin,
+)
 from workflow.models import Document
+from workflow.pagination import KeysetPaginationMixin, apaginate_keyset, keyset_rows
 
 
-class DocumentListView(LoginRequiredMixin, ListView):
+def _listed(user):
+    # Admins see all, others see their own
+    return (
+        Document.objects
+        .visible_to(user)
+        .select_related('created_by')
+        .defer('search_vector')
+    )
+
+
+def _page_rows(request, per_page):
+    # The page's own index range scan, without the owner join
+    return keyset_rows(
+        Document.objects.visible_to(request.user),
+        per_page,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    ).values_list("id", "version")
+
+
+def _page_version(rows):
+    # `version` moves with every edit, transition and stage vote; the ids
+    # with documents added or deleted
+    return ";".join(f"{pk}.{number}" for pk, number in rows)
+
+
+class DocumentListView(
+    ReadReplicaMixin,
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    AllowedActionsMixin,
+    KeysetPaginationMixin,
+    ListView,
+):
     model = Document
     template_name = 'workflow/document_list.html'
     context_object_name = 'documents'
 
     def get_queryset(self):
-        user = self.request.user
+        return _listed(self.request.user)
+
+    def get_page_version(self, request):
+        return _page_version(list(_page_rows(request, self.paginate_by)))
+
+
+class AsyncDocumentListView(ReadReplicaMixin, AsyncLoginRequiredMixin, ConditionalGetMixin, TemplateView):
+    template_name = 'workflow/document_list.html'
+    paginate_by = KeysetPaginationMixin.paginate_by
+
+    async def aget_page_version(self, request):
+        return _page_version([row async for row in _page_rows(request, self.paginate_by)])
 
-        # Admins see all, others see their own
-        if user.is_superuser or user.groups.filter(name='Admin').exists():
-            return Document.objects.all().order_by('-created_at')
+    async def get(self, request):
+        from workflow.transitions import annotate_allowed_actions
 
-        return Document.objects.filter(created_by=user).order_by('-created_at')
+        user = request.user
+        # visible_to() and the guards read the role names memoised in dispatch
+        page = await apaginate_keyset(
+            _listed(user),
+            self.paginate_by,
+            after=request.GET.get("after"),
+            before=request.GET.get("before"),
+        )
+        await sync_to_async(annotate_allowed_actions)(user, page.object_list)
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        return context
+        return self.render_to_response(self.get_context_data(
+            documents=page.object_list,
+            object_list=page.object_list,
+            page_obj=page,
+            is_paginated=page.has_other_pages(),
+        ))
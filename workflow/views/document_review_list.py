@@ -1,14 +1,32 @@
 from django.views.generic import ListView
 from workflow.models import Document
-from workflow.mixins import ApproverRequiredMixin
+from workflow.mixins import (
+    AllowedActionsMixin,
+    ApproverRequiredMixin,
+    LiveEventsMixin,
+    ReadReplicaMixin,
+)
+from workflow.pagination import KeysetPaginationMixin
+from workflow.services import approval_inbox
 
 
-class ApprovalQueueListView(ApproverRequiredMixin, ListView):
+class ApprovalQueueListView(
+    ReadReplicaMixin,
+    ApproverRequiredMixin,
+    AllowedActionsMixin,
+    LiveEventsMixin,
+    KeysetPaginationMixin,
+    ListView,
+):
     model = Document
     template_name = "workflow/manager_document_list.html"
     context_object_name = "documents"
+    keyset_descending = False  # oldest submissions first
+    keyset_keys = ("inbox_created_at", "inbox_document_id")
 
     def get_queryset(self):
-        return Document.objects.filter(status=Document.Status.SUBMITTED).exclude(
-            created_by=self.request.user
+        return (
+            approval_inbox.documents_for(self.request.user)
+            .select_related("created_by")
+            .defer("search_vector")
         )
@@ -0,0 +1,29 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.views.generic import ListView
+
+from workflow.models import Document
+from workflow.services.document_search import render_headline, search_documents
+
+
+class DocumentSearchView(LoginRequiredMixin, ListView):
+    """
+    Ranked full-text search over the documents the user may list.
+    """
+
+    model = Document
+    template_name = "workflow/document_search.html"
+    context_object_name = "documents"
+    paginate_by = 20
+
+    def get_queryset(self):
+        self.query = self.request.GET.get("q", "").strip()
+        if not self.query:
+            return Document.objects.none()
+        return search_documents(self.request.user, self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.query
+        for doc in context["documents"]:
+            doc.highlighted = render_headline(getattr(doc, "headline", ""))
+        return context
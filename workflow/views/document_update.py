@@ -1,21 +1,36 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.views.generic import UpdateView
 
 from workflow.models import Document
-from workflow.forms import DocumentForm
+from workflow.forms import DocumentEditForm
 
 
 class DocumentUpdateView(LoginRequiredMixin, UpdateView):
     model = Document
-    form_class = DocumentForm
+    form_class = DocumentEditForm
     template_name = "workflow/document_form.html"
 
     def get_queryset(self):
-        return Document.objects.filter(
+        # The editor needs the body; load it with the document
+        return Document.objects.select_related("body").filter(
             created_by=self.request.user,
             status=Document.Status.DRAFT,
         )
 
+    def form_valid(self, form):
+        # Conditional on the version the editor loaded, so a concurrent
+        # edit or submit is reported instead of silently overwritten
+        self.object = form.instance
+        if not self.object.save_draft(form.cleaned_data["version"]):
+            form.add_error(
+                None,
+                "This document was changed or submitted since you opened it. "
+                "Reload it and apply your edits again.",
+            )
+            return self.form_invalid(form)
+        return HttpResponseRedirect(self.get_success_url())
+
     def get_success_url(self):
         return reverse_lazy("workflow:document-list")
@@ -1,12 +1,14 @@
 from django.contrib.auth.views import LoginView
 from django.urls import reverse
 
+from workflow.services.roles import APPROVER_ROLES, has_any_role
+
 
 class RoleBasedLoginView(LoginView):
     def get_success_url(self):
         user = self.request.user
 
-        if user.groups.filter(name__in=["Manager", "Admin"]).exists():
+        if has_any_role(user, APPROVER_ROLES):
             return reverse("workflow:manager-document-list")
 
         return reverse("workflow:document-list")
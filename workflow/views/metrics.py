@@ -0,0 +1,26 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from workflow.metrics import database_gauges, registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics(request):
+    """Prometheus scrape target; see workflow.metrics."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+            return HttpResponseForbidden("Invalid metrics token.")
+    elif not settings.DEBUG:
+        # Latencies and volumes are not for anyone who finds the URL
+        return HttpResponseForbidden("Set METRICS_TOKEN to serve metrics.")
+
+    return HttpResponse(registry.render(database_gauges()), content_type=CONTENT_TYPE)